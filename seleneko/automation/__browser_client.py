@@ -24,7 +24,7 @@ from selenium.common.exceptions import (
     WebDriverException,
 )
 
-from ..core import config as _config
+from ..core import lazy_config
 
 
 @dataclass
@@ -44,7 +44,7 @@ class SeleniumClient:
     軽量・堅牢な Selenium クライアント。
     明示 Wait・JS フォールバック・ヘッドレス省メモリ対応。
     """
-    conf = _config(name=__name__)
+    conf = lazy_config(name=__name__)
 
     def __init__(self, settings: Optional[DriverSettings] = None, **kwargs):
         self.settings = settings or DriverSettings()
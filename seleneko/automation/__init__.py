@@ -1,4 +1,10 @@
 from .driver_factory import DriverSettings
+from .driver_pool import DriverPool
+from .instrumentation import Instrumentation, JsonlSpanSink, OTelSpanSink
+from .profiles import ProfileTemplate
+from .network import BlockPolicy
+from .readiness import ReadyPolicy
+from .tabs import Tab, TabPool
 from .client_base import SeleniumClient as _BaseClient
 from .smart_actions import SmartActionsMixin
 
@@ -6,4 +12,14 @@ class SeleniumClient(SmartActionsMixin, _BaseClient):
     """Driver + BaseOps + SmartActions を統合した最終クライアント"""
     pass
 
-__all__ = ["SeleniumClient", "DriverSettings"]
+from .runner import Job, JobResult, JobRunner
+from .async_client import AsyncSeleniumClient
+from .scenarios import CompiledScenario, ScenarioError, compile_scenario, load_scenario
+
+__all__ = [
+    "SeleniumClient", "AsyncSeleniumClient", "DriverSettings", "DriverPool",
+    "Job", "JobResult", "JobRunner",
+    "CompiledScenario", "ScenarioError", "compile_scenario", "load_scenario",
+    "Instrumentation", "JsonlSpanSink", "OTelSpanSink", "ProfileTemplate", "BlockPolicy",
+    "ReadyPolicy", "Tab", "TabPool",
+]
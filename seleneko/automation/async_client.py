@@ -0,0 +1,143 @@
+"""
+asyncio から使う SeleniumClient。
+
+    async def main(urls):
+        async def title(url):
+            async with AsyncSeleniumClient(DriverSettings(headless=True)) as cli:
+                await cli.get(url)
+                return await cli.run(lambda c: c.driver.title)
+        return await asyncio.gather(*(title(u) for u in urls))
+
+ブロッキングな WebDriver 呼び出しは
+共有の上限付きスレッドプールで実行する。
+1つのクライアント（= 1つの driver）への呼び出しは順番に処理されるが、
+複数のクライアントは1つのイベントループ上で並行に動く。
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple, Union
+from selenium.common.exceptions import TimeoutException
+from .driver_factory import DriverSettings
+from .waits import PolicyWait
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def shared_executor(max_workers: Optional[int] = None) -> ThreadPoolExecutor:
+    """AsyncSeleniumClient 既定のスレッドプール（初回呼び出しで作成）。"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # スレッドは大半の時間ブラウザの応答待ちなので
+            # CPU 数より多めに取る
+            workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="seleneko-async")
+        return _executor
+
+
+class AsyncSeleniumClient:
+    """SeleniumClient の各操作を await できるようにしたラッパ。"""
+
+    def __init__(self, settings: Optional[DriverSettings] = None,
+                 executor: Optional[Executor] = None, client=None, **kwargs):
+        if client is None:
+            from . import SeleniumClient
+            client = SeleniumClient(settings, **kwargs)
+        self.client = client
+        self.settings = client.settings
+        self._executor = executor
+        # Python 3.9 の asyncio.Lock は生成時のイベントループに結び付くため、
+        # 最初の呼び出しで作る
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self):
+        await self._call(self.client._acquire_driver)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.quit()
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs):
+        """fn(client, *args, **kwargs) をこの driver 上で実行する。"""
+        return await self._call(fn, self.client, *args, **kwargs)
+
+    async def quit(self):
+        await self._call(self.client.quit)
+
+    # ---- navigation ----
+    async def get(self, url: str):
+        return await self._call(self.client.get, url)
+
+    async def login(self, url: str, user_locator: Tuple[str, str],
+                    pass_locator: Tuple[str, str], button_locator: Tuple[str, str],
+                    userid: str, password: str):
+        return await self._call(self.client.login, url, user_locator, pass_locator,
+                                button_locator, userid, password)
+
+    async def login_reusing_session(self, url: str, user_locator: Tuple[str, str],
+                                    pass_locator: Tuple[str, str], button_locator: Tuple[str, str],
+                                    userid: str, password: str, probe, **kwargs) -> bool:
+        return await self._call(self.client.login_reusing_session, url, user_locator, pass_locator,
+                                button_locator, userid, password, probe, **kwargs)
+
+    # ---- element ops ----
+    async def find_visible(self, key: str, method="xpath", timeout=None):
+        return await self._call(self.client.find_visible, key, method, timeout)
+
+    async def click_smart(self, locator: Tuple[str, str], **kwargs) -> bool:
+        return await self._call(self.client.click_smart, locator, **kwargs)
+
+    async def type_text_smart(self, locator: Tuple[str, str], text: str, **kwargs) -> bool:
+        return await self._call(self.client.type_text_smart, locator, text, **kwargs)
+
+    async def fill_form(self, fields: dict, **kwargs) -> dict:
+        return await self._call(self.client.fill_form, fields, **kwargs)
+
+    async def extract(self, spec) -> dict:
+        return await self._call(self.client.extract, spec)
+
+    # ---- expect helpers ----
+    # 判定条件の組み立てはブラウザと通信しないため同期のまま返す
+    # （click_smart の success に渡す）
+    def expect_url_change(self, from_url: str, timeout: int = 5) -> dict:
+        return self.client.expect_url_change(from_url, timeout)
+
+    def expect_appears(self, locator: Tuple[str, str], timeout: int = 5) -> dict:
+        return self.client.expect_appears(locator, timeout)
+
+    def expect_disappears(self, locator: Tuple[str, str], timeout: int = 5) -> dict:
+        return self.client.expect_disappears(locator, timeout)
+
+    async def wait_for(self, expectation: Union[dict, Callable],
+                       timeout: Optional[float] = None) -> bool:
+        """
+        expect_* の条件（または driver を受け取る関数）が成立するまで待つ。
+        時間切れは False。
+        """
+        if isinstance(expectation, dict):
+            timeout = timeout or expectation.get("timeout", 5)
+            expectation = expectation["callable"]
+        return await self._call(self._wait_blocking, expectation, timeout)
+
+    # ---- internal ----
+    def _wait_blocking(self, condition: Callable, timeout: Optional[float]) -> bool:
+        try:
+            PolicyWait(self.client.driver, timeout or self.settings.timeout_sec,
+                       self.settings.wait_policy).until(condition)
+            return True
+        except TimeoutException:
+            return False
+
+    async def _call(self, fn: Callable, *args, **kwargs):
+        # driver はスレッドセーフではないので、
+        # 同じクライアントへの呼び出しは直列化する
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor or shared_executor(),
+                                              functools.partial(fn, *args, **kwargs))
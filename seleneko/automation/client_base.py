@@ -1,15 +1,33 @@
+import functools
 import os
-from typing import Optional, Tuple, Union
+import time
+from typing import Callable, Optional, Tuple, Union
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait, Select
+from selenium.webdriver.support.ui import Select
 from selenium.webdriver.support import expected_conditions as EC
-from ..core import config as _config
-from .driver_factory import DriverSettings, create_driver, cleanup_tmpdir
+from selenium.common.exceptions import (
+    JavascriptException, NoSuchElementException, StaleElementReferenceException, TimeoutException,
+    WebDriverException,
+)
+from ..core import lazy_config
+from .driver_factory import DriverSettings, create_driver, cleanup_downloads, cleanup_tmpdir
+from .extraction import EXTRACT_JS, ExtractPlan, build_plan
+from .forms import FILL_JS, build_fill_entries
+from .network import PAGE_WEIGHT_JS, summarize_page_weight
+from .readiness import READY_CHECK_JS, READY_JS, ReadyPolicy
+from .downloads import DownloadWatcher
+from .snapshots import SnapshotWriter, capture, snapshot_meta
+from .contexts import ContextRegistry
+from .sessions import (
+    SessionSnapshot, SessionStore, capture_session, clear_session, origin_of, restore_session,
+)
+from .tabs import TabPool
+from .waits import PolicyWait
 
 
 class SeleniumClient:
-    conf = _config(name=__name__)
+    conf = lazy_config(name=__name__)
 
     _METHOD_MAP = {
         "id": By.ID, "name": By.NAME, "class": By.CLASS_NAME,
@@ -17,18 +35,43 @@ class SeleniumClient:
         "tag": By.TAG_NAME, "link_text": By.LINK_TEXT,
         "partial_link_text": By.PARTIAL_LINK_TEXT,
     }
+    _BY_VALUES = frozenset(_METHOD_MAP.values())
+    # ページ内で保持する要素参照の上限
+    _ELEMENT_CACHE_SIZE = 256
 
     def __init__(self, settings: Optional[DriverSettings] = None, **kwargs):
-        self.settings = settings or DriverSettings()
-        self.conf.set_data("browser", self.settings.browser)
+        pool = kwargs.get("pool")
+        if pool is not None and settings is not None and settings is not pool.settings:
+            # driver はプールの設定で起動済みなので、
+            # 別の設定は反映できない
+            raise ValueError("settings must be omitted or be pool.settings when pool is given")
+        self.settings = settings or (pool.settings if pool is not None else DriverSettings())
         work_directory = kwargs.get("work_directory") or os.path.join(os.getcwd(), self.conf.get_date_str_ymd())
         os.makedirs(work_directory, exist_ok=True)
-        self.conf.set_data("work_directory", work_directory)
+        with self.conf.batch():
+            self.conf.set_data("browser", self.settings.browser)
+            self.conf.set_data("work_directory", work_directory)
         self._driver = None
         self._tmpdir = None
+        self._pool = pool
+        self._leased = False
+        # (By, key) -> WebElement。ナビゲーション・frame/window 切替で破棄する
+        self._elements = {}
+        # driver の現在のウィンドウ / frame の記録（driver ごとに作り直す）
+        self._contexts = None
+        self._downloads_claimed = set()
+        self._download_results = []
+        # adaptive クリックで要素が安定するまでの時間
+        # （ロケータ別、settle_stats() で参照）
+        self._settle_stats = {}
+        self._snapshot_writer = kwargs.get("snapshot_writer")
+        self._session_store = kwargs.get("session_store")
+        self.instrumentation = kwargs.get("instrumentation")
+        if self.instrumentation is not None:
+            self.instrumentation.instrument_client(self)
 
     def __enter__(self):
-        self._driver, self._tmpdir = create_driver(self.settings, self.conf)
+        self._acquire_driver()
         return self
 
     def __exit__(self, exc_type, exc, tb):
@@ -37,7 +80,7 @@ class SeleniumClient:
     @property
     def driver(self):
         if self._driver is None:
-            self._driver, self._tmpdir = create_driver(self.settings, self.conf)
+            self._acquire_driver()
         return self._driver
 
     @driver.setter
@@ -48,82 +91,443 @@ class SeleniumClient:
             return
         if self._driver and self._driver is not value:
             try:
-                self._driver.quit()
+                self._release_driver()
             except Exception:
                 pass
-            cleanup_tmpdir(self._tmpdir)
-            self._tmpdir = None
         self._driver = value
+        self._elements.clear()
+        self._contexts = None
+        if self.instrumentation is not None:
+            self.instrumentation.attach(value)
 
     def quit(self):
+        self._release_driver()
+
+    def _acquire_driver(self):
+        """プール指定時は借用、それ以外は新規に driver を起動する。"""
+        if self._pool is not None:
+            self._driver = self._pool.checkout()
+            self._leased = True
+        else:
+            self._driver, self._tmpdir = create_driver(self.settings, self.conf)
+        if self.instrumentation is not None:
+            self.instrumentation.attach(self._driver)
+
+    def _release_driver(self):
+        """
+        借用中ならプールへ返却、
+        それ以外は終了して一時プロファイルを削除する。
+        """
+        driver, self._driver = self._driver, None
+        self._elements.clear()
+        self._contexts = None
+        if self.instrumentation is not None:
+            self.instrumentation.detach(driver)
+        if self._leased:
+            self._leased = False
+            if driver is not None:
+                self._pool.checkin(driver)
+            return
         try:
-            if self._driver:
-                self._driver.quit()
+            if driver:
+                driver.quit()
         finally:
-            cleanup_tmpdir(self._tmpdir)
-            self._driver = None
+            cleanup_tmpdir(self._tmpdir, background=self.settings.defer_cleanup)
+            cleanup_downloads(driver, background=self.settings.defer_cleanup)
             self._tmpdir = None
 
     # ---- element ops ----
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _by(cls, method: str):
+        """'css' などの短縮名、または解決済みの By 値を By 値に変換する。"""
+        m = method.lower()
+        by = cls._METHOD_MAP.get(m)
+        if by is None and m in cls._BY_VALUES:
+            return m
+        return by
+
+    def _wait(self, timeout=None, locator=None) -> PolicyWait:
+        """
+        settings.wait_policy に従う待機オブジェクト。
+        locator は DOM 変化監視に使う。
+        """
+        return PolicyWait(self.driver, timeout or self.settings.timeout_sec,
+                          self.settings.wait_policy, locator)
+
+    def _locate(self, locator: Tuple[str, str], timeout=None, clickable=False):
+        """
+        キャッシュ済みの要素がまだ表示（clickable なら有効）されていれば
+        それを返し、なければ待機して取得しキャッシュする。
+        古い参照は捨てて取り直す。
+        """
+        elem = self._elements.get(locator)
+        if elem is not None:
+            try:
+                if elem.is_displayed() and (not clickable or elem.is_enabled()):
+                    return elem
+            except StaleElementReferenceException:
+                self._elements.pop(locator, None)
+        cond = EC.element_to_be_clickable if clickable else EC.visibility_of_element_located
+        elem = self._wait(timeout, locator).until(cond(locator))
+        if len(self._elements) >= self._ELEMENT_CACHE_SIZE:
+            self._elements.clear()
+        self._elements[locator] = elem
+        return elem
+
+    def _act(self, locator: Tuple[str, str], action, timeout=None, clickable=False):
+        """
+        要素に action を行う。
+        途中で参照が古くなったら取り直して1回だけやり直す。
+        """
+        try:
+            return action(self._locate(locator, timeout, clickable))
+        except StaleElementReferenceException:
+            self._elements.pop(locator, None)
+            return action(self._locate(locator, timeout, clickable))
+
+    def invalidate_elements(self):
+        """キャッシュした要素参照をすべて破棄する。"""
+        self._elements.clear()
+
     def find_visible(self, key: str, method="xpath", timeout=None):
-        by = self._METHOD_MAP.get(method.lower())
-        wait = WebDriverWait(self.driver, timeout or self.settings.timeout_sec)
-        return wait.until(EC.visibility_of_element_located((by, key)))
+        return self._locate((self._by(method), key), timeout)
 
     def click(self, key: str, method="xpath", timeout=None):
-        by = self._METHOD_MAP.get(method.lower())
-        elem = WebDriverWait(self.driver, timeout or self.settings.timeout_sec).until(EC.element_to_be_clickable((by, key)))
-        elem.click()
-        return elem
+        def _click(elem):
+            elem.click()
+            return elem
+        return self._act((self._by(method), key), _click, timeout, clickable=True)
 
     def type_text(self, key: str, text: str, method="xpath", clear_first=True, enter=False):
-        elem = self.find_visible(key, method)
-        if clear_first:
+        def _type(elem):
+            if clear_first:
+                try: elem.clear()
+                except StaleElementReferenceException: raise
+                except Exception: pass
+            elem.send_keys(text)
+            if enter:
+                elem.send_keys(Keys.ENTER)
+            return elem
+        return self._act((self._by(method), key), _type)
+
+    def fill_form(self, fields: dict, timeout=None) -> dict:
+        """
+        {(method, key): value} をまとめて1回の execute_script で入力し、
+        input / change を発火して確認する。
+        ブラウザ内で設定できなかったフィールドだけ、
+        要素の表示を待って send_keys / Select で入れ直す。
+        フィールドごとの成否 {(method, key): bool} を返す。
+        """
+        entries = build_fill_entries(fields, self._by)
+        results = self.driver.execute_script(FILL_JS, entries) if entries else []
+        if not isinstance(results, list) or len(results) != len(entries):
+            # スクリプトが使えない driver では
+            # 全フィールドを従来の方法で入力する
+            results = [("missing", None)] * len(entries)
+        filled = {}
+        for locator, (by, key, value), (status, tag) in zip(fields, entries, results):
+            filled[locator] = status == "ok" or self._fill_natively((by, key), value, tag, timeout)
+        return filled
+
+    def _fill_natively(self, locator: Tuple[str, str], value, tag: Optional[str],
+                       timeout=None) -> bool:
+        def _fill(elem):
+            if isinstance(value, bool):
+                if elem.is_selected() != value:
+                    elem.click()
+                return elem.is_selected() == value
+            if tag == "select":
+                select = Select(elem)
+                for v in value if isinstance(value, list) else [value]:
+                    try:
+                        select.select_by_value(str(v))
+                    except WebDriverException:
+                        select.select_by_visible_text(str(v))
+                return True
             try: elem.clear()
+            except StaleElementReferenceException: raise
             except Exception: pass
-        elem.send_keys(text)
-        if enter:
-            elem.send_keys(Keys.ENTER)
-        return elem
+            elem.send_keys(str(value))
+            return str(value) in (elem.get_attribute("value") or "")
+        try:
+            return bool(self._act(locator, _fill, timeout))
+        except (TimeoutException, WebDriverException):
+            return False
 
     def select_by_text(self, key: str, visible_text: str, method="xpath"):
-        elem = self.find_visible(key, method)
-        Select(elem).select_by_visible_text(visible_text)
-        return elem
+        def _select(elem):
+            Select(elem).select_by_visible_text(visible_text)
+            return elem
+        return self._act((self._by(method), key), _select)
 
     def select_by_index(self, key: str, index: int, method="xpath"):
-        elem = self.find_visible(key, method)
-        Select(elem).select_by_index(index)
-        return elem
+        def _select(elem):
+            Select(elem).select_by_index(index)
+            return elem
+        return self._act((self._by(method), key), _select)
+
+    @property
+    def contexts(self) -> ContextRegistry:
+        """現在のウィンドウ / frame とウィンドウ一覧のキャッシュ"""
+        if self._contexts is None or self._contexts.driver is not self.driver:
+            self._contexts = ContextRegistry(self.driver)
+        return self._contexts
 
     def switch_to_frame(self, key: Union[str, int] = 0, method="xpath"):
-        self.driver.switch_to.default_content()
-        if isinstance(key, int):
-            self.driver.switch_to.frame(key)
-        else:
-            frame_elem = self.find_visible(key, method)
-            self.driver.switch_to.frame(frame_elem)
+        """
+        トップレベル文書の frame に切り替える。
+        frame 要素の参照はウィンドウごとにキャッシュする。
+        """
+        frame = key if isinstance(key, int) else (self._by(method), key)
+        if self.contexts.switch_frame((frame,), self._locate_frame):
+            self._elements.clear()
+
+    def _locate_frame(self, locator: Tuple[str, str]):
+        # 切替の途中なので、元の文書でキャッシュした要素は使わない
+        self._elements.clear()
+        return self._locate(locator)
+
+    def switch_to_default_content(self):
+        if self.contexts.switch_frame((), None):
+            self._elements.clear()
+
+    def switch_to_window(self, handle: str):
+        """
+        handle のウィンドウに切り替える。
+        すでにそのウィンドウのトップレベルにいれば何もしない。
+        """
+        if self.contexts.switch_window(handle):
+            self._elements.clear()
 
     def switch_to_window_by_title(self, title: str, timeout=None):
-        wait = WebDriverWait(self.driver, timeout or self.settings.timeout_sec)
-        wait.until(lambda d: any(self._switch_if_title(d, h, title) for h in d.window_handles))
+        contexts = self.contexts
+        handle = self._wait(timeout).until(lambda d: contexts.find_window(title))
+        self.switch_to_window(handle)
+
+    # ---- batched reads ----
+    @classmethod
+    def compile_extract(cls, spec: dict) -> ExtractPlan:
+        """
+        extract 用の spec を検証・解決しておく。
+        同じ spec を繰り返し使うときに先に呼んでおく。
+        """
+        return build_plan(spec, cls._by)
+
+    def extract(self, spec: Union[dict, ExtractPlan]) -> dict:
+        """
+        複数要素のテキスト・属性を1回の execute_script でまとめて取得する。
+        spec の書式は seleneko.automation.extraction を参照。
+        見つからない要素は None。
+        """
+        plan = self.compile_extract(spec)
+        return self.driver.execute_script(EXTRACT_JS, plan.entries) or {}
 
-    @staticmethod
-    def _switch_if_title(driver, handle, title) -> bool:
-        driver.switch_to.window(handle)
-        return driver.title == title
+    # ---- downloads ----
+    @property
+    def download_dir(self) -> str:
+        """
+        この driver のダウンロード先
+        （isolate_downloads 時はセッション専用のサブディレクトリ）
+        """
+        return (getattr(self.driver, "download_dir", None) or self.settings.download_dir
+                or self.conf.get_data("work_directory"))
+
+    def expect_download(self, pattern: str = "*", timeout: float = 60.0) -> DownloadWatcher:
+        """
+        これから始まるダウンロードの完了を待つ watcher を返す。
+        クリック等の前に呼び、後で wait() するか with 文で囲む。
+        複数同時に使える。
+        """
+        return DownloadWatcher(self.download_dir, pattern, timeout,
+                               claimed=self._downloads_claimed,
+                               on_complete=self._download_results.append)
+
+    def download_stats(self) -> dict:
+        """
+        完了したダウンロードの件数・合計サイズ・平均時間・
+        スループット（bytes/秒）
+        """
+        results = list(self._download_results)
+        size = sum(r.size for r in results)
+        duration = sum(r.duration for r in results)
+        return {
+            "count": len(results),
+            "bytes": size,
+            "avg_duration": duration / len(results) if results else 0.0,
+            "throughput": size / duration if duration > 0 else 0.0,
+        }
+
+    # ---- snapshots ----
+    @property
+    def snapshot_writer(self) -> SnapshotWriter:
+        """
+        スナップショットの書き込みスレッド
+        （未指定なら work_directory/snapshots に作成）
+        """
+        if self._snapshot_writer is None:
+            root = os.path.join(self.conf.get_data("work_directory"), "snapshots")
+            self._snapshot_writer = SnapshotWriter(root, self.settings.snapshot_compression)
+        return self._snapshot_writer
+
+    def snapshot(self, label: Optional[str] = None, screenshot=True, dom=True, console=True):
+        """
+        スクリーンショット・DOM・コンソールログを取得し、
+        書き込みは別スレッドに任せる。
+        保存結果（id / label / url / files）を返す Future を返す。
+        """
+        parts = capture(self.driver, screenshot, dom, console)
+        return self.snapshot_writer.submit(parts, snapshot_meta(self.driver, label))
 
     # ---- navigation ----
-    def get(self, url: str):
+    def get(self, url: str, ready=None):
+        """url を開き、ready（既定: settings.ready）の条件を満たすまで待つ。"""
+        self._elements.clear()
         self.driver.get(url)
-        WebDriverWait(self.driver, 6).until(
-            lambda d: d.execute_script("return document.readyState") in ("interactive", "complete")
-        )
+        if self._contexts is not None:
+            self._contexts.navigated()
+        self.wait_ready(ready)
+
+    def wait_ready(self, ready=None):
+        """
+        現在のページが ReadyPolicy の条件を満たすまで待つ。
+        時間切れは TimeoutException。
+        """
+        policy = self.settings.ready if ready is None else ReadyPolicy.coerce(ready)
+        timeout = policy.timeout or self.settings.timeout_sec
+        if not policy.in_page:
+            self._wait(timeout).until(
+                lambda d: d.execute_script("return document.readyState") in policy.ready_states
+            )
+            return
+        loc = None
+        if policy.selector is not None:
+            by = self._by(str(policy.selector[0]))
+            if by is None:
+                raise ValueError(f"unknown locator method {policy.selector[0]!r}")
+            loc = [by, str(policy.selector[1])]
+        args = [list(policy.ready_states), policy.network_idle, loc, policy.predicate]
+        end = time.monotonic() + timeout
+        while True:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(f"Page was not ready within {timeout}s: {policy!r}")
+            # script timeout を超えないよう区切って待つ。
+            # 遷移で中断されたら取り直す
+            limit_ms = int(min(remaining, self.settings.wait_policy.observer_slice) * 1000)
+            try:
+                if self.driver.execute_async_script(READY_JS, *args, limit_ms):
+                    return
+            except (WebDriverException, AttributeError):
+                break
+        # 非同期スクリプトが使えない・遷移中で失敗した場合は
+        # 1回ずつの確認に切り替える
+        wait = PolicyWait(self.driver, max(end - time.monotonic(), 0.001),
+                          self.settings.wait_policy,
+                          ignored_exceptions=(NoSuchElementException, JavascriptException))
+        wait.until(lambda d: d.execute_script(READY_CHECK_JS, *args),
+                   f"Page was not ready within {timeout}s: {policy!r}")
+
+    def tabs(self, size: int = 4, max_uses: Optional[int] = 50) -> TabPool:
+        """
+        この driver 内に size 個のタブを開いて並行に読み込む TabPool を返す。
+        with 文で使う。
+        """
+        return TabPool(self, size, max_uses)
+
+    def page_weight(self) -> dict:
+        """
+        現在のページの転送量と、
+        settings.block によってブロックされたリクエスト数を返す。
+        estimated_bytes_saved は
+        ブロック件数 × 種別ごとの代表サイズによる見積もり。
+        別オリジンのリソースは読み込めてもサイズ 0 になりうるため、
+        possibly_blocked と estimated_bytes_saved_max（上限）に分ける。
+        """
+        raw = self.driver.execute_script(PAGE_WEIGHT_JS)
+        return summarize_page_weight(raw, self.settings.block)
 
     def login(self, url: str, user_locator: Tuple[str, str],
               pass_locator: Tuple[str, str], button_locator: Tuple[str, str],
               userid: str, password: str):
         self.get(url)
-        self.type_text(user_locator[1], userid, method=user_locator[0])
-        self.type_text(pass_locator[1], password, method=pass_locator[0])
+        filled = self.fill_form({tuple(user_locator): userid, tuple(pass_locator): password})
+        missing = [locator for locator, ok in filled.items() if not ok]
+        if missing:
+            raise TimeoutException(f"Could not fill login fields: {missing}")
         self.click(button_locator[1], method=button_locator[0])
+
+    # ---- session reuse ----
+    @property
+    def session_store(self) -> SessionStore:
+        """
+        ログイン状態の保存先（未指定なら config に暗号化して保存する）
+        """
+        if self._session_store is None:
+            self._session_store = SessionStore(self.conf)
+        return self._session_store
+
+    def save_session(self, user: str, site: Optional[str] = None) -> SessionSnapshot:
+        """
+        現在の cookie / localStorage / sessionStorage を site・user をキーに保存する。
+        """
+        store = self.session_store
+        snapshot = capture_session(self.driver, site or origin_of(self.driver.current_url), user,
+                                   store.max_age)
+        store.save(snapshot)
+        return snapshot
+
+    def restore_session(self, user: str, probe: Union[Tuple[str, str], Callable], site: str,
+                        probe_url: Optional[str] = None, timeout: float = 5) -> bool:
+        """
+        保存したログイン状態を流し込み、
+        probe_url（既定: 保存時のページ）で probe を確かめる。
+        probe はログイン中にだけ表示されるロケータ、
+        または driver を受け取る判定関数。
+        保存分がない・期限切れ・probe 不成立なら False
+        （不成立時は保存分と流し込んだ状態を消す）。
+        """
+        store = self.session_store
+        snapshot = store.load(site, user)
+        if snapshot is None:
+            return False
+        self._elements.clear()
+        restore_session(self.driver, snapshot)
+        self.get(probe_url or snapshot.url)
+        if self._probe(probe, timeout):
+            return True
+        store.delete(site, user)
+        clear_session(self.driver)
+        return False
+
+    def login_reusing_session(self, url: str, user_locator: Tuple[str, str],
+                              pass_locator: Tuple[str, str], button_locator: Tuple[str, str],
+                              userid: str, password: str, probe: Union[Tuple[str, str], Callable],
+                              site: Optional[str] = None, probe_url: Optional[str] = None,
+                              probe_timeout: float = 5) -> bool:
+        """
+        保存済みのログイン状態が使えればそれで済ませ（True）、
+        使えなければ login して probe が成立した状態を保存する（False）。
+        site の既定は url のオリジン。
+        """
+        site = site or origin_of(url)
+        if self.restore_session(userid, probe, site, probe_url, probe_timeout):
+            return True
+        self.login(url, user_locator, pass_locator, button_locator, userid, password)
+        if self._probe(probe, probe_timeout):
+            self.save_session(userid, site)
+        else:
+            self.conf.write_log(f"Login to {site} could not be confirmed; session not saved",
+                                species="WARNING")
+        return False
+
+    def _probe(self, probe: Union[Tuple[str, str], Callable], timeout: float) -> bool:
+        if callable(probe):
+            cond = probe
+        else:
+            cond = EC.visibility_of_element_located((self._by(probe[0]), probe[1]))
+        try:
+            self._wait(timeout).until(cond)
+            return True
+        except TimeoutException:
+            return False
@@ -0,0 +1,277 @@
+"""
+ウィンドウと frame の切替を覚えておくレジストリ。
+
+driver の現在のウィンドウ・frame を記録し、
+すでに目的のウィンドウのトップレベルにいる切替は
+往復なしで済ませる。
+frame はクリックや JS のリダイレクトで知らないうちに外れるため
+毎回入り直すが、ウィンドウごとに frame 要素の参照をキャッシュして
+要素検索を省く。
+タイトル / URL もキャッシュし、タイトル検索は Chromium なら
+CDP の Target.getTargets 1回で全ウィンドウ分をまとめて取得する。
+
+seleneko を経由せずに driver.switch_to を呼んだ場合は
+invalidate() で記録を捨てること。
+"""
+import time
+from typing import Dict, Optional, Tuple, Union
+from selenium.common.exceptions import (
+    NoSuchFrameException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+)
+
+# frame の指定: インデックス、または (By, key)
+FrameKey = Union[int, Tuple[str, str]]
+
+
+class WindowInfo:
+    """1ウィンドウ分のキャッシュ"""
+    __slots__ = ("handle", "title", "url", "checked_at", "frames")
+
+    def __init__(self, handle: str):
+        self.handle = handle
+        self.title: Optional[str] = None
+        self.url: Optional[str] = None
+        self.checked_at = 0.0
+        # トップレベル文書内の frame 要素（FrameKey -> WebElement）
+        self.frames: Dict[FrameKey, object] = {}
+
+    def __repr__(self):
+        return f"WindowInfo(handle={self.handle!r}, title={self.title!r}, url={self.url!r})"
+
+
+class ContextRegistry:
+    """
+    1つの driver の現在位置（ウィンドウ・frame）と
+    ウィンドウ一覧を管理する。
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.windows: Dict[str, WindowInfo] = {}
+        self._current: Optional[str] = None
+        # 現在の frame（None は不明、() はトップレベル）
+        self._frame: Optional[Tuple[FrameKey, ...]] = None
+        # CDP で一覧を取れるか（None は未確認）
+        self._cdp: Optional[bool] = None
+        self._stats = {"switches": 0, "skipped": 0, "probes": 0, "batched_refreshes": 0}
+
+    # ---- current context ----
+    @property
+    def current(self) -> str:
+        if self._current is None:
+            self._current = self.driver.current_window_handle
+            self.windows.setdefault(self._current, WindowInfo(self._current))
+        return self._current
+
+    @property
+    def known_current(self) -> Optional[str]:
+        """記録上の現在のウィンドウ（不明なら None。driver に聞かない）"""
+        return self._current
+
+    @property
+    def frame(self) -> Optional[Tuple[FrameKey, ...]]:
+        return self._frame
+
+    def invalidate(self):
+        """driver を直接操作した後など、現在位置の記録を捨てる。"""
+        self._current = None
+        self._frame = None
+
+    def navigated(self):
+        """
+        現在のウィンドウでページ遷移した。
+        frame 位置と frame 参照を破棄する。
+        """
+        if self._current is not None:
+            info = self.windows.get(self._current)
+            if info is not None:
+                info.frames.clear()
+                info.title = info.url = None
+            self._frame = ()
+
+    # ---- windows ----
+    def switch_window(self, handle: str) -> bool:
+        """
+        handle のトップレベルに切り替える。
+        すでにそこにいれば何もせず False を返す。
+        """
+        if self._current == handle and self._frame == ():
+            self._stats["skipped"] += 1
+            return False
+        if self._current == handle:
+            self.driver.switch_to.default_content()
+        else:
+            self.driver.switch_to.window(handle)
+        self._current = handle
+        self._frame = ()
+        self.windows.setdefault(handle, WindowInfo(handle))
+        self._stats["switches"] += 1
+        return True
+
+    def open_window(self, kind: str = "tab") -> str:
+        """
+        新しいタブ / ウィンドウを開いてそこに切り替え、handle を返す。
+        """
+        self.driver.switch_to.new_window(kind)
+        self._current = self.driver.current_window_handle
+        self._frame = ()
+        self.windows[self._current] = WindowInfo(self._current)
+        return self._current
+
+    def close_window(self, handle: str):
+        """
+        handle のウィンドウを閉じる。
+        閉じた後はどのウィンドウにもいない状態になる。
+        """
+        try:
+            if self._current != handle:
+                self.driver.switch_to.window(handle)
+            self.driver.close()
+        except NoSuchWindowException:
+            pass
+        self.windows.pop(handle, None)
+        self._current = None
+        self._frame = None
+
+    def refresh(self) -> Dict[str, WindowInfo]:
+        """
+        ウィンドウ一覧とタイトル / URL を取り直す。
+        Chromium は CDP 1回、それ以外は各ウィンドウに切り替えて読む
+        （最後は元のウィンドウに戻る）。
+        """
+        handles = self._sync_handles()
+        if not self._refresh_cdp(handles):
+            origin, origin_frame = self._current, self._frame
+            for handle in handles:
+                self._probe(handle)
+            if origin in self.windows and origin != self._current:
+                self.driver.switch_to.window(origin)
+                self._current, self._frame = origin, ()
+            elif origin == self._current:
+                self._frame = origin_frame
+        return self.windows
+
+    def find_window(self, title: str) -> Optional[str]:
+        """
+        タイトルが title のウィンドウの handle（なければ None）。
+        現在のウィンドウを優先する。
+        CDP が使えない場合は、キャッシュ上でタイトルが一致する
+        ウィンドウから順に切り替えて確かめ、
+        見つかった時点でそのウィンドウに留まる。
+        """
+        if self._current is not None:
+            info = self.windows.setdefault(self._current, WindowInfo(self._current))
+            try:
+                info.title, info.checked_at = self.driver.title, time.monotonic()
+            except NoSuchWindowException:
+                # 現在のウィンドウが自分で閉じた
+                # （ポップアップの window.close() など）
+                self.windows.pop(self._current, None)
+                self._current = self._frame = None
+            else:
+                if info.title == title:
+                    return self._current
+        handles = self._sync_handles()
+        if self._refresh_cdp(handles):
+            return next((h for h in handles if self.windows[h].title == title), None)
+        for handle in sorted(handles, key=lambda h: self.windows[h].title != title):
+            if handle == self._current:
+                continue
+            if self._probe(handle).title == title:
+                return handle
+        return None
+
+    # ---- frames ----
+    def switch_frame(self, path: Tuple[FrameKey, ...], locate) -> bool:
+        """
+        現在のウィンドウで path の frame に切り替える。
+        path が () ですでにトップレベルにいれば何もせず False。
+        frame へはページ側の遷移で外れていることがあるので、
+        記録上そこにいてもトップレベルから入り直す。
+        locate(key) は frame 要素を探す関数
+        （キャッシュがない・古い場合にだけ呼ばれる）。
+        """
+        if not path and self._frame == () and self._current is not None:
+            self._stats["skipped"] += 1
+            return False
+        info = self.windows.setdefault(self.current, WindowInfo(self.current))
+        if self._frame != ():
+            self.driver.switch_to.default_content()
+        self._frame = ()
+        for depth, key in enumerate(path):
+            self._enter_frame(info if depth == 0 else None, key, locate)
+            self._frame = path[:depth + 1]
+        self._stats["switches"] += 1
+        return True
+
+    def stats(self) -> dict:
+        stats = dict(self._stats)
+        stats["windows"] = len(self.windows)
+        return stats
+
+    # ---- internal ----
+    def _enter_frame(self, info: Optional[WindowInfo], key: FrameKey, locate):
+        if isinstance(key, int):
+            self.driver.switch_to.frame(key)
+            return
+        # 参照をキャッシュするのはトップレベル文書の frame だけ
+        # （入れ子は親 frame ごとに変わるため）
+        elem = info.frames.get(key) if info is not None else None
+        if elem is not None:
+            try:
+                self.driver.switch_to.frame(elem)
+                return
+            except (StaleElementReferenceException, NoSuchFrameException):
+                info.frames.pop(key, None)
+        elem = locate(key)
+        self.driver.switch_to.frame(elem)
+        if info is not None:
+            info.frames[key] = elem
+
+    def _refresh_cdp(self, handles) -> bool:
+        if self._cdp is False or not hasattr(self.driver, "execute_cdp_cmd"):
+            return False
+        try:
+            targets = self.driver.execute_cdp_cmd("Target.getTargets", {}).get("targetInfos", [])
+        except Exception:
+            # Firefox（RuntimeError）や CDP を中継しないリモートなど
+            self._cdp = False
+            return False
+        # chromedriver のウィンドウ handle は DevTools の targetId と一致する
+        pages = {t["targetId"]: t for t in targets if t.get("type") == "page"}
+        if not set(handles) <= set(pages):
+            self._cdp = False
+            return False
+        self._cdp = True
+        now = time.monotonic()
+        for handle in handles:
+            info = self.windows[handle]
+            page = pages[handle]
+            info.title, info.url, info.checked_at = page.get("title"), page.get("url"), now
+        self._stats["batched_refreshes"] += 1
+        return True
+
+    def _sync_handles(self):
+        handles = list(self.driver.window_handles)
+        for handle in list(self.windows):
+            if handle not in handles:
+                del self.windows[handle]
+        for handle in handles:
+            self.windows.setdefault(handle, WindowInfo(handle))
+        return handles
+
+    def _probe(self, handle: str) -> WindowInfo:
+        """
+        handle に切り替えてタイトルと URL を読む。
+        切り替えたまま元のウィンドウには戻らない。
+        """
+        if handle != self._current:
+            self.driver.switch_to.window(handle)
+            self._current, self._frame = handle, ()
+        info = self.windows[handle]
+        info.title, info.url = self.driver.title, self.driver.current_url
+        info.checked_at = time.monotonic()
+        self._stats["probes"] += 1
+        return info
@@ -0,0 +1,225 @@
+"""
+ダウンロード完了の検出。
+
+    with cli.expect_download("*.csv", timeout=60) as dl:
+        cli.click("//a[@id='export']")
+    print(dl.result.path, dl.result.size, dl.result.duration)
+
+Linux では inotify でディレクトリの変化を待ち、
+それ以外ではポーリングで確認する。
+.crdownload（Chrome / Edge）や .part（Firefox）が残っている間は未完了とみなす。
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from typing import Dict, Optional, Set, Tuple
+
+# ダウンロード途中のファイルに付く拡張子
+PARTIAL_SUFFIXES = (".crdownload", ".part", ".download", ".tmp")
+
+# inotify(7)
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+_libc = None
+_libc_lock = threading.Lock()
+_claim_lock = threading.Lock()
+
+
+def _load_libc():
+    global _libc
+    with _libc_lock:
+        if _libc is None:
+            _libc = False
+            if sys.platform.startswith("linux"):
+                try:
+                    libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+                    libc.inotify_init1, libc.inotify_add_watch  # 古い libc では存在しない
+                    _libc = libc
+                except (OSError, AttributeError):
+                    pass
+        return _libc
+
+
+class _Inotify:
+    """
+    ディレクトリの変化を待つだけの最小限の inotify ラッパ。
+    使えなければ OSError。
+    """
+
+    def __init__(self, directory: str):
+        libc = _load_libc()
+        if not libc:
+            raise OSError("inotify is not available")
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, "inotify_add_watch failed")
+
+    def wait(self, timeout: float) -> bool:
+        """
+        変化があれば True。
+        イベント内容は読み捨てる（呼び出し側で再走査する）。
+        """
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+@dataclass
+class DownloadResult:
+    path: str
+    size: int
+    duration: float
+
+    @property
+    def throughput(self) -> float:
+        """bytes / 秒"""
+        return self.size / self.duration if self.duration > 0 else 0.0
+
+
+class DownloadWatcher:
+    """
+    作成時点のディレクトリ内容を基準に、
+    pattern に一致する新しいファイルの完了を待つ。
+    claimed を共有した watcher 同士は同じファイルを重複して返さない。
+    """
+
+    def __init__(self, directory: str, pattern: str = "*", timeout: float = 60.0,
+                 poll_interval: float = 0.2, claimed: Optional[Set[Tuple[str, int]]] = None,
+                 on_complete=None, stable_for: float = 0.25):
+        self.directory = directory
+        self.pattern = pattern
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.stable_for = stable_for
+        self.result: Optional[DownloadResult] = None
+        self._claimed = claimed if claimed is not None else set()
+        self._on_complete = on_complete
+        os.makedirs(directory, exist_ok=True)
+        try:
+            self._inotify: Optional[_Inotify] = _Inotify(directory)
+        except OSError:
+            self._inotify = None
+        self._baseline = self._snapshot()
+        # 完了候補: name -> (mtime, size, 最初にその状態を見た時刻)
+        self._candidates: Dict[str, Tuple[int, int, float]] = {}
+        self._started = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.wait()
+        else:
+            self.close()
+
+    def wait(self, timeout: Optional[float] = None) -> DownloadResult:
+        """
+        完了したダウンロードを返す。
+        timeout 秒以内に完了しなければ TimeoutError。
+        """
+        if self.result is not None:
+            return self.result
+        end = self._started + (self.timeout if timeout is None else timeout)
+        try:
+            while True:
+                found = self._check()
+                if found is not None:
+                    return found
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"download matching {self.pattern!r} "
+                                       f"did not finish in {self.directory}")
+                # 候補があれば書き込みが止まったかを確かめに起きる
+                pause = min(remaining, self.stable_for) if self._candidates else remaining
+                if self._inotify is not None:
+                    # イベントの取りこぼしに備えて上限付きで待つ
+                    self._inotify.wait(min(pause, 1.0))
+                else:
+                    time.sleep(min(self.poll_interval, pause))
+        finally:
+            self.close()
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    # ---- internal ----
+    def _snapshot(self):
+        files = {}
+        try:
+            with os.scandir(self.directory) as it:
+                for e in it:
+                    try:
+                        if e.is_file():
+                            files[e.name] = e.stat().st_mtime_ns
+                    except FileNotFoundError:
+                        # 走査中にリネームされた途中ファイル
+                        pass
+        except FileNotFoundError:
+            pass
+        return files
+
+    def _check(self) -> Optional[DownloadResult]:
+        current = self._snapshot()
+        names = set(current)
+        now = time.monotonic()
+        for name, mtime in sorted(current.items(), key=lambda kv: kv[1]):
+            if self._baseline.get(name) == mtime or name.endswith(PARTIAL_SUFFIXES):
+                continue
+            if not fnmatch(name, self.pattern):
+                continue
+            # Firefox は最終名の空ファイルと .part を並べて作るため、
+            # 相方が残っていれば未完了
+            if any(name + suffix in names for suffix in PARTIAL_SUFFIXES):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            # 途中ファイルを使わずに直接書き込まれる場合に備え、
+            # stable_for 秒変化がないことを確かめる
+            seen = self._candidates.get(name)
+            if seen is None or seen[:2] != (mtime, size):
+                self._candidates[name] = (mtime, size, now)
+                if self.stable_for > 0:
+                    continue
+            elif now - seen[2] < self.stable_for:
+                continue
+            with _claim_lock:
+                if (path, mtime) in self._claimed:
+                    continue
+                self._claimed.add((path, mtime))
+            self.result = DownloadResult(path, size, time.monotonic() - self._started)
+            if self._on_complete is not None:
+                self._on_complete(self.result)
+            return self.result
+        return None
+
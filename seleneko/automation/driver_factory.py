@@ -9,6 +9,11 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.edge.service import Service as EdgeService
 from ..core import config as _config
+from .waits import WaitPolicy
+from .profiles import ProfileTemplate, reaper
+from .network import BlockPolicy, apply_block_policy
+from .readiness import ReadyPolicy, install_request_tracker
+from .transport import tune_connection
 
 
 class DriverSettings:
@@ -22,6 +27,20 @@ class DriverSettings:
         tmp_profile=True,
         timeout_sec=15,
         page_load_strategy="eager",
+        adaptive_click=False,
+        settle_timeout=1.0,
+        wait_policy=None,
+        profile_template=None,
+        defer_cleanup=False,
+        block=None,
+        keep_alive=True,
+        http_pool_size=None,
+        http_retries=None,
+        http_timeout=None,
+        isolate_downloads=False,
+        snapshot_compression="auto",
+        remote_url=None,
+        ready=None,
     ):
         self.browser = browser
         self.window_size = window_size
@@ -31,6 +50,39 @@ class DriverSettings:
         self.tmp_profile = tmp_profile
         self.timeout_sec = timeout_sec
         self.page_load_strategy = page_load_strategy
+        # click_smart の固定 sleep をブラウザ内の位置安定待ちに置き換える
+        self.adaptive_click = adaptive_click
+        self.settle_timeout = settle_timeout
+        # find_visible / click / get などすべての待機で使うポーリング方針
+        self.wait_policy = wait_policy or WaitPolicy()
+        # 指定時は一時プロファイルを空から作らず、
+        # テンプレート（パスまたは ProfileTemplate）を複製する
+        if isinstance(profile_template, str):
+            profile_template = ProfileTemplate(profile_template, browser=browser)
+        self.profile_template = profile_template
+        # 一時プロファイルの削除をバックグラウンドで行う
+        # （既定は quit 時にその場で削除）
+        self.defer_cleanup = defer_cleanup
+        # 読み込ませないリソース
+        # （BlockPolicy、リソース種別/URL glob のリスト、または dict）
+        self.block = BlockPolicy.coerce(block)
+        # driver へのコマンド送信の HTTP 接続
+        # （None は Selenium の既定値のまま）
+        self.keep_alive = keep_alive
+        self.http_pool_size = http_pool_size
+        self.http_retries = http_retries
+        self.http_timeout = http_timeout
+        # セッションごとに download_dir 配下の専用サブディレクトリへ
+        # ダウンロードする（quit 時に削除）
+        self.isolate_downloads = isolate_downloads
+        # snapshot() の DOM / ログの圧縮方式（"auto" / "zstd" / "gzip" / None）
+        self.snapshot_compression = snapshot_compression
+        # 指定時はローカルのブラウザを起動せず、
+        # この URL の WebDriver サーバ（Grid やスタブ）に接続する
+        self.remote_url = remote_url
+        # get() が読み込み完了とみなす条件
+        # （ReadyPolicy または dict。既定は readyState のみ）
+        self.ready = ReadyPolicy.coerce(ready)
 
 
 def create_driver(settings: DriverSettings, conf: _config):
@@ -39,6 +91,8 @@ def create_driver(settings: DriverSettings, conf: _config):
     headless = settings.headless or browser in ("headless_chrome", "ch")
     download_dir = settings.download_dir or conf.get_data("work_directory")
     os.makedirs(download_dir, exist_ok=True)
+    if settings.isolate_downloads:
+        download_dir = tempfile.mkdtemp(prefix="downloads-", dir=download_dir)
 
     tmpdir = None
     driver = None
@@ -46,44 +100,106 @@ def create_driver(settings: DriverSettings, conf: _config):
     if browser in ("chrome", "c", "headless_chrome", "ch"):
         options = ChromeOptions()
         _apply_common_chrome_flags(options, headless, settings.images_enabled)
+        options.page_load_strategy = settings.page_load_strategy
         prefs = {
             "download.default_directory": download_dir,
             "download.prompt_for_download": False,
             "profile.managed_default_content_settings.images": 2 if not settings.images_enabled else 1,
         }
         options.add_experimental_option("prefs", prefs)
-        if settings.tmp_profile:
-            tmpdir = tempfile.mkdtemp(prefix="selenium-profile-")
+        tmpdir = _make_profile_dir(settings)
+        if tmpdir:
             options.add_argument(f"--user-data-dir={tmpdir}")
-        driver = webdriver.Chrome(service=ChromeService(), options=options)
+        driver = _launch(settings, webdriver.Chrome, ChromeService, options)
 
     elif browser in ("firefox", "ff", "fox"):
         options = FirefoxOptions()
         if headless:
             options.add_argument("-headless")
         options.page_load_strategy = settings.page_load_strategy
-        driver = webdriver.Firefox(service=FirefoxService(), options=options)
+        if settings.profile_template is not None and not settings.remote_url:
+            tmpdir = settings.profile_template.clone()
+            options.add_argument("-profile")
+            options.add_argument(tmpdir)
+        if settings.block:
+            for key, value in settings.block.firefox_prefs().items():
+                options.set_preference(key, value)
+            for warning in settings.block.firefox_warnings():
+                conf.write_log(warning, species="WARNING")
+        for key, value in _firefox_download_prefs(download_dir).items():
+            options.set_preference(key, value)
+        driver = _launch(settings, webdriver.Firefox, FirefoxService, options)
 
     elif browser in ("edge", "e"):
         options = EdgeOptions()
         _apply_common_chrome_flags(options, headless, settings.images_enabled)
-        if settings.tmp_profile:
-            tmpdir = tempfile.mkdtemp(prefix="selenium-profile-")
+        options.page_load_strategy = settings.page_load_strategy
+        options.add_experimental_option("prefs", {
+            "download.default_directory": download_dir,
+            "download.prompt_for_download": False,
+        })
+        tmpdir = _make_profile_dir(settings)
+        if tmpdir:
             options.add_argument(f"--user-data-dir={tmpdir}")
-        driver = webdriver.Edge(service=EdgeService(), options=options)
+        driver = _launch(settings, webdriver.Edge, EdgeService, options)
 
     else:
         raise ValueError(f"Unsupported browser: {browser}")
 
-    driver.set_page_load_timeout(max(settings.timeout_sec, 5))
-    driver.set_script_timeout(max(settings.timeout_sec, 5))
-    driver.set_window_position(0, 0)
-    w, h = settings.window_size
-    driver.set_window_size(w, h)
+    try:
+        tune_connection(driver.command_executor, settings.keep_alive, settings.http_pool_size,
+                        settings.http_retries, settings.http_timeout)
+        # Chromium 系のみ CDP で適用（Firefox は上の設定値で済んでいる）
+        if settings.block and not isinstance(options, FirefoxOptions) \
+                and not apply_block_policy(driver, settings.block):
+            conf.write_log("CDP is not available; the block policy is not applied",
+                           species="WARNING")
+        install_request_tracker(driver, settings.ready)
+        driver.set_page_load_timeout(max(settings.timeout_sec, 5))
+        driver.set_script_timeout(max(settings.timeout_sec, 5))
+        driver.set_window_position(0, 0)
+        w, h = settings.window_size
+        driver.set_window_size(w, h)
+    except Exception:
+        # 起動済みのセッションと作ったディレクトリを残さない
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        cleanup_tmpdir(tmpdir)
+        if settings.isolate_downloads:
+            cleanup_tmpdir(download_dir)
+        raise
+    # expect_download が監視するディレクトリ
+    driver.download_dir = download_dir
+    driver.isolated_download_dir = download_dir if settings.isolate_downloads else None
     return driver, tmpdir
 
 
+def _launch(settings: DriverSettings, driver_cls, service_cls, options):
+    if settings.remote_url:
+        return webdriver.Remote(command_executor=settings.remote_url, options=options)
+    return driver_cls(service=service_cls(), options=options)
+
+
+def _firefox_download_prefs(download_dir: str) -> dict:
+    return {
+        "browser.download.folderList": 2,
+        "browser.download.dir": download_dir,
+        "browser.download.useDownloadDir": True,
+        "browser.download.manager.showWhenStarting": False,
+        "browser.download.always_ask_before_handling_new_types": False,
+        "browser.helperApps.neverAsk.saveToDisk":
+            "application/octet-stream,application/pdf,application/zip,text/csv,"
+            "application/vnd.ms-excel,"
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "pdfjs.disabled": True,
+    }
+
+
 def _apply_common_chrome_flags(options, headless: bool, images_enabled: bool):
+    # snapshot() でコンソールログを取得できるようにする
+    options.set_capability("goog:loggingPrefs", {"browser": "ALL"})
     if headless:
         options.add_argument("--headless=new")
     for arg in [
@@ -96,6 +212,35 @@ def _apply_common_chrome_flags(options, headless: bool, images_enabled: bool):
         options.add_argument("--blink-settings=imagesEnabled=false")
 
 
-def cleanup_tmpdir(tmpdir: str):
+def _make_profile_dir(settings: DriverSettings):
+    """
+    テンプレート指定時はその複製、
+    tmp_profile 時は空の一時ディレクトリを返す。
+    """
+    if settings.remote_url:
+        # プロファイルはリモート側のファイルシステムにあるので作らない
+        return None
+    if settings.profile_template is not None:
+        return settings.profile_template.clone()
+    if settings.tmp_profile:
+        return tempfile.mkdtemp(prefix="selenium-profile-")
+    return None
+
+
+def cleanup_downloads(driver, background: bool = False):
+    """
+    isolate_downloads で作ったセッション専用のダウンロード先を削除する。
+    """
+    cleanup_tmpdir(getattr(driver, "isolated_download_dir", None), background)
+
+
+def cleanup_tmpdir(tmpdir: str, background: bool = False):
+    """
+    一時プロファイルを削除する。
+    background=True なら削除を reaper スレッドに任せる。
+    """
     if tmpdir and os.path.isdir(tmpdir):
-        shutil.rmtree(tmpdir, ignore_errors=True)
+        if background:
+            reaper.submit(tmpdir)
+        else:
+            shutil.rmtree(tmpdir, ignore_errors=True)
@@ -0,0 +1,278 @@
+import threading
+import time
+from typing import Callable, List, Optional, Set
+from urllib.parse import urlsplit
+from ..core import config as _config
+from .driver_factory import DriverSettings, create_driver, cleanup_downloads, cleanup_tmpdir
+
+
+
+
+class _PooledDriver:
+    """プール内で管理される driver と付随情報"""
+    __slots__ = ("driver", "tmpdir", "created_at", "leases")
+
+    def __init__(self, driver, tmpdir):
+        self.driver = driver
+        self.tmpdir = tmpdir
+        self.created_at = time.monotonic()
+        self.leases = 0
+
+
+class DriverPool:
+    """
+    起動済み webdriver を使い回すためのプール。
+    checkout/checkin で貸し出し、返却時に cookie / storage / window / frame を
+    初期化する（CDP を使うので、Firefox の driver は返却時に破棄する）。
+    """
+
+    def __init__(self, settings: Optional[DriverSettings] = None, size: int = 2,
+                 conf: Optional[_config] = None, max_uses: int = 50,
+                 max_age_sec: Optional[float] = 600, checkout_timeout: Optional[float] = None,
+                 factory: Optional[Callable] = None):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.settings = settings or DriverSettings()
+        self.size = size
+        self.conf = conf or _config(name=__name__)
+        self.max_uses = max_uses
+        self.max_age_sec = max_age_sec
+        self.checkout_timeout = checkout_timeout
+        self._factory = factory or create_driver
+        self._idle: List[_PooledDriver] = []
+        self._leased = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._pending = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "launches": 0,
+            "recycled": 0,
+            "unhealthy": 0,
+            "launch_time_total": 0.0,
+            "launch_time_max": 0.0,
+        }
+
+    # ---- context manager ----
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ---- lifecycle ----
+    def warm(self, count: Optional[int] = None) -> int:
+        """
+        count 台（既定: size まで）を事前起動しておく。
+        起動した台数を返す。
+        """
+        target = self.size if count is None else min(count, self.size)
+        launched = 0
+        while True:
+            with self._cond:
+                if self._closed or self._total() >= target:
+                    return launched
+                self._pending += 1
+            try:
+                entry = self._launch()
+            finally:
+                with self._cond:
+                    self._pending -= 1
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+            launched += 1
+
+    def checkout(self, timeout: Optional[float] = None):
+        """
+        driver を1台借りる。空きがなく上限に達している場合は返却を待つ。
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("DriverPool is closed")
+                if self._idle:
+                    entry = self._idle.pop()
+                elif self._total() < self.size:
+                    entry = None
+                else:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("No driver became available in the pool")
+                    self._cond.wait(remaining)
+                    continue
+                self._pending += 1
+            break
+        if entry is not None:
+            # ヘルスチェックはロック外で行う（driver への往復を伴うため）
+            if not self._expired(entry) and self._is_alive(entry.driver):
+                with self._cond:
+                    self._pending -= 1
+                    self._stats["hits"] += 1
+                    return self._lease(entry)
+            self._dispose(entry)
+            with self._cond:
+                self._stats["unhealthy"] += 1
+            # 確保済みの枠はそのまま新規起動に使う
+        try:
+            entry = self._launch()
+        finally:
+            with self._cond:
+                self._pending -= 1
+                self._cond.notify()
+        with self._cond:
+            self._stats["misses"] += 1
+            return self._lease(entry)
+
+    def checkin(self, driver, discard: bool = False):
+        """
+        借りた driver を返却する。
+        状態の初期化に失敗したものや寿命切れは破棄する。
+        """
+        with self._cond:
+            entry = self._leased.pop(id(driver), None)
+            if entry is None:
+                raise ValueError("driver was not checked out from this pool")
+            self._pending += 1
+        keep = not discard and not self._closed and not self._expired(entry)
+        if keep:
+            keep = self._reset(entry.driver)
+        with self._cond:
+            self._pending -= 1
+            keep = keep and not self._closed
+            if keep:
+                self._idle.append(entry)
+            else:
+                self._stats["recycled"] += 1
+            self._cond.notify()
+        if not keep:
+            self._dispose(entry)
+
+    def health_check(self) -> int:
+        """
+        待機中の driver を検査し、
+        応答しない・寿命切れのものを破棄する。破棄数を返す。
+        """
+        with self._cond:
+            idle, self._idle = self._idle, []
+        alive, dropped = [], 0
+        for entry in idle:
+            if self._expired(entry) or not self._is_alive(entry.driver):
+                self._dispose(entry)
+                dropped += 1
+            else:
+                alive.append(entry)
+        with self._cond:
+            self._stats["unhealthy"] += dropped
+            self._idle.extend(alive)
+            self._cond.notify_all()
+        return dropped
+
+    def close(self):
+        """
+        待機中の driver をすべて終了する。
+        貸出中のものは返却時に終了する。
+        """
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for entry in idle:
+            self._dispose(entry)
+
+    # ---- stats ----
+    def stats(self) -> dict:
+        with self._cond:
+            stats = dict(self._stats)
+            stats["idle"] = len(self._idle)
+            stats["leased"] = len(self._leased)
+        launches = stats["launches"]
+        stats["launch_time_avg"] = stats["launch_time_total"] / launches if launches else 0.0
+        requests = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / requests if requests else 0.0
+        return stats
+
+    # ---- internal ----
+    def _total(self) -> int:
+        return len(self._idle) + len(self._leased) + self._pending
+
+    def _launch(self) -> _PooledDriver:
+        started = time.perf_counter()
+        driver, tmpdir = self._factory(self.settings, self.conf)
+        elapsed = time.perf_counter() - started
+        with self._cond:
+            self._stats["launches"] += 1
+            self._stats["launch_time_total"] += elapsed
+            self._stats["launch_time_max"] = max(self._stats["launch_time_max"], elapsed)
+        return _PooledDriver(driver, tmpdir)
+
+    def _lease(self, entry: _PooledDriver):
+        entry.leases += 1
+        self._leased[id(entry.driver)] = entry
+        return entry.driver
+
+    def _expired(self, entry: _PooledDriver) -> bool:
+        if self.max_uses and entry.leases >= self.max_uses:
+            return True
+        if self.max_age_sec is not None and time.monotonic() - entry.created_at >= self.max_age_sec:
+            return True
+        return False
+
+    @staticmethod
+    def _is_alive(driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(driver) -> bool:
+        """
+        次の貸し出しに備えてブラウザ状態を初期化する。失敗時は False。
+        cookie 削除や storage.clear() は今のオリジンにしか効かないので、
+        CDP で全 cookie と、各タブの履歴にあるオリジンの storage を消す。
+        sessionStorage はタブ単位なので、新しいタブだけを残す。
+        CDP のない driver（Firefox など）は初期化しきれないので False。
+        """
+        if not hasattr(driver, "execute_cdp_cmd"):
+            return False
+        if (getattr(driver, "caps", None) or {}).get("browserName", "").lower() == "firefox":
+            return False
+        try:
+            origins: Set[str] = set()
+            handles = list(driver.window_handles)
+            for handle in handles:
+                driver.switch_to.window(handle)
+                history = driver.execute_cdp_cmd("Page.getNavigationHistory", {})
+                origins.update(_origin(e.get("url", "")) for e in history.get("entries", []))
+            driver.switch_to.new_window("tab")
+            fresh = driver.current_window_handle
+            for handle in handles:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(fresh)
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            for origin in sorted(o for o in origins if o):
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin",
+                                       {"origin": origin, "storageTypes": "all"})
+            return True
+        except Exception:
+            return False
+
+    def _dispose(self, entry: _PooledDriver):
+        try:
+            entry.driver.quit()
+        except Exception:
+            pass
+        finally:
+            cleanup_tmpdir(entry.tmpdir, background=self.settings.defer_cleanup)
+            cleanup_downloads(entry.driver, background=self.settings.defer_cleanup)
+
+
+def _origin(url: str) -> str:
+    """http(s) の URL のオリジン（それ以外は空文字）"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.scheme in ("http", "https") else ""
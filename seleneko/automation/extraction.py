@@ -0,0 +1,120 @@
+"""
+extract() 用の仕様コンパイルと、1回の execute_script で値をまとめて読む JS。
+
+spec の各値は次のいずれか:
+    ("css", "h1")                                   -> 最初の要素のテキスト
+    (("css", "a.next"), "href")                     -> 最初の要素の属性
+    {"locator": ("css", "li"), "attr": "text", "all": True}   -> 全要素の値のリスト
+    {"locator": ("css", "tr"), "fields": {...}}     -> 行ごとの fields の dict のリスト
+attr は "text" / "html" / "value" / 任意の属性名。
+"""
+from typing import Callable, Dict, List, Optional
+
+
+# By 値とキーで要素を探す JS 関数群（extract と待機処理で共用）
+LOCATE_JS = """
+function findAll(root, by, key) {
+  var out = [], i, r;
+  switch (by) {
+    case "css selector": return Array.prototype.slice.call(root.querySelectorAll(key));
+    case "xpath":
+      r = document.evaluate(key, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+      for (i = 0; i < r.snapshotLength; i++) out.push(r.snapshotItem(i));
+      return out;
+    case "id":
+    case "name":
+      return Array.prototype.slice.call(
+          root.querySelectorAll("[" + by + '="' + CSS.escape(key) + '"]'));
+    case "class name": return Array.prototype.slice.call(root.getElementsByClassName(key));
+    case "tag name": return Array.prototype.slice.call(root.getElementsByTagName(key));
+    case "link text":
+    case "partial link text":
+      return Array.prototype.filter.call(root.querySelectorAll("a"), function (a) {
+        var t = a.innerText.trim();
+        return by === "link text" ? t === key : t.indexOf(key) >= 0;
+      });
+  }
+  return out;
+}
+function find(root, by, key) {
+  if (by === "css selector") return root.querySelector(key);
+  if (by === "xpath") return document.evaluate(key, root, null,
+      XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+  if (by === "id" && root === document) return document.getElementById(key);
+  return findAll(root, by, key)[0] || null;
+}
+"""
+
+EXTRACT_JS = LOCATE_JS + """
+function read(el, attr) {
+  if (!el) return null;
+  if (attr === "text") return (el.innerText || el.textContent || "").trim();
+  if (attr === "html") return el.innerHTML;
+  if (attr === "value") return el.value === undefined ? el.getAttribute("value") : el.value;
+  return el.getAttribute(attr);
+}
+function run(root, plan) {
+  var out = {};
+  plan.forEach(function (p) {
+    var name = p[0], by = p[1], key = p[2], attr = p[3], mode = p[4];
+    if (mode === "one") out[name] = read(find(root, by, key), attr);
+    else if (mode === "all")
+      out[name] = findAll(root, by, key).map(function (e) { return read(e, attr); });
+    else out[name] = findAll(root, by, key).map(function (e) { return run(e, p[5]); });
+  });
+  return out;
+}
+return run(document, arguments[0]);
+"""
+
+
+class ExtractPlan:
+    """コンパイル済みの extract 仕様。ロケータは By 値に解決済み。"""
+    __slots__ = ("entries",)
+
+    def __init__(self, entries: List[list]):
+        self.entries = entries
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def build_plan(spec: Dict[str, object], resolve: Callable[[str], Optional[str]]) -> ExtractPlan:
+    """spec を検証し、JS に渡せる形（リストのリスト）に変換する。"""
+    if isinstance(spec, ExtractPlan):
+        return spec
+    if not isinstance(spec, dict):
+        raise ValueError("extract spec must be a dict of name -> locator")
+    return ExtractPlan([_entry(str(name), value, resolve) for name, value in spec.items()])
+
+
+def _entry(name: str, value, resolve) -> list:
+    attr, mode, fields = "text", "one", None
+    if isinstance(value, dict):
+        locator = value.get("locator")
+        attr = value.get("attr", "text")
+        if "fields" in value:
+            mode = "rows"
+            fields = build_plan(value["fields"], resolve).entries
+        elif value.get("all"):
+            mode = "all"
+    elif _is_locator(value):
+        locator = value
+    elif isinstance(value, (list, tuple)) and len(value) == 2 and _is_locator(value[0]):
+        locator, attr = value
+    else:
+        raise ValueError(f"{name}: unsupported extract spec {value!r}")
+    if not _is_locator(locator):
+        raise ValueError(f"{name}: locator must be (method, key)")
+    by = resolve(locator[0])
+    if by is None:
+        raise ValueError(f"{name}: unknown locator method {locator[0]!r}")
+    entry = [name, by, locator[1], str(attr), mode]
+    if fields is not None:
+        entry.append(fields)
+    return entry
+
+
+def _is_locator(value) -> bool:
+    return (isinstance(value, (list, tuple)) and len(value) == 2
+            and all(isinstance(v, str) for v in value))
@@ -0,0 +1,81 @@
+"""
+fill_form() 用の JS。
+全フィールドへの値設定・イベント発火・確認を
+1回の execute_script で行う。
+
+値の種類:
+    str / 数値   -> input / textarea の value、
+                    select は value または表示テキストが一致する option
+    bool         -> checkbox / radio の checked
+    list / tuple -> 複数選択 select の選択肢
+"""
+from typing import Callable, Dict, List, Tuple
+from .extraction import LOCATE_JS
+
+# 各フィールドについて [状態, 要素のタグ名] を返す。状態は
+# "ok" / "missing"（見つからない）/ "unusable"（非表示・無効・読み取り専用）/
+# "mismatch"（設定後の値が違う）
+FILL_JS = LOCATE_JS + """
+function fire(el, type) { el.dispatchEvent(new Event(type, {bubbles: true})); }
+function setValue(el, v) {
+  // React などが value の setter を差し替えていても反映されるよう、
+  // プロトタイプの setter を使う
+  var proto = el instanceof HTMLTextAreaElement
+    ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+  var desc = Object.getOwnPropertyDescriptor(proto, "value");
+  if (desc && desc.set) desc.set.call(el, v); else el.value = v;
+}
+function fill(el, v) {
+  var tag = el.tagName.toLowerCase(), type = (el.type || "").toLowerCase(), wanted, chosen;
+  if (type === "checkbox" || type === "radio") {
+    if (el.checked !== !!v) el.click();  // click で input / change も発火する
+    return el.checked === !!v;
+  }
+  if (tag === "select") {
+    wanted = [].concat(v).map(String);
+    Array.prototype.forEach.call(el.options, function (o) {
+      o.selected = wanted.indexOf(o.value) >= 0 || wanted.indexOf(o.text.trim()) >= 0;
+    });
+    fire(el, "input");
+    fire(el, "change");
+    chosen = Array.prototype.filter.call(el.options, function (o) { return o.selected; });
+    return chosen.length === (el.multiple ? wanted.length : 1);
+  }
+  if (tag === "input" || tag === "textarea") {
+    el.focus();
+    setValue(el, String(v));
+    fire(el, "input");
+    fire(el, "change");
+    el.blur();
+    return el.value === String(v);
+  }
+  return false;
+}
+return arguments[0].map(function (e) {
+  var el = find(document, e[0], e[1]), tag;
+  if (!el) return ["missing", null];
+  tag = el.tagName.toLowerCase();
+  if (!el.getClientRects().length || el.disabled || el.readOnly) return ["unusable", tag];
+  try {
+    return [fill(el, e[2]) ? "ok" : "mismatch", tag];
+  } catch (err) {
+    return ["mismatch", tag];
+  }
+});
+"""
+
+
+def build_fill_entries(fields: Dict[Tuple[str, str], object],
+                       resolve: Callable[[str], str]) -> List[list]:
+    """{(method, key): value} を FILL_JS の引数 [[By, key, value], ...] にする。"""
+    entries = []
+    for locator, value in fields.items():
+        if not isinstance(locator, (list, tuple)) or len(locator) != 2:
+            raise ValueError(f"fill_form locator must be (method, key): {locator!r}")
+        by = resolve(str(locator[0]))
+        if by is None:
+            raise ValueError(f"unknown locator method {locator[0]!r}")
+        if isinstance(value, tuple):
+            value = list(value)
+        entries.append([by, str(locator[1]), value])
+    return entries
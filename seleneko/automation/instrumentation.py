@@ -0,0 +1,244 @@
+"""
+WebDriver コマンドとクライアント操作の計測。
+
+    inst = Instrumentation(sinks=[JsonlSpanSink("log/spans.jsonl")])
+    with SeleniumClient(settings, instrumentation=inst) as cli:
+        cli.login(...)
+    print(inst.stats())
+
+instrumentation を渡さないクライアントは一切ラップされないため、
+無効時のコストはない。
+"""
+import functools
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+# 計測対象のクライアント公開メソッド
+INSTRUMENTED_ACTIONS = (
+    "get", "wait_ready", "login", "login_reusing_session", "save_session", "restore_session",
+    "find_visible", "click", "type_text", "fill_form", "select_by_text", "select_by_index",
+    "switch_to_frame", "switch_to_default_content", "switch_to_window", "switch_to_window_by_title",
+    "extract", "page_weight", "expect_download", "snapshot",
+    "click_smart", "type_text_smart",
+)
+
+
+class LatencyHistogram:
+    """
+    件数・合計・最大は正確に、
+    分位点は最大 max_samples 件のリザーバから求める。
+    """
+    __slots__ = ("count", "total", "max", "_samples", "_max_samples")
+
+    def __init__(self, max_samples: int = 10000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._samples: List[float] = []
+        self._max_samples = max_samples
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        if len(self._samples) < self._max_samples:
+            self._samples.append(value)
+        else:
+            i = random.randrange(self.count)
+            if i < self._max_samples:
+                self._samples[i] = value
+
+    def percentile(self, q: float) -> float:
+        return _pick(sorted(self._samples), q)
+
+    def summary(self) -> dict:
+        ordered = sorted(self._samples)
+        return {
+            "count": self.count,
+            "total": self.total,
+            "avg": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": _pick(ordered, 50),
+            "p95": _pick(ordered, 95),
+            "p99": _pick(ordered, 99),
+        }
+
+
+def _pick(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q / 100.0 * len(ordered)))]
+
+
+class JsonlSpanSink:
+    """span を1行1JSONでファイルに追記する。"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, span: dict):
+        line = json.dumps(span, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+class OTelSpanSink:
+    """
+    OpenTelemetry 互換の tracer に span を流す。opentelemetry 自体には依存しない。
+    tracer は start_span(name, start_time=, attributes=) と span.end(end_time=) を持つこと。
+    """
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    def __call__(self, span: dict):
+        start_ns = int(span["start"] * 1e9)
+        attributes = {k: v for k, v in span.items()
+                      if k not in ("name", "start", "duration") and v is not None}
+        otel_span = self.tracer.start_span(span["name"], start_time=start_ns, attributes=attributes)
+        otel_span.end(end_time=start_ns + int(span["duration"] * 1e9))
+
+
+class Instrumentation:
+    """コマンド別・操作別のレイテンシ集計と span 出力"""
+
+    def __init__(self, sinks: Optional[Iterable[Callable[[dict], None]]] = None,
+                 enabled: bool = True, max_samples: int = 10000):
+        self.enabled = enabled
+        self.sinks = list(sinks or [])
+        self._max_samples = max_samples
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._commands: Dict[str, LatencyHistogram] = {}
+        self._actions: Dict[str, LatencyHistogram] = {}
+        self._by_action: Dict[str, Dict[str, int]] = {}
+
+    # ---- attach / detach ----
+    def attach(self, driver):
+        """driver.execute を差し替えて全 WebDriver コマンドを計測する。"""
+        if not hasattr(driver, "execute") or "execute" in getattr(driver, "__dict__", {}):
+            return driver
+        original = driver.execute
+
+        @functools.wraps(original)
+        def execute(driver_command, params=None):
+            if not self.enabled:
+                return original(driver_command, params)
+            started, t0 = time.time(), time.perf_counter()
+            error = None
+            try:
+                return original(driver_command, params)
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                self._record_command(driver_command, started, time.perf_counter() - t0, error)
+
+        driver.execute = execute
+        return driver
+
+    @staticmethod
+    def detach(driver):
+        if driver is not None and "execute" in getattr(driver, "__dict__", {}):
+            del driver.execute
+
+    def instrument_client(self, client):
+        """
+        クライアントの公開メソッドをインスタンス単位でラップする。
+        """
+        for name in INSTRUMENTED_ACTIONS:
+            method = getattr(client, name, None)
+            if method is not None:
+                setattr(client, name, self._wrap_action(name, method))
+        return client
+
+    # ---- recording ----
+    @contextmanager
+    def action(self, name: str):
+        """with 内で発行された WebDriver コマンドを name に帰属させる。"""
+        stack = self._stack()
+        stack.append(name)
+        started, t0 = time.time(), time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            stack.pop()
+            elapsed = time.perf_counter() - t0
+            with self._lock:
+                self._hist(self._actions, name).add(elapsed)
+            if self.sinks:
+                self._emit({"name": name, "kind": "action", "start": started, "duration": elapsed,
+                            "parent": stack[-1] if stack else None, "error": error})
+
+    def stats(self) -> dict:
+        """
+        コマンド別・操作別の count / avg / p50 / p95 / p99（秒）と、
+        操作ごとのコマンド内訳
+        """
+        with self._lock:
+            return {
+                "commands": {k: h.summary() for k, h in self._commands.items()},
+                "actions": {k: h.summary() for k, h in self._actions.items()},
+                "by_action": {k: dict(v) for k, v in self._by_action.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self._commands.clear()
+            self._actions.clear()
+            self._by_action.clear()
+
+    # ---- internal ----
+    def _stack(self) -> List[str]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _hist(self, table: Dict[str, LatencyHistogram], key: str) -> LatencyHistogram:
+        hist = table.get(key)
+        if hist is None:
+            hist = table[key] = LatencyHistogram(self._max_samples)
+        return hist
+
+    def _wrap_action(self, name: str, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return method(*args, **kwargs)
+            with self.action(name):
+                return method(*args, **kwargs)
+        return wrapper
+
+    def _record_command(self, command: str, started: float, elapsed: float, error: Optional[str]):
+        stack = self._stack()
+        # 最も外側の操作（ユーザーが呼んだ高レベル操作）に帰属させる
+        action = stack[0] if stack else None
+        with self._lock:
+            self._hist(self._commands, command).add(elapsed)
+            counts = self._by_action.setdefault(action or "-", {})
+            counts[command] = counts.get(command, 0) + 1
+        if self.sinks:
+            self._emit({"name": command, "kind": "command", "start": started, "duration": elapsed,
+                        "action": action, "parent": stack[-1] if stack else None, "error": error})
+
+    def _emit(self, span: dict):
+        span["thread"] = threading.current_thread().name
+        for sink in self.sinks:
+            try:
+                sink(span)
+            except Exception:
+                # 出力先の不調で自動化処理を止めない
+                pass
@@ -0,0 +1,201 @@
+"""
+リソース種別・URL パターンによるリクエストのブロック。
+
+    policy = BlockPolicy(resources=["fonts", "media"], urls=["*://ads.example.com/*"])
+    settings = DriverSettings(block=policy)
+
+Chrome / Edge では CDP Network.setBlockedURLs、
+Firefox では対応する about:config 設定で適用する。
+Firefox では URL パターンは適用できず、
+media は自動再生・先読みを止めるだけで読み込み自体は防げない
+（firefox_warnings() で確認でき、起動時にログへ警告を出す）。
+"""
+from fnmatch import fnmatchcase
+from typing import Dict, Iterable, List, Optional, Union
+from urllib.parse import urlsplit
+
+
+_EXT = {
+    "images": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "fonts": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "ogg", "ogv", "mp3", "m4a", "wav", "flac", "m3u8", "mpd"),
+    "stylesheets": ("css",),
+}
+
+# 第三者スクリプトは URL だけでは判定できないため、
+# 代表的な広告・解析配信元を対象にする
+_THIRD_PARTY_SCRIPT_HOSTS = (
+    "googletagmanager.com", "google-analytics.com", "googlesyndication.com",
+    "doubleclick.net", "adservice.google.com", "connect.facebook.net", "static.ads-twitter.com",
+    "bat.bing.com", "hotjar.com", "cdn.segment.com", "criteo.com", "taboola.com", "outbrain.com",
+    "amazon-adsystem.com", "scorecardresearch.com", "adnxs.com",
+)
+
+# page_weight() で削減量を見積もるときの
+# 1リクエストあたりの代表サイズ（バイト）
+_TYPICAL_SIZES = {
+    "images": 30_000,
+    "fonts": 40_000,
+    "media": 500_000,
+    "stylesheets": 20_000,
+    "third_party_scripts": 60_000,
+    "urls": 20_000,
+}
+
+# Firefox にはリクエスト単位のブロック設定がないため、
+# 近い効果の設定値で代用する
+_FIREFOX_PREFS = {
+    "images": {"permissions.default.image": 2},
+    "fonts": {"browser.display.use_document_fonts": 0, "gfx.downloadable_fonts.enabled": False},
+    "media": {"media.autoplay.default": 5, "media.autoplay.blocking_policy": 2,
+              "media.preload.default": 0, "media.preload.auto": 0},
+    "stylesheets": {"permissions.default.stylesheet": 2},
+    "third_party_scripts": {"privacy.trackingprotection.enabled": True,
+                            "privacy.trackingprotection.socialtracking.enabled": True},
+}
+
+
+class BlockPolicy:
+    """
+    ブロック対象。
+    resources: images / fonts / media / stylesheets / third_party_scripts
+    urls: glob
+    """
+
+    RESOURCE_TYPES = tuple(_FIREFOX_PREFS)
+
+    def __init__(self, resources: Iterable[str] = (), urls: Iterable[str] = (),
+                 typical_sizes: Optional[Dict[str, int]] = None):
+        self.resources = tuple(resources)
+        unknown = [r for r in self.resources if r not in self.RESOURCE_TYPES]
+        if unknown:
+            raise ValueError(f"Unsupported resource types: {unknown}")
+        self.urls = tuple(urls)
+        self.typical_sizes = dict(_TYPICAL_SIZES, **(typical_sizes or {}))
+        self._patterns = self._build_patterns()
+
+    @classmethod
+    def coerce(cls,
+               value: Union[None, "BlockPolicy", dict, Iterable[str]]) -> Optional["BlockPolicy"]:
+        """DriverSettings(block=...) に渡された値を BlockPolicy に揃える。"""
+        if value is None or isinstance(value, BlockPolicy):
+            return value
+        if isinstance(value, dict):
+            return cls(**value)
+        values = [value] if isinstance(value, str) else list(value)
+        return cls(resources=[v for v in values if v in cls.RESOURCE_TYPES],
+                   urls=[v for v in values if v not in cls.RESOURCE_TYPES])
+
+    def __bool__(self):
+        return bool(self._patterns)
+
+    def url_patterns(self) -> List[str]:
+        """Network.setBlockedURLs に渡す '*' ワイルドカードのパターン"""
+        return [p for p, _ in self._patterns]
+
+    def firefox_prefs(self) -> dict:
+        prefs = {}
+        for r in self.resources:
+            prefs.update(_FIREFOX_PREFS[r])
+        return prefs
+
+    def firefox_warnings(self) -> List[str]:
+        """Firefox の設定値では実現できない指定の説明（なければ空）"""
+        warnings = []
+        if "media" in self.resources:
+            warnings.append("Firefox: 'media' only disables autoplay and preloading; "
+                            "media files are not blocked")
+        if self.urls:
+            warnings.append("Firefox: URL patterns are not supported and are ignored: "
+                            f"{list(self.urls)}")
+        return warnings
+
+    def classify(self, url: str) -> Optional[str]:
+        """
+        url がブロック対象ならそのリソース種別を返す。
+        URL パターンに一致したときは 'urls'。
+        """
+        for pattern, kind in self._patterns:
+            if fnmatchcase(url, pattern):
+                return kind
+        return None
+
+    def _build_patterns(self):
+        patterns = []
+        for r in self.resources:
+            if r == "third_party_scripts":
+                patterns += [(f"*://*{host}/*", r) for host in _THIRD_PARTY_SCRIPT_HOSTS]
+                continue
+            for ext in _EXT[r]:
+                patterns += [(f"*.{ext}", r), (f"*.{ext}?*", r)]
+        patterns += [(u, "urls") for u in self.urls]
+        return patterns
+
+
+def apply_block_policy(driver, policy: Optional[BlockPolicy]) -> bool:
+    """Chromium 系 driver に CDP でブロックを設定する。未対応なら False。"""
+    if not policy or not hasattr(driver, "execute_cdp_cmd"):
+        return False
+    # webdriver.Remote は Firefox でも execute_cdp_cmd を持つ（呼ぶと RuntimeError）
+    if (getattr(driver, "caps", None) or {}).get("browserName", "").lower() == "firefox":
+        return False
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": policy.url_patterns()})
+    except Exception:
+        # CDP を中継しない Grid など
+        return False
+    return True
+
+
+# ページで読み込まれた（または失敗した）リソースと
+# 転送量を1回で取得する
+PAGE_WEIGHT_JS = """
+var nav = performance.getEntriesByType("navigation")[0];
+var res = performance.getEntriesByType("resource").map(function (e) {
+  return [e.name, e.initiatorType, e.transferSize || 0, e.decodedBodySize || 0];
+});
+return {document: nav ? (nav.transferSize || 0) : 0, origin: location.origin, resources: res};
+"""
+
+
+def summarize_page_weight(raw: dict, policy: Optional[BlockPolicy]) -> dict:
+    """
+    PAGE_WEIGHT_JS の結果から
+    転送量・ブロック件数・削減見積もりを計算する。
+    サイズ 0 の対象リソースは、同一オリジンなら blocked、
+    別オリジンなら possibly_blocked に数える
+    （Timing-Allow-Origin がないと読み込めてもサイズ 0 になる）。
+    estimated_bytes_saved_max は possibly_blocked も含めた上限。
+    """
+    raw = raw or {}
+    transferred = int(raw.get("document") or 0)
+    origin = _origin(raw.get("origin") or "")
+    blocked: Dict[str, int] = {}
+    possibly: Dict[str, int] = {}
+    count = 0
+    for name, _initiator, transfer, decoded in raw.get("resources") or []:
+        count += 1
+        transferred += int(transfer or 0)
+        kind = policy.classify(name) if policy else None
+        if kind and not transfer and not decoded:
+            counts = blocked if origin and _origin(name) == origin else possibly
+            counts[kind] = counts.get(kind, 0) + 1
+    saved = _estimate(policy, blocked)
+    return {
+        "transferred_bytes": transferred,
+        "resources": count,
+        "blocked": blocked,
+        "possibly_blocked": possibly,
+        "estimated_bytes_saved": saved,
+        "estimated_bytes_saved_max": saved + _estimate(policy, possibly),
+    }
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.scheme and parts.netloc else ""
+
+
+def _estimate(policy: Optional[BlockPolicy], counts: Dict[str, int]) -> int:
+    return sum(policy.typical_sizes.get(k, 0) * n for k, n in counts.items()) if policy else 0
@@ -0,0 +1,205 @@
+"""
+ブラウザプロファイルのテンプレートと、
+使い終わったプロファイルのバックグラウンド削除。
+
+    template = ProfileTemplate("~/.cache/seleneko/chrome-template")
+    settings = DriverSettings(profile_template=template)
+
+テンプレートは初回に一度だけ作成し、
+セッションごとに reflink（対応 FS のみ）またはコピーで複製する。
+削除は ProfileReaper が別スレッドで行う。
+reflink は同じファイルシステム内でしか使えないため、
+複製はテンプレートの隣（clone_root 指定時はその下）に作る。
+"""
+import atexit
+import errno
+import json
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# linux/fs.h: FICLONE = _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+_MARKER = ".seleneko-template"
+
+_CHROME_LOCAL_STATE = {
+    "browser": {"has_seen_welcome_page": True},
+}
+_CHROME_PREFERENCES = {
+    "browser": {"has_seen_welcome_page": True, "check_default_browser": False},
+    "download": {"prompt_for_download": False, "directory_upgrade": True},
+    "profile": {
+        "exit_type": "Normal",
+        "exited_cleanly": True,
+        "default_content_setting_values": {"notifications": 2},
+        "password_manager_enabled": False,
+    },
+    "credentials_enable_service": False,
+    "translate": {"enabled": False},
+}
+_CHROME_CACHE_DIRS = ("Default/Cache", "Default/Code Cache", "Default/GPUCache", "ShaderCache")
+_FIREFOX_USER_JS = {
+    "browser.shell.checkDefaultBrowser": False,
+    "browser.startup.homepage_override.mstone": "ignore",
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "toolkit.telemetry.reportingpolicy.firstRun": False,
+    "browser.aboutwelcome.enabled": False,
+    "app.update.auto": False,
+}
+
+
+class ProfileTemplate:
+    """
+    一度だけ作るプロファイルの雛形。
+    clone() でセッション用の複製ディレクトリを返す。
+    link="auto" は reflink を試してだめならコピー、"copy" は常にコピー、
+    "hardlink" はハードリンク。
+    hardlink はブラウザがファイルを置き換えで更新する場合のみ安全。
+    """
+
+    def __init__(self, path: str, browser: str = "chrome", link: str = "auto",
+                 clone_root: Optional[str] = None):
+        if link not in ("auto", "copy", "hardlink"):
+            raise ValueError("link must be 'auto', 'copy' or 'hardlink'")
+        self.path = os.path.abspath(os.path.expanduser(path))
+        # 複製の置き場所（既定はテンプレートと同じディレクトリ）
+        clone_root = os.path.expanduser(clone_root) if clone_root else os.path.dirname(self.path)
+        self.clone_root = os.path.abspath(clone_root)
+        self.browser = browser.lower()
+        self.link = link
+        self._lock = threading.Lock()
+        self._reflink_ok = link == "auto" and fcntl is not None
+
+    @property
+    def is_firefox(self) -> bool:
+        return self.browser in ("firefox", "ff", "fox")
+
+    def ensure(self) -> str:
+        """テンプレートがなければ作成する（プロセス内で一度だけ）。"""
+        with self._lock:
+            if os.path.exists(os.path.join(self.path, _MARKER)):
+                return self.path
+            # 雛形と同じファイルシステムで作って rename するため、
+            # 親ディレクトリを先に作る
+            parent = os.path.dirname(self.path)
+            os.makedirs(parent, exist_ok=True)
+            staging = tempfile.mkdtemp(prefix=".template-", dir=parent)
+            try:
+                if self.is_firefox:
+                    self._write_firefox(staging)
+                else:
+                    self._write_chrome(staging)
+                open(os.path.join(staging, _MARKER), "w").close()
+                try:
+                    os.rename(staging, self.path)
+                except OSError:
+                    # 他プロセスが先に作成済み
+                    shutil.rmtree(staging, ignore_errors=True)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+            return self.path
+
+    def clone(self, prefix: str = "selenium-profile-") -> str:
+        """テンプレートを複製した一時ディレクトリを返す。"""
+        self.ensure()
+        os.makedirs(self.clone_root, exist_ok=True)
+        dest = tempfile.mkdtemp(prefix=prefix, dir=self.clone_root)
+        for root, dirs, files in os.walk(self.path):
+            rel = os.path.relpath(root, self.path)
+            target_root = dest if rel == "." else os.path.join(dest, rel)
+            for d in dirs:
+                os.makedirs(os.path.join(target_root, d), exist_ok=True)
+            for f in files:
+                if f == _MARKER:
+                    continue
+                self._clone_file(os.path.join(root, f), os.path.join(target_root, f))
+        return dest
+
+    # ---- internal ----
+    def _clone_file(self, src: str, dst: str):
+        if self.link == "hardlink":
+            try:
+                os.link(src, dst)
+                return
+            except OSError:
+                pass
+        if self._reflink_ok:
+            try:
+                with open(src, "rb") as fs, open(dst, "wb") as fd:
+                    fcntl.ioctl(fd.fileno(), _FICLONE, fs.fileno())
+                shutil.copystat(src, dst)
+                return
+            except OSError as e:
+                # 非対応のファイルシステムなら以降は試さない
+                # （EXDEV などはこのファイルだけコピーする）
+                if e.errno in (errno.EOPNOTSUPP, errno.EINVAL, errno.ENOTTY):
+                    self._reflink_ok = False
+        shutil.copy2(src, dst)
+
+    @staticmethod
+    def _write_json(path: str, data: dict):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def _write_chrome(self, root: str):
+        open(os.path.join(root, "First Run"), "w").close()
+        self._write_json(os.path.join(root, "Local State"), _CHROME_LOCAL_STATE)
+        self._write_json(os.path.join(root, "Default", "Preferences"), _CHROME_PREFERENCES)
+        for d in _CHROME_CACHE_DIRS:
+            os.makedirs(os.path.join(root, d), exist_ok=True)
+
+    def _write_firefox(self, root: str):
+        lines = [f"user_pref({json.dumps(k)}, {json.dumps(v)});\n"
+                 for k, v in _FIREFOX_USER_JS.items()]
+        with open(os.path.join(root, "user.js"), "w", encoding="utf-8") as f:
+            f.writelines(lines)
+
+
+class ProfileReaper:
+    """使い終わったプロファイルディレクトリを別スレッドで削除する。"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, path: str):
+        self._start()
+        self._queue.put(path)
+
+    def drain(self, timeout: Optional[float] = None):
+        """キューに積まれた削除が終わるまで待つ。"""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="seleneko-reaper",
+                                                daemon=True)
+                self._thread.start()
+                atexit.register(self.drain, 10.0)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            shutil.rmtree(item, ignore_errors=True)
+
+
+reaper = ProfileReaper()
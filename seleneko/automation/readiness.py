@@ -0,0 +1,180 @@
+"""
+get() の読み込み完了判定。
+
+    settings = DriverSettings(ready=ReadyPolicy(network_idle=300,
+                                                selector=("css", "#result")))
+
+ready_states だけなら従来どおり document.readyState を確認する。
+network_idle（ms）/ selector /
+predicate（真偽を返す JS の関数本体）を指定すると、
+ブラウザ内でリクエスト完了・DOM 変化・readystatechange を契機に
+条件を再確認し、成立した時点で1回の execute_async_script が返る。
+
+fetch / XHR の追跡スクリプトは、Chromium 系では
+CDP Page.addScriptToEvaluateOnNewDocument でページのスクリプトより先に仕込む。
+それ以外のブラウザでは待機開始時に注入するため、
+それ以前に始まったリクエストは数えられない
+（ready_states=("complete",) と併用するとよい）。
+"""
+from typing import Optional, Tuple, Union
+from .extraction import LOCATE_JS
+
+# fetch / XHR の実行中件数と最後に完了した時刻を
+# window.__selenekoNet に記録する
+TRACKER_JS = """
+(function () {
+  if (window.__selenekoNet) return;
+  var net = window.__selenekoNet = {inflight: 0, last: performance.now(), listeners: []};
+  function begin() { net.inflight++; }
+  function end() {
+    net.inflight = Math.max(0, net.inflight - 1);
+    net.last = performance.now();
+    net.listeners.slice().forEach(function (fn) { try { fn(); } catch (e) {} });
+  }
+  if (window.fetch) {
+    var fetch = window.fetch;
+    window.fetch = function () {
+      begin();
+      return fetch.apply(this, arguments).then(function (r) { end(); return r; },
+                                               function (e) { end(); throw e; });
+    };
+  }
+  if (window.XMLHttpRequest) {
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+      begin();
+      this.addEventListener("loadend", end);
+      return send.apply(this, arguments);
+    };
+  }
+})();
+"""
+
+# ready(states, idleMs, locator, test) の共通部分
+_READY_FN = LOCATE_JS + TRACKER_JS + """
+var net = window.__selenekoNet;
+var states = arguments[0], idleMs = arguments[1], loc = arguments[2];
+var test = arguments[3] ? new Function(arguments[3]) : null;
+function idleFor() { return performance.now() - net.last; }
+function ready() {
+  if (states.indexOf(document.readyState) < 0) return false;
+  if (idleMs !== null && (net.inflight > 0 || idleFor() < idleMs)) return false;
+  if (loc) {
+    var el = find(document, loc[0], loc[1]);
+    if (!el || !el.getClientRects().length) return false;
+  }
+  if (test) { try { if (!test()) return false; } catch (e) { return false; } }
+  return true;
+}
+"""
+
+# 条件を1回だけ確認する（execute_async_script が使えない driver 用）
+READY_CHECK_JS = _READY_FN + "return ready();"
+
+# 条件が成立したら true、arguments[4] ms 経過したら false を返す
+READY_JS = _READY_FN + """
+var done = arguments[arguments.length - 1], finished = false, timer, idleTimer, poll, obs;
+function finish(v) {
+  if (finished) return;
+  finished = true;
+  clearTimeout(timer);
+  clearTimeout(idleTimer);
+  clearInterval(poll);
+  if (obs) obs.disconnect();
+  document.removeEventListener("readystatechange", check);
+  var i = net.listeners.indexOf(check);
+  if (i >= 0) net.listeners.splice(i, 1);
+  done(v);
+}
+function check() {
+  if (finished) return;
+  if (ready()) return finish(true);
+  // 通信が止んでいれば idleMs 経過時点で確認し直す
+  if (idleMs !== null && net.inflight === 0) {
+    clearTimeout(idleTimer);
+    idleTimer = setTimeout(check, Math.max(0, idleMs - idleFor()) + 1);
+  }
+}
+net.listeners.push(check);
+document.addEventListener("readystatechange", check);
+if (loc) {
+  obs = new MutationObserver(check);
+  obs.observe(document.documentElement || document,
+              {childList: true, subtree: true, attributes: true});
+}
+// 任意の JS 条件は変化を検知できないので短い間隔で確認する
+if (test) poll = setInterval(check, 50);
+timer = setTimeout(function () { finish(false); }, arguments[4]);
+check();
+"""
+
+
+class ReadyPolicy:
+    """
+    get() がページを使える状態とみなす条件（すべて満たしたとき）。
+    ready_states: document.readyState の許容値
+    network_idle: fetch / XHR が network_idle ms 途切れていること（None は見ない）
+    selector: (method, key) の要素が表示されていること
+    predicate: 真偽を返す JS（関数本体。例: "return window.appReady === true;"）
+    timeout: 待機の上限秒（None は settings.timeout_sec）
+    """
+
+    def __init__(self, ready_states: Tuple[str, ...] = ("interactive", "complete"),
+                 network_idle: Optional[int] = None, selector: Optional[Tuple[str, str]] = None,
+                 predicate: Optional[str] = None, timeout: Optional[float] = None):
+        if isinstance(ready_states, str):
+            ready_states = (ready_states,)
+        self.ready_states = tuple(ready_states)
+        if not self.ready_states:
+            raise ValueError("ready_states must not be empty")
+        if network_idle is not None and network_idle < 0:
+            raise ValueError("network_idle must be >= 0")
+        if selector is not None and (not isinstance(selector, (list, tuple)) or len(selector) != 2):
+            raise ValueError(f"selector must be (method, key): {selector!r}")
+        self.network_idle = network_idle
+        self.selector = tuple(selector) if selector is not None else None
+        self.predicate = predicate
+        self.timeout = timeout
+
+    @classmethod
+    def coerce(cls, value: Union[None, "ReadyPolicy", dict]) -> "ReadyPolicy":
+        """
+        DriverSettings(ready=...) / get(ready=...) に渡された値を
+        ReadyPolicy に揃える。
+        """
+        if value is None:
+            return cls()
+        if isinstance(value, ReadyPolicy):
+            return value
+        if isinstance(value, dict):
+            return cls(**value)
+        raise TypeError(f"ready must be a ReadyPolicy or dict, not {type(value).__name__}")
+
+    @property
+    def in_page(self) -> bool:
+        """readyState 以外の条件があり、ブラウザ内で待つ必要があるか"""
+        return self.network_idle is not None or self.selector is not None or bool(self.predicate)
+
+    def __repr__(self):
+        return (f"ReadyPolicy(ready_states={self.ready_states!r}, "
+                f"network_idle={self.network_idle!r}, selector={self.selector!r}, "
+                f"predicate={self.predicate!r})")
+
+
+def install_request_tracker(driver, policy: Optional[ReadyPolicy]) -> bool:
+    """
+    Chromium 系 driver で、
+    以降のすべてのドキュメントに TRACKER_JS を先に仕込む。
+    未対応なら False。
+    """
+    if policy is None or policy.network_idle is None or not hasattr(driver, "execute_cdp_cmd"):
+        return False
+    # webdriver.Remote は Firefox でも execute_cdp_cmd を持つ（呼ぶと RuntimeError）
+    if (getattr(driver, "caps", None) or {}).get("browserName", "").lower() == "firefox":
+        return False
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": TRACKER_JS})
+    except Exception:
+        # CDP を中継しない Grid など。待機開始時の注入で代用する
+        return False
+    return True
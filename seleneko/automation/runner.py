@@ -0,0 +1,246 @@
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
+from urllib3.exceptions import HTTPError as _TransportError
+from ..core.config import log_context
+from .driver_factory import DriverSettings
+
+
+@dataclass
+class Job:
+    """
+    1件の処理単位。
+    url を開いた後に action(client) を呼ぶ（url=None なら遷移しない）。
+    """
+    url: Optional[str]
+    action: Callable[[Any], Any]
+    name: Optional[str] = None
+    timeout: Optional[float] = None
+
+
+@dataclass
+class JobResult:
+    job: Job
+    index: int
+    ok: bool
+    value: Any = None
+    error: Optional[BaseException] = None
+    attempts: int = 1
+    elapsed: float = 0.0
+
+
+def default_concurrency(memory_per_worker_mb: int = 300) -> int:
+    """
+    CPU 数と空きメモリから同時起動できるブラウザ数の上限を決める。
+    """
+    limit = os.cpu_count() or 1
+    try:
+        available = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+        limit = min(limit, available // (memory_per_worker_mb * 1024 * 1024))
+    except (AttributeError, ValueError, OSError):
+        pass
+    return max(1, limit)
+
+
+class _Worker(threading.Thread):
+    """
+    自前の SeleniumClient を1つ持ち、
+    キューからジョブを取り出して処理する。
+    """
+
+    def __init__(self, runner: "JobRunner", number: int):
+        super().__init__(name=f"seleneko-worker-{number}", daemon=True)
+        self.runner = runner
+        self.client = None
+        self.lock = threading.Lock()
+        self.current = None
+        self.deadline = None
+        self.claimed = False
+
+    def run(self):
+        runner = self.runner
+        while True:
+            item = runner._inbox.get()
+            if item is None:
+                break
+            index, job, attempt = item
+            timeout = job.timeout if job.timeout is not None else runner.timeout
+            started = time.perf_counter()
+            with self.lock:
+                self.current = item
+                self.deadline = None if timeout is None else time.monotonic() + timeout
+                self.claimed = False
+            try:
+                with log_context(job_id=job.name or index, attempt=attempt):
+                    client = self._client()
+                    if job.url:
+                        client.get(job.url)
+                    ok, value, error = True, job.action(client), None
+            except Exception as e:
+                ok, value, error = False, None, e
+            with self.lock:
+                claimed, self.claimed = self.claimed, True
+                self.current = None
+            if claimed:
+                # 監視側でタイムアウト扱い済み。結果は捨てる
+                continue
+            elapsed = time.perf_counter() - started
+            runner._finish(self, index, job, attempt, ok, value, error, elapsed)
+        self.discard_client()
+
+    def _client(self):
+        if self.client is None:
+            self.client = self.runner._client_factory()
+        return self.client
+
+    def crashed(self, error: Optional[BaseException]) -> bool:
+        """error がブラウザ / セッションを失ったことによるものか"""
+        if isinstance(error, (InvalidSessionIdException, ConnectionError, _TransportError)):
+            return True
+        if not isinstance(error, WebDriverException):
+            return False
+        # TimeoutException や NoSuchElementException も含まれるので、
+        # driver がまだ応答するかで見分ける
+        driver = getattr(self.client, "_driver", None)
+        try:
+            return driver is None or driver.execute_script("return 1") != 1
+        except Exception:
+            return True
+
+    def discard_client(self):
+        """ブラウザを終了し、次のジョブでは新しい driver を使わせる。"""
+        client, self.client = self.client, None
+        self._quit(client)
+
+    @staticmethod
+    def _quit(client):
+        if client is not None:
+            try:
+                client.quit()
+            except Exception:
+                pass
+
+    def expire(self, now: float):
+        """
+        期限切れのジョブを横取りしてそのキュー項目を返す。
+        対象がなければ None。
+        """
+        with self.lock:
+            if self.current is None or self.claimed or self.deadline is None or now < self.deadline:
+                return None
+            self.claimed = True
+            item = self.current
+            client, self.client = self.client, None
+        # ハングした driver を止めるため、終了処理は別スレッドで行う
+        threading.Thread(target=self._quit, args=(client,), daemon=True).start()
+        return item
+
+
+class JobRunner:
+    """
+    複数ブラウザで Job を並列実行するランナー。
+    ワーカーはそれぞれ専用の driver を持ち、
+    結果は完了順に run() から返る。
+    """
+
+    def __init__(self, settings: Optional[DriverSettings] = None, max_workers: Optional[int] = None,
+                 timeout: Optional[float] = None, retries: int = 1,
+                 memory_per_worker_mb: int = 300, client_factory: Optional[Callable] = None):
+        self.settings = settings or DriverSettings()
+        self.max_workers = max_workers or default_concurrency(memory_per_worker_mb)
+        self.timeout = timeout
+        self.retries = retries
+        self._client_factory = client_factory or self._default_client
+        self._inbox = queue.Queue()
+        self._outbox = queue.Queue()
+
+    def _default_client(self):
+        from . import SeleniumClient
+        return SeleniumClient(self.settings)
+
+    def run(self, jobs: Iterable[Job], poll_interval: float = 0.05) -> Iterator[JobResult]:
+        """
+        ジョブを投入し、
+        完了したものから順に JobResult を返すジェネレータ。
+        """
+        source = iter(jobs)
+        workers = [_Worker(self, i) for i in range(self.max_workers)]
+        for w in workers:
+            w.start()
+        in_flight = 0
+        index = 0
+        exhausted = False
+        try:
+            while True:
+                # 投入量はワーカー数の2倍までに抑え、
+                # 巨大な iterable でもメモリを食わない
+                while not exhausted and in_flight < self.max_workers * 2:
+                    try:
+                        job = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    self._inbox.put((index, job, 1))
+                    index += 1
+                    in_flight += 1
+                if in_flight == 0:
+                    return
+                try:
+                    result = self._outbox.get(timeout=poll_interval)
+                except queue.Empty:
+                    result = None
+                self._check_deadlines(workers)
+                if result is None:
+                    continue
+                in_flight -= 1
+                yield result
+        finally:
+            self._shutdown(workers)
+
+    def run_all(self, jobs: Iterable[Job]) -> List[JobResult]:
+        """全ジョブを実行し、投入順に並べた結果を返す。"""
+        return sorted(self.run(jobs), key=lambda r: r.index)
+
+    # ---- internal ----
+    def _finish(self, worker: _Worker, index: int, job: Job, attempt: int,
+                ok: bool, value, error, elapsed: float):
+        crashed = not ok and worker.crashed(error)
+        if crashed:
+            worker.discard_client()
+        if not ok and crashed and attempt <= self.retries:
+            self._inbox.put((index, job, attempt + 1))
+            return
+        self._outbox.put(JobResult(job=job, index=index, ok=ok, value=value, error=error,
+                                   attempts=attempt, elapsed=elapsed))
+
+    def _check_deadlines(self, workers: List[_Worker]):
+        now = time.monotonic()
+        for w in workers:
+            item = w.expire(now)
+            if item is None:
+                continue
+            index, job, attempt = item
+            timeout = job.timeout if job.timeout is not None else self.timeout
+            error = TimeoutError(f"job {job.name or index} exceeded {timeout}s")
+            if attempt <= self.retries:
+                self._inbox.put((index, job, attempt + 1))
+            else:
+                self._outbox.put(JobResult(job=job, index=index, ok=False, error=error,
+                                           attempts=attempt, elapsed=timeout or 0.0))
+
+    def _shutdown(self, workers: List[_Worker]):
+        # 途中で打ち切られた場合に残ったジョブを捨てる
+        while True:
+            try:
+                self._inbox.get_nowait()
+            except queue.Empty:
+                break
+        for _ in workers:
+            self._inbox.put(None)
+        for w in workers:
+            w.join(timeout=1.0)
+        self._outbox = queue.Queue()
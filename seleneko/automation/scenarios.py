@@ -0,0 +1,258 @@
+"""
+宣言的シナリオ（dict / JSON / YAML）をコンパイルし、
+SeleniumClient 上で繰り返し実行する。
+
+    {"name": "login", "steps": [
+        {"action": "get", "url": "https://example.com/login"},
+        {"action": "type_text_smart", "locator": ["id", "user"], "text": "${userid}"},
+        {"action": "click_smart", "locator": ["css", "button[type=submit]"],
+         "success": {"expect": "url_change"}},
+        {"action": "read", "name": "greeting", "locator": ["css", "h1"]},
+    ]}
+
+ロケータは compile 時に一度だけ解決・検証され、連続する read ステップは
+1回の execute_script にまとめて実行される。
+"""
+import json
+import os
+from string import Template
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from selenium.common.exceptions import TimeoutException
+from .client_base import SeleniumClient as _BaseClient
+
+
+class ScenarioError(RuntimeError):
+    """シナリオ実行中にステップが失敗した"""
+
+
+Step = Callable[[Any, Dict[str, Any], Dict[str, Any]], None]
+
+
+def load_scenario(path: str) -> dict:
+    """JSON / YAML ファイルからシナリオ定義を読み込む。"""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("PyYAML is required to load YAML scenarios") from e
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+
+def compile_scenario(source: Union[dict, list, str]) -> "CompiledScenario":
+    """
+    シナリオ定義を検証してコンパイルする。
+    source は dict / ステップのリスト / ファイルパスのいずれか。
+    """
+    if isinstance(source, str):
+        source = load_scenario(source)
+    if isinstance(source, list):
+        source = {"steps": source}
+    if not isinstance(source, dict) or not isinstance(source.get("steps"), list):
+        raise ValueError("scenario must be a dict with a 'steps' list")
+
+    ops: List[Step] = []
+    pending_reads: List[Tuple[str, dict]] = []
+    for index, step in enumerate(source["steps"]):
+        if not isinstance(step, dict) or "action" not in step:
+            raise ValueError(f"step {index}: must be a dict with an 'action' key")
+        action = step["action"]
+        if action == "read":
+            pending_reads.append(_compile_read(index, step))
+            continue
+        if pending_reads:
+            ops.append(_batched_read(pending_reads))
+            pending_reads = []
+        builder = _BUILDERS.get(action)
+        if builder is None:
+            raise ValueError(f"step {index}: unknown action {action!r}")
+        ops.append(builder(index, step))
+    if pending_reads:
+        ops.append(_batched_read(pending_reads))
+    return CompiledScenario(source.get("name"), ops)
+
+
+class CompiledScenario:
+    """コンパイル済みシナリオ。再解析なしで何度でも実行できる。"""
+
+    def __init__(self, name: Optional[str], ops: List[Step]):
+        self.name = name
+        self._ops = ops
+
+    def __len__(self):
+        return len(self._ops)
+
+    def run(self, client, **variables) -> Dict[str, Any]:
+        """シナリオを実行し、read ステップで取得した値を dict で返す。"""
+        results: Dict[str, Any] = {}
+        for op in self._ops:
+            op(client, variables, results)
+        return results
+
+
+# ---- compile helpers ----
+def _locator(index: int, step: dict, field: str = "locator") -> Tuple[str, str]:
+    loc = step.get(field)
+    if not isinstance(loc, (list, tuple)) or len(loc) != 2:
+        raise ValueError(f"step {index}: {field!r} must be [method, key]")
+    by = _BaseClient._by(str(loc[0]))
+    if by is None:
+        raise ValueError(f"step {index}: unknown locator method {loc[0]!r}")
+    return by, str(loc[1])
+
+
+def _value(step: dict, field: str, default=None):
+    """
+    '${var}' / '$var' を含む文字列は実行時に展開する関数に変換する。
+    run() に渡された変数名だけを置き換え、
+    それ以外の '$'（'pa$$word' など）はそのまま残す。
+    """
+    raw = step.get(field, default)
+    if isinstance(raw, str) and "$" in raw:
+        def _expand(variables):
+            def _sub(m):
+                name = m.group("named") or m.group("braced")
+                return str(variables[name]) if name in variables else m.group(0)
+            return Template.pattern.sub(_sub, raw)
+        return _expand
+    return lambda variables: raw
+
+
+def _require(index: int, step: dict, *fields):
+    for field in fields:
+        if field not in step:
+            raise ValueError(f"step {index}: {step['action']} requires {field!r}")
+
+
+def _fail(index: int, step: dict, message: str):
+    if not step.get("optional"):
+        raise ScenarioError(f"step {index} ({step['action']}): {message}")
+
+
+def _compile_expect(index: int, spec: dict):
+    """{"expect": "appears" | "disappears" | "url_change", ...} を条件生成関数にする。"""
+    kind = spec.get("expect") if isinstance(spec, dict) else None
+    timeout = spec.get("timeout", 5) if isinstance(spec, dict) else 5
+    if kind in ("appears", "disappears"):
+        loc = _locator(index, spec)
+        name = f"expect_{kind}"
+        return lambda client, variables: getattr(client, name)(loc, timeout=timeout)
+    if kind == "url_change":
+        from_url = _value(spec, "from_url")
+
+        def _url_change(client, variables):
+            url = from_url(variables) or client.driver.current_url
+            return client.expect_url_change(from_url=url, timeout=timeout)
+        return _url_change
+    raise ValueError(f"step {index}: unknown expectation {kind!r}")
+
+
+def _compile_read(index: int, step: dict) -> Tuple[str, dict]:
+    _require(index, step, "name")
+    spec = {"locator": _locator(index, step), "attr": str(step.get("attr", "text"))}
+    if "fields" in step:
+        spec["fields"] = step["fields"]
+    elif step.get("all"):
+        spec["all"] = True
+    try:
+        _BaseClient.compile_extract({step["name"]: spec})
+    except ValueError as e:
+        raise ValueError(f"step {index}: {e}") from None
+    return str(step["name"]), spec
+
+
+def _batched_read(reads: List[Tuple[str, dict]]) -> Step:
+    plan = _BaseClient.compile_extract(dict(reads))
+    return lambda client, variables, results: results.update(client.extract(plan))
+
+
+def _build_get(index: int, step: dict) -> Step:
+    _require(index, step, "url")
+    url = _value(step, "url")
+    return lambda client, variables, results: client.get(url(variables))
+
+
+def _build_click_smart(index: int, step: dict) -> Step:
+    loc = _locator(index, step)
+    success = _compile_expect(index, step["success"]) if "success" in step else None
+    timeout, retries = step.get("timeout"), step.get("retries", 3)
+
+    def _op(client, variables, results):
+        cond = success(client, variables) if success else None
+        if not client.click_smart(loc, timeout=timeout, retries=retries, success=cond):
+            _fail(index, step, f"could not click {loc}")
+    return _op
+
+
+def _build_type_text_smart(index: int, step: dict) -> Step:
+    _require(index, step, "text")
+    loc = _locator(index, step)
+    text = _value(step, "text")
+    press_enter, clear_first = step.get("press_enter", False), step.get("clear_first", True)
+
+    def _op(client, variables, results):
+        if not client.type_text_smart(loc, text(variables), press_enter=press_enter,
+                                      clear_first=clear_first):
+            _fail(index, step, f"could not type into {loc}")
+    return _op
+
+
+def _build_fill_form(index: int, step: dict) -> Step:
+    _require(index, step, "fields")
+    if not isinstance(step["fields"], list):
+        raise ValueError(f"step {index}: 'fields' must be a list of {{locator, value}}")
+    fields = [(_locator(index, field), _value(field, "value")) for field in step["fields"]]
+    timeout = step.get("timeout")
+
+    def _op(client, variables, results):
+        filled = client.fill_form({loc: value(variables) for loc, value in fields}, timeout=timeout)
+        failed = [loc for loc, ok in filled.items() if not ok]
+        if failed:
+            _fail(index, step, f"could not fill {failed}")
+    return _op
+
+
+def _build_select_by_text(index: int, step: dict) -> Step:
+    _require(index, step, "text")
+    by, key = _locator(index, step)
+    text = _value(step, "text")
+    return lambda client, variables, results: client.select_by_text(key, text(variables), method=by)
+
+
+def _build_switch_to_frame(index: int, step: dict) -> Step:
+    if "locator" in step:
+        by, key = _locator(index, step)
+        return lambda client, variables, results: client.switch_to_frame(key, method=by)
+    frame = int(step.get("index", 0))
+    return lambda client, variables, results: client.switch_to_frame(frame)
+
+
+def _build_expect(kind: str):
+    def _builder(index: int, step: dict) -> Step:
+        if kind == "url_change":
+            _require(index, step, "from_url")
+        cond_factory = _compile_expect(index, dict(step, expect=kind))
+
+        def _op(client, variables, results):
+            cond = cond_factory(client, variables)
+            try:
+                client._wait(cond["timeout"]).until(cond["callable"])
+            except TimeoutException:
+                _fail(index, step, f"timed out after {cond['timeout']}s")
+        return _op
+    return _builder
+
+
+_BUILDERS = {
+    "get": _build_get,
+    "click_smart": _build_click_smart,
+    "type_text_smart": _build_type_text_smart,
+    "fill_form": _build_fill_form,
+    "select_by_text": _build_select_by_text,
+    "switch_to_frame": _build_switch_to_frame,
+    "expect_appears": _build_expect("appears"),
+    "expect_disappears": _build_expect("disappears"),
+    "expect_url_change": _build_expect("url_change"),
+}
@@ -0,0 +1,167 @@
+"""
+ログイン済みセッション（cookie / localStorage / sessionStorage）の
+保存と再利用。
+
+    ok = cli.login_reusing_session(url, user, pwd, button, "neko", "secret",
+                                   probe=("css", "#logout"))
+
+初回はふつうにログインし、
+probe が成立したら状態を暗号化して config に保存する。
+次回以降は保存した状態を新しい driver に流し込み、
+probe が成立すればログインを省略する。
+期限切れ・probe 不成立のときは保存分を捨ててログインし直す。
+"""
+import hashlib
+import json
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+from ..core import Enc, config as _config
+
+# 現在のオリジンの localStorage / sessionStorage を読む・書く
+CAPTURE_STORAGE_JS = """
+function dump(s) {
+  var out = {};
+  try {
+    for (var i = 0; i < s.length; i++) { var k = s.key(i); out[k] = s.getItem(k); }
+  } catch (e) {}
+  return out;
+}
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+RESTORE_STORAGE_JS = """
+function load(s, items) {
+  try { Object.keys(items).forEach(function (k) { s.setItem(k, items[k]); }); } catch (e) {}
+}
+load(window.localStorage, arguments[0]);
+load(window.sessionStorage, arguments[1]);
+"""
+CLEAR_STORAGE_JS = (
+    "try { window.localStorage.clear(); } catch (e) {}"
+    "try { window.sessionStorage.clear(); } catch (e) {}"
+)
+
+
+def origin_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class SessionSnapshot:
+    """1サイト・1ユーザ分のログイン状態"""
+    __slots__ = ("site", "user", "url", "cookies", "local_storage", "session_storage",
+                 "created_at", "expires_at")
+
+    def __init__(self, site: str, user: str, url: str, cookies: List[dict],
+                 local_storage: Dict[str, str], session_storage: Dict[str, str],
+                 created_at: float, expires_at: float):
+        self.site = site
+        self.user = user
+        self.url = url
+        self.cookies = cookies
+        self.local_storage = local_storage
+        self.session_storage = session_storage
+        self.created_at = created_at
+        self.expires_at = expires_at
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SessionSnapshot":
+        return cls(**{name: data[name] for name in cls.__slots__})
+
+    def __repr__(self):
+        return (f"SessionSnapshot(site={self.site!r}, user={self.user!r}, "
+                f"cookies={len(self.cookies)})")
+
+
+class SessionStore:
+    """
+    SessionSnapshot を Enc で暗号化して config に保存する。
+    キーはサイトとユーザのハッシュなので、
+    設定ファイルからユーザ名は読めない。
+    """
+
+    def __init__(self, conf: Optional[_config] = None, enc: Optional[Enc] = None,
+                 max_age: float = 12 * 3600):
+        self.conf = conf or _config(name=__name__)
+        self.enc = enc or Enc()
+        self.max_age = max_age
+
+    @staticmethod
+    def key(site: str, user: str) -> str:
+        digest = hashlib.sha256(f"{site}\n{user}".encode("utf-8")).hexdigest()[:32]
+        return f"session_{digest}"
+
+    def save(self, snapshot: SessionSnapshot):
+        # ensure_ascii で Enc の扱える印字可能 ASCII だけにしてから暗号化する
+        plain = json.dumps(snapshot.to_dict(), ensure_ascii=True, separators=(",", ":"))
+        self.conf.set_data(self.key(snapshot.site, snapshot.user), self.enc.encrypt(plain))
+
+    def load(self, site: str, user: str) -> Optional[SessionSnapshot]:
+        """
+        保存済みの状態
+        （なし・壊れている・期限切れは None。後2者は削除する）
+        """
+        raw = self.conf.get_data(self.key(site, user))
+        if not raw:
+            return None
+        try:
+            snapshot = SessionSnapshot.from_dict(json.loads(self.enc.decrypt(str(raw))))
+        except (ValueError, KeyError, TypeError) as e:
+            self.conf.write_log(f"Discarding unreadable session snapshot: {e}", species="WARNING")
+            self.delete(site, user)
+            return None
+        if snapshot.expired:
+            self.delete(site, user)
+            return None
+        return snapshot
+
+    def delete(self, site: str, user: str):
+        self.conf.del_data(self.key(site, user))
+
+
+def capture_session(driver, site: str, user: str, max_age: float) -> SessionSnapshot:
+    """
+    現在のページのオリジンについて
+    cookie と storage を読み取る（往復3回）。
+    """
+    storage = driver.execute_script(CAPTURE_STORAGE_JS) or {}
+    now = time.time()
+    return SessionSnapshot(site, user, driver.current_url, list(driver.get_cookies()),
+                           storage.get("local") or {}, storage.get("session") or {},
+                           now, now + max_age)
+
+
+def restore_session(driver, snapshot: SessionSnapshot, entry_url: Optional[str] = None) -> int:
+    """
+    snapshot の状態を driver に流し込む。
+    cookie はそのドメインのページ上でしか設定できないため、
+    先に entry_url（既定: オリジン直下の軽いパス）を開く。
+    設定した cookie 数を返す。
+    """
+    driver.get(entry_url or origin_of(snapshot.url) + "/favicon.ico")
+    now = time.time()
+    restored = 0
+    for cookie in snapshot.cookies:
+        if cookie.get("expiry") is not None and cookie["expiry"] <= now:
+            continue
+        driver.add_cookie(cookie)
+        restored += 1
+    if snapshot.local_storage or snapshot.session_storage:
+        driver.execute_script(RESTORE_STORAGE_JS, snapshot.local_storage, snapshot.session_storage)
+    return restored
+
+
+def clear_session(driver):
+    """
+    現在のオリジンの cookie と storage を消す
+    （復元したセッションが無効だったとき用）。
+    """
+    driver.delete_all_cookies()
+    driver.execute_script(CLEAR_STORAGE_JS)
@@ -1,16 +1,40 @@
+import random
 import time
-from typing import Optional, Tuple
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from typing import Dict, Optional, Tuple
 from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import (
     ElementClickInterceptedException,
     ElementNotInteractableException,
+    JavascriptException,
     StaleElementReferenceException,
     WebDriverException,
 )
 
 
+# scrollIntoView 後、スクロール位置と要素の矩形が
+# 2フレーム連続で変わらなくなるまで待つ。
+# 安定までの ms を返し、settle_timeout を超えた場合は -1 を返す。
+_SETTLE_JS = """
+var el = arguments[0], limit = arguments[1], done = arguments[arguments.length - 1];
+var raf = window.requestAnimationFrame || function (f) { return setTimeout(f, 16); };
+var start = performance.now(), last = null, stable = 0;
+el.scrollIntoView({block: 'center'});
+function tick() {
+  var r = el.getBoundingClientRect();
+  var key = [window.scrollX, window.scrollY, r.top, r.left, r.width, r.height].join(',');
+  if (key === last) {
+    if (++stable >= 2) { done(performance.now() - start); return; }
+  } else {
+    stable = 0;
+    last = key;
+  }
+  if (performance.now() - start > limit) { done(-1); return; }
+  raf(tick);
+}
+raf(tick);
+"""
+
+
 class SmartActionsMixin:
     """
     SeleniumClient に追加される堅牢操作メソッド群。
@@ -18,16 +42,26 @@ class SmartActionsMixin:
     """
 
     def click_smart(self, locator: Tuple[str, str], timeout: Optional[int] = None, retries: int = 3,
-                    success: Optional[dict] = None, delay: float = 0.3) -> bool:
+                    success: Optional[dict] = None, delay: float = 0.3,
+                    adaptive: Optional[bool] = None) -> bool:
+        """
+        スクロール→クリック→成功判定を retries 回まで試す。
+        adaptive=True（既定は settings.adaptive_click）では固定 sleep の代わりに
+        ブラウザ内で位置が安定するのを待ち、
+        再試行時のみ delay を基準に指数バックオフする。
+        """
         method, key = locator
-        by = self._METHOD_MAP.get(method.lower())
+        by = self._by(method)
+        if adaptive is None:
+            adaptive = self.settings.adaptive_click
         for attempt in range(retries):
             try:
-                elem = WebDriverWait(self.driver, timeout or self.settings.timeout_sec).until(
-                    EC.element_to_be_clickable((by, key))
-                )
-                self.driver.execute_script("arguments[0].scrollIntoView({block:'center'});", elem)
-                time.sleep(delay)
+                elem = self._locate((by, key), timeout, clickable=True)
+                if adaptive:
+                    self._scroll_and_settle(elem, locator, delay)
+                else:
+                    self.driver.execute_script("arguments[0].scrollIntoView({block:'center'});", elem)
+                    time.sleep(delay)
                 try:
                     elem.click()
                 except (ElementClickInterceptedException, ElementNotInteractableException):
@@ -40,12 +74,53 @@ class SmartActionsMixin:
 
                 if success:
                     cond = success["callable"]
-                    WebDriverWait(self.driver, success.get("timeout", 5)).until(cond)
+                    self._wait(success.get("timeout", 5)).until(cond)
+                    if success.get("expect") == "url_change":
+                        self._elements.clear()
                 return True
             except (StaleElementReferenceException, WebDriverException):
-                time.sleep(delay)
+                # 再試行では要素を取り直す
+                self._elements.pop((by, key), None)
+                if not adaptive:
+                    time.sleep(delay)
+                elif attempt + 1 < retries:
+                    time.sleep(self._backoff(attempt, delay))
         return False
 
+    # ---- adaptive waiting ----
+    @staticmethod
+    def _backoff(attempt: int, base: float, cap: float = 2.0) -> float:
+        """指数バックオフ + full jitter"""
+        return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+    def _scroll_and_settle(self, elem, locator: Tuple[str, str], delay: float):
+        limit_ms = int(self.settings.settle_timeout * 1000)
+        try:
+            settled = self.driver.execute_async_script(_SETTLE_JS, elem, limit_ms)
+        except JavascriptException:
+            # async script が使えない環境では従来の固定 sleep に戻す
+            self.driver.execute_script("arguments[0].scrollIntoView({block:'center'});", elem)
+            time.sleep(delay)
+            return
+        self._record_settle(locator, limit_ms if settled is None or settled < 0 else settled)
+
+    def _record_settle(self, locator: Tuple[str, str], ms: float):
+        entry = self._settle_stats.get(tuple(locator))
+        if entry is None:
+            entry = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0}
+            self._settle_stats[tuple(locator)] = entry
+        entry["count"] += 1
+        entry["total_ms"] += ms
+        entry["max_ms"] = max(entry["max_ms"], ms)
+        entry["last_ms"] = ms
+
+    def settle_stats(self) -> Dict[Tuple[str, str], dict]:
+        """adaptive クリックで要素が安定するまでの時間（ロケータ別, ms）"""
+        return {
+            loc: dict(entry, avg_ms=entry["total_ms"] / entry["count"])
+            for loc, entry in self._settle_stats.items()
+        }
+
     def type_text_smart(self, locator: Tuple[str, str], text: str,
                         press_enter=False, clear_first=True) -> bool:
         method, key = locator
@@ -71,11 +146,11 @@ class SmartActionsMixin:
     def expect_url_change(self, from_url: str, timeout: int = 5):
         def _cond(driver):
             return driver.current_url != from_url
-        return {"callable": _cond, "timeout": timeout}
+        return {"callable": _cond, "timeout": timeout, "expect": "url_change"}
 
     def expect_appears(self, locator: Tuple[str, str], timeout: int = 5):
         method, key = locator
-        by = self._METHOD_MAP.get(method.lower())
+        by = self._by(method)
         def _cond(driver):
             try:
                 driver.find_element(by, key)
@@ -86,7 +161,7 @@ class SmartActionsMixin:
 
     def expect_disappears(self, locator: Tuple[str, str], timeout: int = 5):
         method, key = locator
-        by = self._METHOD_MAP.get(method.lower())
+        by = self._by(method)
         def _cond(driver):
             try:
                 driver.find_element(by, key)
@@ -0,0 +1,190 @@
+"""
+ページのスナップショット
+（スクリーンショット・DOM・コンソールログ）の保存。
+
+    future = cli.snapshot("after-login")
+    ...
+    # {"id": ..., "files": {"screenshot": ".../objects/ab/ab12....png", ...}}
+    print(future.result())
+
+ブラウザからの取得だけを呼び出し元のスレッドで行い、
+圧縮と書き込みは SnapshotWriter のスレッドが担当する。
+ファイル名は内容の sha256 なので、同じ内容は一度しか保存されない。
+"""
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Dict, Optional
+
+_CHUNK = 1 << 16
+
+# PNG はすでに圧縮済みなのでそのまま保存する
+_RAW_KINDS = {"screenshot": ".png"}
+_TEXT_KINDS = {"dom": ".html", "console": ".json"}
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+class SnapshotWriter:
+    """
+    スナップショットを root/objects/ 以下に内容アドレスで書き込み、
+    root/index.jsonl に記録する。
+    compression は "auto" / "zstd" / "gzip" / None。
+    "auto" は zstandard があれば zstd、なければ gzip。
+    """
+
+    def __init__(self, root: str, compression: Optional[str] = "auto", level: Optional[int] = None):
+        if compression == "auto":
+            compression = "zstd" if _zstd() is not None else "gzip"
+        if compression not in ("zstd", "gzip", None):
+            raise ValueError("compression must be 'auto', 'zstd', 'gzip' or None")
+        if compression == "zstd" and _zstd() is None:
+            raise ImportError("compression='zstd' requires the zstandard package")
+        self.root = root
+        self.compression = compression
+        self.level = level
+        self._queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {"snapshots": 0, "objects_written": 0, "objects_deduplicated": 0,
+                      "bytes_in": 0, "bytes_written": 0}
+
+    def submit(self, parts: Dict[str, bytes], meta: Optional[dict] = None) -> Future:
+        """
+        parts（kind -> bytes）を書き込み待ちに積み、
+        記録内容を返す Future を返す。
+        """
+        future = Future()
+        self._start()
+        self._queue.put((dict(parts), dict(meta or {}), future))
+        return future
+
+    def flush(self, timeout: Optional[float] = None):
+        """積まれたスナップショットの書き込みが終わるまで待つ。"""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    # ---- internal ----
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="seleneko-snapshots",
+                                                daemon=True)
+                self._thread.start()
+                atexit.register(self.flush, 10.0)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            parts, meta, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._write_snapshot(parts, meta))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def _write_snapshot(self, parts: Dict[str, bytes], meta: dict) -> dict:
+        files = {kind: self._write_object(kind, data)
+                 for kind, data in parts.items() if data is not None}
+        record = dict(meta, files=files)
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, "index.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stats["snapshots"] += 1
+        return record
+
+    def _write_object(self, kind: str, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        ext = _RAW_KINDS.get(kind) or _TEXT_KINDS.get(kind, ".bin")
+        compress = kind not in _RAW_KINDS and self.compression is not None
+        if compress:
+            ext += ".zst" if self.compression == "zstd" else ".gz"
+        directory = os.path.join(self.root, "objects", digest[:2])
+        path = os.path.join(directory, digest + ext)
+        self.stats["bytes_in"] += len(data)
+        if os.path.exists(path):
+            self.stats["objects_deduplicated"] += 1
+            return path
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as raw:
+                if compress:
+                    self._stream_compressed(raw, data)
+                else:
+                    raw.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        self.stats["objects_written"] += 1
+        self.stats["bytes_written"] += os.path.getsize(path)
+        return path
+
+    def _stream_compressed(self, raw, data: bytes):
+        view = memoryview(data)
+        if self.compression == "zstd":
+            cctx = _zstd().ZstdCompressor(level=self.level or 3)
+            with cctx.stream_writer(raw, closefd=False) as out:
+                for i in range(0, len(view), _CHUNK):
+                    out.write(view[i:i + _CHUNK])
+        else:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=self.level or 6,
+                               mtime=0) as out:
+                for i in range(0, len(view), _CHUNK):
+                    out.write(view[i:i + _CHUNK])
+
+
+def capture(driver, screenshot: bool = True, dom: bool = True,
+            console: bool = True) -> Dict[str, bytes]:
+    """
+    driver から各パーツを取得する。
+    ブラウザとの通信のみで、ディスクには触れない。
+    """
+    parts: Dict[str, bytes] = {}
+    if screenshot:
+        parts["screenshot"] = driver.get_screenshot_as_png()
+    if dom:
+        parts["dom"] = (driver.page_source or "").encode("utf-8")
+    if console:
+        try:
+            logs = driver.get_log("browser")
+        except Exception:
+            # Firefox など get_log 非対応のドライバ
+            logs = None
+        if logs is not None:
+            parts["console"] = json.dumps(logs, ensure_ascii=False).encode("utf-8")
+    return parts
+
+
+def snapshot_meta(driver, label: Optional[str]) -> dict:
+    return {
+        "id": uuid.uuid4().hex,
+        "label": label,
+        "time": time.time(),
+        "url": getattr(driver, "current_url", None),
+    }
@@ -0,0 +1,212 @@
+"""
+1つのブラウザ内で複数タブを使い回して並行にページを読み込む。
+
+    with TabPool(cli, size=4, max_uses=50) as tabs:
+        for tab in tabs.map(urls):
+            rows.append(tab.extract(spec))
+
+map() は空いているタブで次々にナビゲーションを開始し
+（読み込み完了は待たない）、読み込みが終わったタブから順に返す。
+返されたタブへの get / extract / click_smart は
+そのタブに切り替えてから実行される。
+max_uses 回使ったタブは閉じて新しいタブに置き換える。
+
+page_load_strategy="none" が必要。"eager" / "normal" では chromedriver が
+コマンドの前にタブの読み込み完了を待つので、確認した順に返る。
+ダウンロードになる URL は文書が入れ替わらないため map() では扱えない
+（TimeoutException になる）。
+"""
+import time
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+from selenium.common.exceptions import TimeoutException
+
+# 読み込み完了を待たずに遷移を開始する。
+# 旧ページには印を付けておき、
+# 印のないドキュメントに入れ替わったことで遷移済みと判定する。
+# #以降だけが違う URL は文書が入れ替わらないので印を付けない。
+NAVIGATE_JS = """
+var a = document.createElement("a");
+a.href = arguments[0];
+var here = location.href.split("#")[0];
+if (a.href.indexOf("#") < 0 || a.href.split("#")[0] !== here) window.__selenekoLeaving = true;
+window.location.href = arguments[0];
+"""
+LOADED_JS = "return window.__selenekoLeaving ? null : document.readyState;"
+
+
+class Tab:
+    """TabPool 内の1タブ。操作は自動でこのタブに切り替えてから行う。"""
+    __slots__ = ("pool", "handle", "url", "uses", "elements", "started_at")
+
+    def __init__(self, pool: "TabPool", handle: str):
+        self.pool = pool
+        self.handle = handle
+        self.url: Optional[str] = None
+        self.uses = 0
+        # タブごとの要素キャッシュ（切替時に client._elements と差し替える）
+        self.elements = {}
+        self.started_at: Optional[float] = None
+
+    def run(self, fn: Callable[..., Any], *args, **kwargs):
+        """fn(client, *args, **kwargs) をこのタブで実行する。"""
+        return fn(self.pool.activate(self), *args, **kwargs)
+
+    def get(self, url: str):
+        self.pool.activate(self).get(url)
+        self.url = url
+
+    def extract(self, spec) -> dict:
+        return self.pool.activate(self).extract(spec)
+
+    def click_smart(self, locator: Tuple[str, str], **kwargs) -> bool:
+        return self.pool.activate(self).click_smart(locator, **kwargs)
+
+    def find_visible(self, key: str, method="xpath", timeout=None):
+        return self.pool.activate(self).find_visible(key, method, timeout)
+
+    def __repr__(self):
+        return f"Tab(handle={self.handle!r}, url={self.url!r}, uses={self.uses})"
+
+
+class TabPool:
+    """
+    client の driver に size 個のタブを開いて管理する。
+    1タブは max_uses 回（map で返した回数）使ったら閉じて開き直し、
+    レンダラのメモリを解放する。
+    """
+
+    def __init__(self, client, size: int = 4, max_uses: Optional[int] = 50,
+                 timeout: Optional[float] = None):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        if client.settings.page_load_strategy != "none":
+            # 読み込み中のタブへのコマンドが完了まで待たされる
+            raise ValueError("TabPool requires DriverSettings(page_load_strategy='none')")
+        self.client = client
+        self.size = size
+        self.max_uses = max_uses
+        self.timeout = timeout
+        self.tabs: List[Tab] = []
+        self._home: Optional[str] = None
+        self._home_elements = None
+        self._stats = {"opened": 0, "recycled": 0, "switches": 0, "loads": 0}
+
+    # ---- context manager ----
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ---- lifecycle ----
+    def open(self) -> List[Tab]:
+        """タブを size 個開く（開いた直後のタブは about:blank）。"""
+        if self._home is None:
+            self._home = self.client.contexts.current
+            self._home_elements = self.client._elements
+        while len(self.tabs) < self.size:
+            self.tabs.append(Tab(self, self._new_handle()))
+        return self.tabs
+
+    def close(self):
+        """開いたタブをすべて閉じ、元のウィンドウに戻る。"""
+        if self._home is None:
+            return
+        contexts = self.client.contexts
+        tabs, self.tabs = self.tabs, []
+        for tab in tabs:
+            contexts.close_window(tab.handle)
+        contexts.switch_window(self._home)
+        self.client._elements = self._home_elements
+        self._home = self._home_elements = None
+
+    def activate(self, tab: Tab):
+        """tab に切り替えて client を返す（そのタブなら往復しない）。"""
+        if self.client.contexts.switch_window(tab.handle):
+            self._stats["switches"] += 1
+        self.client._elements = tab.elements
+        return self.client
+
+    # ---- concurrent loading ----
+    def load(self, tab: Tab, url: str):
+        """tab で url への遷移を開始する（完了は待たない）。"""
+        self.activate(tab).driver.execute_script(NAVIGATE_JS, url)
+        self.client.contexts.navigated()
+        tab.elements.clear()
+        tab.url = url
+        tab.started_at = time.monotonic()
+        self._stats["loads"] += 1
+
+    def map(self, urls: Iterable[str], timeout: Optional[float] = None) -> Iterator[Tab]:
+        """
+        urls を空いているタブで並行に読み込み、
+        読み込みが終わったタブから順に返す。
+        返したタブは次の要素を要求された時点で空きに戻る。
+        1ページが timeout（既定: settings.timeout_sec）以内に
+        読み込めなければ TimeoutException。
+        """
+        self.open()
+        timeout = timeout or self.timeout or self.client.settings.timeout_sec
+        pending = iter(urls)
+        idle = deque(self.tabs)
+        loading: List[Tab] = []
+        exhausted = False
+        while True:
+            while idle and not exhausted:
+                url = next(pending, None)
+                if url is None:
+                    exhausted = True
+                    break
+                tab = idle.popleft()
+                self.load(tab, url)
+                loading.append(tab)
+            if not loading:
+                return
+            tab = self._next_loaded(loading, timeout)
+            loading.remove(tab)
+            yield tab
+            idle.append(self.release(tab))
+
+    def release(self, tab: Tab) -> Tab:
+        """
+        タブの使用回数を数え、
+        上限に達していれば新しいタブに置き換えて返す。
+        """
+        tab.uses += 1
+        if not self.max_uses or tab.uses < self.max_uses:
+            return tab
+        index = self.tabs.index(tab)
+        fresh = Tab(self, self._new_handle())
+        self.client.contexts.close_window(tab.handle)
+        self.tabs[index] = fresh
+        self._stats["recycled"] += 1
+        return fresh
+
+    def stats(self) -> dict:
+        stats = dict(self._stats)
+        stats["tabs"] = len(self.tabs)
+        return stats
+
+    # ---- internal ----
+    def _next_loaded(self, loading: List[Tab], timeout: float) -> Tab:
+        ready = self.client.settings.ready.ready_states
+        intervals = self.client.settings.wait_policy.intervals()
+        # 切替の往復を減らすため、いま表示中のタブから確認する
+        while True:
+            current = self.client.contexts.known_current
+            ordered = sorted(loading, key=lambda t: t.handle != current)
+            for tab in ordered:
+                if self.activate(tab).driver.execute_script(LOADED_JS) in ready:
+                    return tab
+            now = time.monotonic()
+            late = [t for t in loading if now - t.started_at >= timeout]
+            if late:
+                raise TimeoutException(
+                    f"Tab did not finish loading {late[0].url} within {timeout}s")
+            time.sleep(next(intervals))
+
+    def _new_handle(self) -> str:
+        self._stats["opened"] += 1
+        return self.client.contexts.open_window("tab")
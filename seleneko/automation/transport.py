@@ -0,0 +1,57 @@
+"""
+driver（chromedriver / geckodriver / リモート）への
+コマンド送信に使う HTTP 接続の調整。
+
+Selenium の RemoteConnection は urllib3 の PoolManager を持つが、
+接続数・再試行は既定値のまま使われる。
+DriverSettings の http_* 設定をここで command_executor に反映する。
+"""
+from typing import Optional
+import urllib3
+
+# 送信前に失敗した（接続できなかった）場合は
+# どのコマンドも再送してよいが、
+# 送信後の切断で再送してよいのは副作用のないメソッドだけ
+# （WebDriver の DELETE はウィンドウ・cookie・セッションを消す）
+_IDEMPOTENT = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def make_retry(retries: int) -> urllib3.Retry:
+    """
+    接続リセット時の再試行。
+    POST（クリック等）は送信済みの可能性があるため、
+    接続前の失敗のみ再送する。
+    """
+    return urllib3.Retry(total=retries, connect=retries, read=retries, status=0,
+                         redirect=False, allowed_methods=_IDEMPOTENT, raise_on_status=False)
+
+
+def tune_connection(executor, keep_alive: bool = True, pool_size: Optional[int] = None,
+                    retries: Optional[int] = None, timeout: Optional[float] = None):
+    """
+    RemoteConnection の接続プールを設定し直す。
+    pool_size は同一ホストへ保持する接続数、
+    retries は接続リセット時の再試行回数。
+    """
+    config = getattr(executor, "_client_config", None)
+    if config is None or (keep_alive and config.keep_alive
+                          and pool_size is None and retries is None and timeout is None):
+        return executor
+    if timeout is not None:
+        config.timeout = timeout
+    pool_args = {}
+    if pool_size is not None:
+        pool_args["maxsize"] = pool_size
+    if retries is not None:
+        pool_args["retries"] = make_retry(retries)
+    if pool_args:
+        config.init_args_for_pool_manager = {"init_args_for_pool_manager": pool_args}
+    config.keep_alive = keep_alive
+    old = getattr(executor, "_conn", None)
+    if keep_alive:
+        executor._conn = executor._get_connection_manager()
+    elif hasattr(executor, "_conn"):
+        del executor._conn
+    if old is not None:
+        old.clear()
+    return executor
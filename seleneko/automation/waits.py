@@ -0,0 +1,109 @@
+import time
+from typing import Callable, Iterator, Optional, Tuple
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from .extraction import LOCATE_JS
+
+
+# ロケータに一致する要素が表示されるまで MutationObserver で待つ。
+# 一致したら true、limit ms 経過したら false を返す。
+OBSERVE_JS = LOCATE_JS + """
+var by = arguments[0], key = arguments[1], limit = arguments[2];
+var done = arguments[arguments.length - 1], timer = null, obs = null;
+function visible() {
+  var el = find(document, by, key);
+  if (!el || !el.getClientRects().length) return false;
+  return window.getComputedStyle(el).visibility !== "hidden";
+}
+function finish(v) {
+  if (obs) obs.disconnect();
+  if (timer) clearTimeout(timer);
+  done(v);
+}
+if (visible()) {
+  done(true);
+} else {
+  obs = new MutationObserver(function () { if (visible()) finish(true); });
+  obs.observe(document.documentElement || document,
+              {childList: true, subtree: true, attributes: true});
+  timer = setTimeout(function () { finish(false); }, limit);
+}
+"""
+
+
+class WaitPolicy:
+    """
+    待機処理の共通方針。
+    poll_interval から始めて backoff 倍ずつ
+    max_interval まで間隔を伸ばしながら条件を確認する。
+    mutation_observer=True ならロケータ待ちはブラウザ内の
+    DOM 変化をトリガに即座に再確認する。
+    """
+
+    def __init__(self, poll_interval: float = 0.05, backoff: float = 1.5,
+                 max_interval: float = 0.5, mutation_observer: bool = False,
+                 observer_slice: float = 2.0):
+        if poll_interval <= 0 or backoff < 1:
+            raise ValueError("poll_interval must be > 0 and backoff >= 1")
+        self.poll_interval = poll_interval
+        self.backoff = backoff
+        self.max_interval = max(max_interval, poll_interval)
+        self.mutation_observer = mutation_observer
+        self.observer_slice = observer_slice
+
+    def intervals(self) -> Iterator[float]:
+        interval = self.poll_interval
+        while True:
+            yield interval
+            interval = min(interval * self.backoff, self.max_interval)
+
+
+class PolicyWait:
+    """WebDriverWait 互換の until() を WaitPolicy に従って実行する。"""
+
+    def __init__(self, driver, timeout: float, policy: Optional[WaitPolicy] = None,
+                 locator: Optional[Tuple[str, str]] = None,
+                 ignored_exceptions=(NoSuchElementException,)):
+        self._driver = driver
+        self._timeout = float(timeout)
+        self._policy = policy or WaitPolicy()
+        self._locator = locator
+        self._ignored = tuple(ignored_exceptions)
+
+    def until(self, method: Callable, message: str = ""):
+        screen = stacktrace = None
+        end = time.monotonic() + self._timeout
+        intervals = self._policy.intervals()
+        observe = self._locator is not None and self._policy.mutation_observer
+        while True:
+            try:
+                value = method(self._driver)
+                if value:
+                    return value
+            except self._ignored as exc:
+                screen = getattr(exc, "screen", None)
+                stacktrace = getattr(exc, "stacktrace", None)
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            if observe:
+                matched = self._observe(remaining)
+                if matched is None:
+                    observe = False
+                elif not matched:
+                    continue
+                # 要素は表示済みでも条件（クリック可能など）が
+                # 未成立の場合は通常のポーリングで待つ
+            time.sleep(min(next(intervals), remaining))
+        raise TimeoutException(message, screen, stacktrace)
+
+    def _observe(self, remaining: float) -> Optional[bool]:
+        """
+        DOM 変化を待つ。一致すれば True、
+        時間切れは False、observer が使えなければ None。
+        """
+        by, key = self._locator
+        limit_ms = int(min(remaining, self._policy.observer_slice) * 1000)
+        try:
+            return bool(self._driver.execute_async_script(OBSERVE_JS, by, key, limit_ms))
+        except (WebDriverException, AttributeError):
+            return None
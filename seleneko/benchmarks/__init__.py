@@ -0,0 +1,8 @@
+"""
+seleneko 自身のオーバーヘッドを測るベンチマーク。
+
+    python -m seleneko.benchmarks.suite --save baseline.json
+    python -m seleneko.benchmarks.suite --compare baseline.json
+    python -m seleneko.benchmarks.load --sessions 16 --latency 0.005
+    python -m seleneko.benchmarks.bench_encrypter
+"""
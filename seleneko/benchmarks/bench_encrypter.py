@@ -0,0 +1,112 @@
+"""
+Enc の暗号化・復号スループットを、
+テーブル化前の実装（LegacyEnc）と比較する。
+
+    python -m seleneko.benchmarks.bench_encrypter [--size 64] [--count 2000]
+"""
+import argparse
+import random
+import string
+import time
+from seleneko.core.encrypter import Enc
+
+
+class LegacyEnc(object):
+    """テーブル化前の Enc（互換性検証とベンチマークの基準用）"""
+    __alphabets = (string.ascii_lowercase + string.ascii_uppercase + string.digits + " "
+                   + string.punctuation)
+
+    def __init__(self, n=4, enc_set=("&", ")", ">", "x", "K", "A", "w", "f", "?", "z", "C")):
+        self.n = n
+        self.enc_set = list(enc_set)
+
+    def Base_10_to_n(self, X):
+        X_dumy = X
+        n = self.n
+        out = ''
+        while X_dumy > 0:
+            out = str(X_dumy % n) + out
+            X_dumy = int(X_dumy / n)
+        return out
+
+    def Base_n_to_10(self, X):
+        out = 0
+        n = self.n
+        X = str(X)
+        for i in range(1, len(X) + 1):
+            out += int(X[-i]) * (n ** (i - 1))
+        return out
+
+    def encrypt(self, keyword):
+        num_array = ""
+        for i in range(len(keyword)):
+            tmp_num = self.__alphabets.find(keyword[i])
+            tmp_num += 13
+            tmp_num = tmp_num % len(self.__alphabets)
+            tmp_num = self.Base_10_to_n(tmp_num)
+            tmp_num = str(tmp_num)
+            tmp_num = tmp_num.zfill(3)
+            if len(num_array) != 0:
+                num_array += "-"
+            num_array += tmp_num
+        for i, sym in enumerate(self.enc_set):
+            num_array = num_array.replace(str(i), str(sym))
+        return num_array
+
+    def decrypt(self, keyword):
+        for j, sym in enumerate(self.enc_set):
+            keyword = keyword.replace(str(sym), str(j))
+        num_array = ""
+        for key in keyword.split("-"):
+            tmp_num = int(key)
+            tmp_num = self.Base_n_to_10(tmp_num)
+            tmp_num -= 13
+            tmp_num += len(self.__alphabets)
+            tmp_num = tmp_num % len(self.__alphabets)
+            num_array += self.__alphabets[tmp_num]
+        return num_array
+
+
+def make_payloads(size: int, count: int, seed: int = 0):
+    rnd = random.Random(seed)
+    chars = string.ascii_letters + string.digits + string.punctuation + " "
+    return ["".join(rnd.choice(chars) for _ in range(size)) for _ in range(count)]
+
+
+def measure(func, payloads) -> float:
+    """payloads を1周処理するのにかかった秒数"""
+    started = time.perf_counter()
+    for p in payloads:
+        func(p)
+    return time.perf_counter() - started
+
+
+def compare(size: int = 64, count: int = 2000) -> dict:
+    """旧実装と現実装の encrypt / decrypt の処理時間と倍率を返す。"""
+    payloads = make_payloads(size, count)
+    legacy, current = LegacyEnc(), Enc()
+    encrypted = [legacy.encrypt(p) for p in payloads]
+    results = {}
+    for name, old, new, data in (
+        ("encrypt", legacy.encrypt, current.encrypt, payloads),
+        ("decrypt", legacy.decrypt, current.decrypt, encrypted),
+    ):
+        t_old, t_new = measure(old, data), measure(new, data)
+        results[name] = {"legacy_sec": t_old, "current_sec": t_new,
+                         "speedup": t_old / t_new if t_new else float("inf")}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enc throughput: legacy vs table-driven")
+    parser.add_argument("--size", type=int, default=64, help="characters per payload")
+    parser.add_argument("--count", type=int, default=2000, help="number of payloads")
+    args = parser.parse_args(argv)
+    for name, r in compare(args.size, args.count).items():
+        rate = args.count / r["current_sec"] if r["current_sec"] else float("inf")
+        print(f"{name}: legacy {r['legacy_sec']:.4f}s  current {r['current_sec']:.4f}s  "
+              f"x{r['speedup']:.1f}  ({rate:,.0f} payloads/s)")
+
+
+if __name__ == "__main__":
+    main()
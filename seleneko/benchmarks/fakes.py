@@ -0,0 +1,108 @@
+"""
+ブラウザを起動せずに seleneko を動かすための
+WebDriver / WebElement の軽量モック。
+テスト（conftest）とベンチマーク（suite）で共用する。
+"""
+
+
+class FakeElement:
+    """最小限のモック要素。クリックやsend_keysを模倣。"""
+    def __init__(self, attrs=None, on_click=None):
+        self.attrs = attrs or {}
+        self.on_click = on_click or (lambda: None)
+        self._cleared = False
+        self.sent_keys = []
+        self.clicked = False
+
+    def click(self):
+        self.clicked = True
+        self.on_click()
+
+    def clear(self):
+        self._cleared = True
+        self.attrs["value"] = ""
+
+    def send_keys(self, value):
+        if value == "\ue007":  # Keys.ENTER
+            self.attrs["enter"] = True
+        else:
+            self.attrs["value"] = self.attrs.get("value", "") + str(value)
+        self.sent_keys.append(value)
+
+    def get_attribute(self, key):
+        return self.attrs.get(key)
+
+    def is_displayed(self):
+        return self.attrs.get("displayed", True)
+
+    def is_enabled(self):
+        return not self.attrs.get("disabled", False)
+
+
+class FakeDriver:
+    """Selenium WebDriver 互換の軽量モック"""
+    def __init__(self):
+        self.elements = {}
+        self.current_url = "https://example.com/login"
+        self.title = "Mock Page"
+        self.window_handles = ["main"]
+        self.current_window_handle = "main"
+        self.cookies = []
+        self.cdp_calls = []
+        self.quit_called = False
+
+    def add_element(self, by, key, element: FakeElement):
+        self.elements[(by, key)] = element
+
+    def find_element(self, by, key):
+        if (by, key) not in self.elements:
+            raise Exception(f"No such element: {(by, key)}")
+        return self.elements[(by, key)]
+
+    def execute_script(self, script, *args):
+        # DOM状態などを模倣
+        if "document.readyState" in script:
+            return "complete"
+        if script == "return 1":
+            return 0 if self.quit_called else 1
+        return 0
+
+    def execute_cdp_cmd(self, cmd, params):
+        # DriverPool のリセットに使うコマンドだけ受け付ける
+        self.cdp_calls.append((cmd, params))
+        if cmd == "Page.getNavigationHistory":
+            return {"currentIndex": 0, "entries": [{"url": self.current_url}]}
+        if cmd == "Network.clearBrowserCookies":
+            self.cookies.clear()
+            return {}
+        if cmd == "Storage.clearDataForOrigin":
+            return {}
+        raise Exception(f"Unsupported CDP command: {cmd}")
+
+    def get(self, url):
+        self.current_url = url
+
+    @property
+    def switch_to(self):
+        return self
+
+    def frame(self, *args, **kwargs): ...
+    def default_content(self): ...
+
+    def window(self, handle):
+        self.current_window_handle = handle
+
+    def new_window(self, kind="tab"):
+        handle = f"{kind}-{len(self.window_handles)}"
+        self.window_handles.append(handle)
+        self.current_window_handle = handle
+        self.current_url = "about:blank"
+
+    def close(self):
+        self.window_handles.remove(self.current_window_handle)
+
+    def delete_all_cookies(self):
+        self.cookies.clear()
+
+    def quit(self):
+        self.quit_called = True
@@ -0,0 +1,129 @@
+"""
+StubWebDriverServer に対して複数セッションを並列に走らせる負荷試験。
+
+    python -m seleneko.benchmarks.load --sessions 16 --iterations 20 --latency 0.005
+
+ブラウザを起動せずに、HTTP 接続・コマンド往復・並列セッション時の
+seleneko 側の挙動を測る。
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+from .stub_webdriver import StubWebDriverServer
+
+BASE = "http://stub.test"
+
+LOGIN_HTML = """<html><head><title>Login</title></head><body>
+<form action="/home" method="post">
+  <input id="user" name="user"><input id="pass" name="pass" type="password">
+  <button id="go" type="submit">Sign in</button>
+</form></body></html>"""
+
+HOME_HTML = """<html><head><title>Home</title></head><body>
+<h1>Welcome</h1>
+<table id="orders">
+  <tr class="row"><td class="id">1</td><td class="name">neko</td></tr>
+  <tr class="row"><td class="id">2</td><td class="name">tama</td></tr>
+  <tr class="row"><td class="id">3</td><td class="name">mike</td></tr>
+</table>
+<a id="next" href="/login">logout</a>
+</body></html>"""
+
+EXTRACT_SPEC = {
+    "heading": ("css", "h1"),
+    "orders": {"locator": ("css", "tr.row"),
+               "fields": {"id": ("css", "td.id"), "name": ("css", "td.name")}},
+}
+
+
+def install_pages(server: StubWebDriverServer):
+    server.add_page(BASE + "/login", LOGIN_HTML)
+    server.add_page(BASE + "/home", HOME_HTML)
+
+
+def scenario(cli) -> dict:
+    """1 イテレーション: ログイン -> 抽出 -> ログアウト"""
+    cli.login(BASE + "/login", ("css", "#user"), ("css", "#pass"), ("css", "#go"), "neko", "secret")
+    data = cli.extract(EXTRACT_SPEC)
+    cli.click_smart(("css", "#next"), delay=0)
+    return data
+
+
+def _percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+
+def run(sessions: int = 4, iterations: int = 10, latency: float = 0.0) -> Dict[str, object]:
+    from seleneko.automation import DriverSettings, SeleniumClient
+    durations: List[float] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+    with tempfile.TemporaryDirectory(prefix="seleneko-load-") as tmp, \
+            StubWebDriverServer(latency=latency) as server:
+        install_pages(server)
+        settings = DriverSettings(remote_url=server.url, download_dir=tmp, adaptive_click=True)
+        barrier = threading.Barrier(sessions)
+
+        def worker():
+            try:
+                with SeleniumClient(settings, work_directory=tmp) as cli:
+                    barrier.wait()
+                    for _ in range(iterations):
+                        started = time.perf_counter()
+                        scenario(cli)
+                        with lock:
+                            durations.append(time.perf_counter() - started)
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+                barrier.abort()
+
+        threads = [threading.Thread(target=worker) for _ in range(sessions)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        commands = sum(server.command_counts.values())
+    return {
+        "sessions": sessions,
+        "iterations": len(durations),
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "commands": commands,
+        "commands_per_s": commands / elapsed if elapsed else 0.0,
+        "iteration_ms": {
+            "mean": statistics.mean(durations) * 1e3 if durations else 0.0,
+            "p50": _percentile(durations, 0.5) * 1e3 if durations else 0.0,
+            "p95": _percentile(durations, 0.95) * 1e3 if durations else 0.0,
+        },
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="parallel seleneko sessions against the stub WebDriver")
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent browser sessions")
+    parser.add_argument("--iterations", type=int, default=10, help="scenario runs per session")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="simulated seconds per WebDriver command")
+    args = parser.parse_args(argv)
+
+    result = run(args.sessions, args.iterations, args.latency)
+    t = result["iteration_ms"]
+    print(f"sessions={result['sessions']} iterations={result['iterations']} "
+          f"elapsed={result['elapsed_s']:.2f}s commands/s={result['commands_per_s']:.0f}")
+    print(f"iteration ms: mean={t['mean']:.1f} p50={t['p50']:.1f} p95={t['p95']:.1f}")
+    for error in result["errors"]:
+        print(f"ERROR {error}", file=sys.stderr)
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
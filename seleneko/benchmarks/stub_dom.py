@@ -0,0 +1,459 @@
+"""
+スタブ WebDriver サーバ用の最小限の DOM。
+
+HTML を木構造に読み込み、WebDriver の探索方式
+（css selector / xpath / tag name / link text など）の
+よく使われる部分集合で要素を探す。
+JavaScript は実行しない。
+"""
+import re
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterator, List, Optional
+
+_VOID = frozenset({"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+                   "param", "source", "track", "wbr"})
+_NO_TEXT = frozenset({"script", "style", "head", "title", "template"})
+
+
+class InvalidSelector(ValueError):
+    """スタブが解釈できない、または不正なセレクタ"""
+
+
+class Node:
+    __slots__ = ("tag", "attrs", "children", "parent", "text", "value", "checked", "selected",
+                 "content")
+
+    def __init__(self, tag: str, attrs: Optional[Dict[str, str]] = None, parent: "Node" = None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.children: List["Node"] = []
+        self.parent = parent
+        self.text = ""  # tag == "#text" のときの文字列
+        self.value = self.attrs.get("value", "")
+        self.checked = "checked" in self.attrs
+        self.selected = "selected" in self.attrs
+        self.content: Optional["Document"] = None  # iframe の中身
+
+    # ---- tree ----
+    def elements(self) -> Iterator["Node"]:
+        for child in self.children:
+            if child.tag != "#text":
+                yield child
+
+    def descendants(self) -> Iterator["Node"]:
+        for child in self.elements():
+            yield child
+            yield from child.descendants()
+
+    def ancestors(self) -> Iterator["Node"]:
+        node = self.parent
+        while node is not None:
+            yield node
+            node = node.parent
+
+    def closest(self, tag: str) -> Optional["Node"]:
+        return next((a for a in self.ancestors() if a.tag == tag), None)
+
+    # ---- content ----
+    def raw_text(self) -> str:
+        if self.tag == "#text":
+            return self.text
+        if self.tag in _NO_TEXT:
+            return ""
+        return "".join(c.raw_text() for c in self.children)
+
+    def visible_text(self) -> str:
+        if not self.displayed:
+            return ""
+        if self.tag == "#text":
+            return self.text
+        if self.tag in _NO_TEXT:
+            return ""
+        parts = []
+        for c in self.children:
+            t = c.visible_text()
+            parts.append("\n" + t if c.tag in ("br", "div", "p", "li", "tr") else t)
+        return " ".join(" ".join(parts).split()) if self.tag != "pre" else "".join(parts)
+
+    def inner_html(self) -> str:
+        return "".join(c.outer_html() for c in self.children)
+
+    def outer_html(self) -> str:
+        if self.tag == "#text":
+            return self.text
+        attrs = "".join(f' {k}="{v}"' for k, v in self.attrs.items())
+        if self.tag in _VOID:
+            return f"<{self.tag}{attrs}>"
+        return f"<{self.tag}{attrs}>{self.inner_html()}</{self.tag}>"
+
+    @property
+    def classes(self) -> List[str]:
+        return self.attrs.get("class", "").split()
+
+    @property
+    def displayed(self) -> bool:
+        for node in (self, *self.ancestors()):
+            if node.tag == "#document":
+                break
+            style = node.attrs.get("style", "").replace(" ", "").lower()
+            if "hidden" in node.attrs or "display:none" in style or "visibility:hidden" in style:
+                return False
+            if node.tag in _NO_TEXT or (node.tag == "input" and node.attrs.get("type") == "hidden"):
+                return False
+        return True
+
+    @property
+    def enabled(self) -> bool:
+        return "disabled" not in self.attrs
+
+    def attribute(self, name: str) -> Optional[str]:
+        """WebElement.get_attribute 相当（プロパティを優先）"""
+        if name == "value" and self.tag in ("input", "textarea", "select", "option"):
+            if self.tag == "select":
+                chosen = next((o for o in self.descendants()
+                               if o.tag == "option" and o.selected), None)
+                return chosen.attribute("value") if chosen else ""
+            if self.tag == "option" and "value" not in self.attrs:
+                return " ".join(self.raw_text().split())
+            return self.value
+        if name == "checked":
+            return "true" if self.checked else None
+        if name == "selected":
+            return "true" if self.selected else None
+        if name in ("textContent", "innerText"):
+            return self.visible_text()
+        if name in ("innerHTML", "outerHTML"):
+            return self.inner_html() if name == "innerHTML" else self.outer_html()
+        if name == "className":
+            name = "class"
+        if name in self.attrs:
+            value = self.attrs[name]
+            if value == "" and name in ("disabled", "readonly", "required", "multiple"):
+                return "true"
+            return value
+        return None
+
+
+class Document(Node):
+    def __init__(self, url: str):
+        super().__init__("#document")
+        self.url = url
+
+    @property
+    def title(self) -> str:
+        title = next((n for n in self.descendants() if n.tag == "title"), None)
+        return " ".join("".join(c.text for c in title.children).split()) if title else ""
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self, doc: Document):
+        super().__init__(convert_charrefs=True)
+        self.stack: List[Node] = [doc]
+
+    def handle_starttag(self, tag, attrs):
+        parent = self.stack[-1]
+        node = Node(tag, {k: (v if v is not None else "") for k, v in attrs}, parent)
+        parent.children.append(node)
+        if tag not in _VOID:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        parent = self.stack[-1]
+        node = Node("#text", parent=parent)
+        node.text = data
+        parent.children.append(node)
+
+
+def parse_html(html: str, url: str = "about:blank") -> Document:
+    doc = Document(url)
+    builder = _TreeBuilder(doc)
+    builder.feed(html)
+    builder.close()
+    return doc
+
+
+# ---------------------------------------------------------------------------
+# 探索
+# ---------------------------------------------------------------------------
+def find_all(root: Node, by: str, key: str) -> List[Node]:
+    """root 配下から by / key に一致する要素を文書順で返す。"""
+    if by == "css selector":
+        return css_select(root, key)
+    if by == "xpath":
+        return xpath_select(root, key)
+    if by == "id":
+        return [n for n in root.descendants() if n.attrs.get("id") == key]
+    if by == "name":
+        return [n for n in root.descendants() if n.attrs.get("name") == key]
+    if by == "class name":
+        return [n for n in root.descendants() if key in n.classes]
+    if by == "tag name":
+        return [n for n in root.descendants() if n.tag == key.lower()]
+    if by in ("link text", "partial link text"):
+        links = [n for n in root.descendants() if n.tag == "a"]
+        if by == "link text":
+            return [a for a in links if a.visible_text().strip() == key]
+        return [a for a in links if key in a.visible_text()]
+    raise InvalidSelector(f"unsupported locator strategy: {by}")
+
+
+# ---- CSS ----
+_CSS_TOKEN = re.compile(r"""
+    (?P<ws>\s*(?P<comb>[>+~])\s*|\s+)
+  | (?P<tag>\*|[a-zA-Z][\w-]*)
+  | \#(?P<id>[\w-]+)
+  | \.(?P<cls>[\w-]+)
+  | \[\s*(?P<attr>[\w:-]+)\s*
+      (?:(?P<op>[~^$*|]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\]\s]+))\s*)?\]
+  | :(?P<pseudo>first-child|last-child|checked|disabled|enabled)
+""", re.X)
+
+
+def _compile_compound(conds: List[Callable[[Node], bool]]) -> Callable[[Node], bool]:
+    return lambda n: all(c(n) for c in conds)
+
+
+def _attr_cond(name: str, op: Optional[str], value: Optional[str]) -> Callable[[Node], bool]:
+    def cond(n: Node) -> bool:
+        actual = n.attrs.get(name)
+        if actual is None:
+            return False
+        if op is None:
+            return True
+        if op == "=":
+            return actual == value
+        if op == "~=":
+            return value in actual.split()
+        if op == "^=":
+            return actual.startswith(value)
+        if op == "$=":
+            return actual.endswith(value)
+        if op == "*=":
+            return value in actual
+        return actual == value or actual.startswith(value + "-")  # |=
+    return cond
+
+
+def _pseudo_cond(name: str) -> Callable[[Node], bool]:
+    if name == "first-child":
+        return lambda n: n.parent is not None and next(n.parent.elements(), None) is n
+    if name == "last-child":
+        return lambda n: n.parent is not None and list(n.parent.elements())[-1] is n
+    if name == "checked":
+        return lambda n: n.checked or n.selected
+    if name == "disabled":
+        return lambda n: not n.enabled
+    return lambda n: n.enabled
+
+
+def _parse_css(selector: str):
+    """
+    'a b > c' を [(結合子, 判定関数), ...] に変換する。
+    先頭の結合子は None。
+    """
+    steps, conds, comb, pos = [], [], None, 0
+    selector = selector.strip()
+    while pos < len(selector):
+        m = _CSS_TOKEN.match(selector, pos)
+        if not m or m.end() == pos:
+            raise InvalidSelector(f"unsupported css selector: {selector!r}")
+        pos = m.end()
+        if m.group("ws") is not None:
+            if conds:
+                steps.append((comb, _compile_compound(conds)))
+                conds = []
+            comb = m.group("comb") or " "
+            continue
+        if m.group("tag"):
+            tag = m.group("tag").lower()
+            if tag != "*":
+                conds.append(lambda n, t=tag: n.tag == t)
+        elif m.group("id"):
+            conds.append(lambda n, v=m.group("id"): n.attrs.get("id") == v)
+        elif m.group("cls"):
+            conds.append(lambda n, v=m.group("cls"): v in n.classes)
+        elif m.group("attr"):
+            value = next((m.group(g) for g in ("dq", "sq", "bare") if m.group(g) is not None), None)
+            conds.append(_attr_cond(m.group("attr"), m.group("op"), value))
+        else:
+            conds.append(_pseudo_cond(m.group("pseudo")))
+    if not conds:
+        raise InvalidSelector(f"unsupported css selector: {selector!r}")
+    steps.append((comb, _compile_compound(conds)))
+    return steps
+
+
+def _matches_steps(node: Node, steps, root: Node) -> bool:
+    comb, cond = steps[-1]
+    if not cond(node):
+        return False
+    if len(steps) == 1:
+        return True
+    rest = steps[:-1]
+    if comb == ">":
+        parent = node.parent
+        return parent is not None and parent is not root and _matches_steps(parent, rest, root)
+    if comb in ("+", "~"):
+        siblings = list(node.parent.elements()) if node.parent else []
+        before = siblings[:siblings.index(node)]
+        candidates = before[-1:] if comb == "+" else before
+        return any(_matches_steps(s, rest, root) for s in candidates)
+    for anc in node.ancestors():
+        if anc is root:
+            break
+        if _matches_steps(anc, rest, root):
+            return True
+    return False
+
+
+def css_select(root: Node, selector: str) -> List[Node]:
+    groups = [_parse_css(part) for part in _split_top(selector, ",")]
+    return [n for n in root.descendants() if any(_matches_steps(n, g, root) for g in groups)]
+
+
+# ---- XPath ----
+_XPATH_STEP = re.compile(r"(?P<axis>//|/)?(?P<test>\*|\.\.|\.|[a-zA-Z][\w-]*)"
+                         r"(?P<preds>(?:\[[^\[\]]*(?:\[[^\[\]]*\][^\[\]]*)*\])*)")
+_LITERAL = r"""(?:"([^"]*)"|'([^']*)')"""
+# text() / . / normalize-space(...) のいずれか
+_TEXT = r"(text\(\)|\.|normalize-space\((?:\.|text\(\))?\))"
+_PRED_PATTERNS = [
+    (re.compile(r"^\d+$"), "index"),
+    (re.compile(r"^last\(\)$"), "last"),
+    (re.compile(r"^@([\w:-]+)$"), "has_attr"),
+    (re.compile(r"^@([\w:-]+)\s*(!?=)\s*" + _LITERAL + "$"), "attr_eq"),
+    (re.compile(r"^" + _TEXT + r"\s*(!?=)\s*" + _LITERAL + "$"), "text_eq"),
+    (re.compile(r"^contains\(\s*@([\w:-]+)\s*,\s*" + _LITERAL + r"\s*\)$"), "attr_contains"),
+    (re.compile(r"^contains\(\s*" + _TEXT + r"\s*,\s*" + _LITERAL + r"\s*\)$"), "text_contains"),
+    (re.compile(r"^starts-with\(\s*@([\w:-]+)\s*,\s*" + _LITERAL + r"\s*\)$"), "attr_starts"),
+]
+
+
+def _split_top(expr: str, sep: str) -> List[str]:
+    """括弧・引用符の外にある sep で分割する。"""
+    parts, depth, quote, start = [], 0, None, 0
+    i = 0
+    while i < len(expr):
+        ch = expr[i]
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif depth == 0 and expr.startswith(sep, i):
+            parts.append(expr[start:i])
+            i += len(sep)
+            start = i
+            continue
+        i += 1
+    parts.append(expr[start:])
+    return [p.strip() for p in parts]
+
+
+def _node_text(node: Node, fn: str) -> str:
+    if fn == "text()":
+        return "".join(c.text for c in node.children if c.tag == "#text")
+    raw = node.raw_text() if fn in (".", "normalize-space(.)", "normalize-space()") else \
+        "".join(c.text for c in node.children if c.tag == "#text")
+    return " ".join(raw.split()) if fn.startswith("normalize-space") else raw
+
+
+def _predicate(expr: str) -> Callable[[Node, int, int], bool]:
+    expr = expr.strip()
+    for sep in (" or ", " and "):
+        parts = _split_top(expr, sep)
+        if len(parts) > 1:
+            conds = [_predicate(p) for p in parts]
+            if sep == " or ":
+                return lambda n, i, size: any(c(n, i, size) for c in conds)
+            return lambda n, i, size: all(c(n, i, size) for c in conds)
+    if expr.startswith("not(") and expr.endswith(")"):
+        inner = _predicate(expr[4:-1])
+        return lambda n, i, size: not inner(n, i, size)
+    for pattern, kind in _PRED_PATTERNS:
+        m = pattern.match(expr)
+        if not m:
+            continue
+        g = m.groups()
+        if kind == "index":
+            return lambda n, i, size, k=int(expr): i == k
+        if kind == "last":
+            return lambda n, i, size: i == size
+        if kind == "has_attr":
+            return lambda n, i, size: g[0] in n.attrs
+        literal = g[-2] if g[-2] is not None else g[-1]
+        if kind == "attr_eq":
+            eq = g[1] == "="
+            return lambda n, i, size: (n.attrs.get(g[0]) == literal) == eq
+        if kind == "text_eq":
+            eq = g[1] == "="
+            return lambda n, i, size: (_node_text(n, g[0]) == literal) == eq
+        if kind == "attr_contains":
+            return lambda n, i, size: literal in n.attrs.get(g[0], "")
+        if kind == "text_contains":
+            return lambda n, i, size: literal in _node_text(n, g[0])
+        return lambda n, i, size: n.attrs.get(g[0], "").startswith(literal)
+    raise InvalidSelector(f"unsupported xpath predicate: [{expr}]")
+
+
+def _xpath_steps(expr: str):
+    steps, pos = [], 0
+    expr = expr.strip()
+    if expr.startswith("(") or "|" in expr:
+        raise InvalidSelector(f"unsupported xpath: {expr!r}")
+    while pos < len(expr):
+        m = _XPATH_STEP.match(expr, pos)
+        if not m or m.end() == pos:
+            raise InvalidSelector(f"unsupported xpath: {expr!r}")
+        pos = m.end()
+        preds = re.findall(r"\[((?:[^\[\]]|\[[^\[\]]*\])*)\]", m.group("preds"))
+        steps.append((m.group("axis") or "", m.group("test"), [_predicate(p) for p in preds]))
+    return steps
+
+
+def xpath_select(root: Node, expr: str) -> List[Node]:
+    steps = _xpath_steps(expr)
+    # 絶対パスは文書ルートから
+    context = [_document_of(root)] if steps and steps[0][0] else [root]
+    for axis, test, preds in steps:
+        result: List[Node] = []
+        seen = set()
+        for ctx in context:
+            if test == ".":
+                candidates = [ctx]
+            elif test == "..":
+                candidates = [ctx.parent] if ctx.parent is not None else []
+            else:
+                pool = ctx.descendants() if axis == "//" else ctx.elements()
+                candidates = [n for n in pool if test == "*" or n.tag == test.lower()]
+            for pred in preds:
+                size = len(candidates)
+                candidates = [n for i, n in enumerate(candidates, 1) if pred(n, i, size)]
+            for n in candidates:
+                if id(n) not in seen:
+                    seen.add(id(n))
+                    result.append(n)
+        context = result
+    order = {id(n): i for i, n in enumerate(_document_of(root).descendants())}
+    return sorted(context, key=lambda n: order.get(id(n), -1))
+
+
+def _document_of(node: Node) -> Node:
+    while node.parent is not None:
+        node = node.parent
+    return node
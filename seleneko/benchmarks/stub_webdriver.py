@@ -0,0 +1,844 @@
+"""
+ブラウザなしで seleneko を HTTP 層から負荷試験するための
+W3C WebDriver スタブサーバ。
+
+    with StubWebDriverServer(latency=0.002) as server:
+        server.add_page("http://stub.test/login", LOGIN_HTML)
+        with SeleniumClient(DriverSettings(remote_url=server.url)) as cli:
+            cli.login("http://stub.test/login", ...)
+
+ページは stub_dom の簡易 DOM に読み込まれ、
+クリック（リンク・フォーム送信・チェック）と文字入力を再現する。
+JavaScript は実行せず、seleneko と Selenium が使う既知のスクリプトだけを
+Python で代行する（add_script で追加可能）。
+
+代行分はスクリプトの意味を Python で写したもので、
+JS 自体の誤りはスタブ上のテストでは見つからない。
+スクリプトを変えたら対応する Python 版も直すこと。
+実物の JS は tests/test_js_scripts.py が Node.js で実行して確かめ、
+代行分に頼るテストには stub_js マーカーを付けている。
+"""
+import base64
+import json
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import unquote, urldefrag, urlencode, urljoin, urlsplit
+from seleneko.automation.extraction import EXTRACT_JS
+from seleneko.automation.forms import FILL_JS
+from seleneko.automation.network import PAGE_WEIGHT_JS
+from seleneko.automation.readiness import READY_CHECK_JS, READY_JS
+from seleneko.automation.sessions import CAPTURE_STORAGE_JS, CLEAR_STORAGE_JS, RESTORE_STORAGE_JS
+from seleneko.automation.tabs import LOADED_JS, NAVIGATE_JS
+from seleneko.automation.waits import OBSERVE_JS
+from .stub_dom import Document, InvalidSelector, Node, find_all, parse_html
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+BLANK_HTML = "<html><head><title></title></head><body></body></html>"
+# 1x1 の透明 PNG
+_PNG = base64.b64encode(bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082")).decode()
+
+_ENTER = ("\ue006", "\ue007")  # Keys.RETURN / Keys.ENTER
+_BACKSPACE = "\ue003"
+
+
+class WebDriverError(Exception):
+    _STATUS = {
+        "invalid session id": 404, "no such element": 404, "stale element reference": 404,
+        "no such window": 404, "no such frame": 404, "unknown command": 404,
+        "invalid selector": 400, "invalid argument": 400, "javascript error": 500,
+        "element not interactable": 400,
+    }
+
+    def __init__(self, error: str, message: str = ""):
+        super().__init__(message or error)
+        self.error = error
+        self.status = self._STATUS.get(error, 500)
+
+
+class _Window:
+    def __init__(self, handle: str):
+        self.handle = handle
+        self.history: List[str] = []
+        self.index = -1
+        self.doc: Document = parse_html(BLANK_HTML)
+        self.frames: List[Node] = []  # 現在の frame までの iframe 要素
+        self.session_storage: Dict[str, Dict[str, str]] = {}  # origin -> items
+        self.ready_at = 0.0  # スクリプトで開始した遷移の読み込み完了時刻
+        # 実行中の fetch（[完了時刻, body 末尾に追加する html]）と
+        # 最後に完了した時刻
+        self.fetches: List[list] = []
+        self.net_last = 0.0
+
+    def settle(self):
+        """完了時刻を過ぎた fetch の結果を DOM に反映する。"""
+        now = time.monotonic()
+        while self.fetches and self.fetches[0][0] <= now:
+            done_at, html = self.fetches.pop(0)
+            body = next((n for n in self.doc.descendants() if n.tag == "body"), self.doc)
+            for node in parse_html(html).children:
+                node.parent = body
+                body.children.append(node)
+            self.net_last = done_at
+
+
+class _Session:
+    def __init__(self, session_id: str, capabilities: dict):
+        self.id = session_id
+        self.capabilities = capabilities
+        self.lock = threading.Lock()
+        self.windows: Dict[str, _Window] = {}
+        self.current: Optional[_Window] = None
+        self.elements: Dict[str, Node] = {}
+        self.element_ids: Dict[int, str] = {}
+        self.cookies: List[dict] = []
+        self.local_storage: Dict[str, Dict[str, str]] = {}  # origin -> items
+        self.timeouts = {"implicit": 0, "pageLoad": 300000, "script": 30000}
+        self.rect = {"x": 0, "y": 0, "width": 800, "height": 600}
+        self.open_window()
+
+    def open_window(self) -> _Window:
+        window = _Window(uuid.uuid4().hex)
+        self.windows[window.handle] = window
+        if self.current is None:
+            self.current = window
+        return window
+
+    @property
+    def window(self) -> _Window:
+        if self.current is None or self.current.handle not in self.windows:
+            raise WebDriverError("no such window", "current window was closed")
+        return self.current
+
+    @property
+    def context(self) -> Document:
+        window = self.window
+        window.settle()
+        return window.frames[-1].content if window.frames else window.doc
+
+    def ref(self, node: Node) -> dict:
+        eid = self.element_ids.get(id(node))
+        if eid is None or self.elements.get(eid) is not node:
+            eid = uuid.uuid4().hex
+            self.elements[eid] = node
+            self.element_ids[id(node)] = eid
+        return {ELEMENT_KEY: eid}
+
+    def node(self, eid: str) -> Node:
+        node = self.elements.get(eid)
+        if node is None:
+            raise WebDriverError("no such element", f"unknown element {eid}")
+        root = node
+        while root.parent is not None:
+            root = root.parent
+        if root is not self.context:
+            raise WebDriverError("stale element reference",
+                                 "element is not attached to the current page")
+        return node
+
+
+class StubWebDriverServer:
+    """
+    複数セッションを同時に扱える W3C WebDriver スタブ。
+    latency はコマンドごとの疑似遅延（秒）、
+    command_latency でコマンド名別に上書きできる。
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 command_latency: Optional[Dict[str, float]] = None, cdp: bool = True):
+        self.latency = latency
+        self.command_latency = dict(command_latency or {})
+        # Chromium の CDP コマンド
+        # （Target.getTargets / Page.addScriptToEvaluateOnNewDocument）に応答するか
+        self.cdp = cdp
+        self.pages: Dict[str, str] = {}
+        self.load_times: Dict[str, float] = {}
+        self.page_fetches: Dict[str, tuple] = {}
+        # CDP で新しいドキュメントに仕込まれたスクリプト
+        self.new_document_scripts: List[str] = []
+        # ログインが必要なページ（url -> (cookie 名, ログインページ)）と、
+        # ログインを受け付ける送信先
+        self.protected: Dict[str, tuple] = {}
+        self.login_actions: Dict[str, str] = {}
+        self.tokens: set = set()
+        self.submissions: List[dict] = []
+        self.command_counts: Counter = Counter()
+        self._scripts: List[tuple] = []
+        self._sessions: Dict[str, _Session] = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.request_queue_size = 1024
+        self._httpd.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- lifecycle ----
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubWebDriverServer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-webdriver",
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    # ---- content ----
+    def add_page(self, url: str, html: str, load_time: float = 0.0, fetches=()):
+        """
+        url で html を返す。load_time は読み込みにかかる疑似時間（秒）。
+        fetches は読み込み後に走る fetch / XHR の
+        [(所要秒, 完了時に body へ追加する html), ...]。
+        """
+        self.pages[urldefrag(url)[0]] = html
+        self.load_times[urldefrag(url)[0]] = load_time
+        self.page_fetches[urldefrag(url)[0]] = tuple(fetches)
+
+    def protect(self, url: str, cookie: str, login_url: str):
+        """url は有効な cookie がなければ login_url を表示する。"""
+        self.protected[urldefrag(url)[0]] = (cookie, login_url)
+
+    def add_login(self, action_url: str, cookie: str):
+        """
+        action_url へのフォーム送信でログインさせ、
+        cookie に有効なトークンを発行する。
+        """
+        self.login_actions[urldefrag(action_url)[0].split("?", 1)[0]] = cookie
+
+    def expire_logins(self):
+        """
+        発行済みのトークンをすべて無効にする
+        （サーバ側のセッション切れ）。
+        """
+        with self._lock:
+            self.tokens.clear()
+
+    def add_script(self, marker: str, handler: Callable[[_Session, list], object]):
+        """
+        script に marker を含む execute_script を
+        handler(session, args) で代行する。
+        """
+        self._scripts.insert(0, (marker, handler))
+
+    @property
+    def session_count(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    # ---- dispatch ----
+    def handle(self, method: str, path: str, body: dict):
+        for route_method, pattern, name, handler in _ROUTES:
+            if route_method != method:
+                continue
+            m = pattern.fullmatch(path)
+            if not m:
+                continue
+            delay = self.command_latency.get(name, self.latency)
+            if delay:
+                time.sleep(delay)
+            with self._lock:
+                self.command_counts[name] += 1
+            params = {k: unquote(v) for k, v in m.groupdict().items()}
+            session_id = params.pop("session", None)
+            if session_id is None:
+                return handler(self, body, **params)
+            with self._lock:
+                session = self._sessions.get(session_id)
+            if session is None:
+                raise WebDriverError("invalid session id", f"no session {session_id}")
+            with session.lock:
+                return handler(self, session, body, **params)
+        raise WebDriverError("unknown command", f"{method} {path}")
+
+    # ---- navigation helpers ----
+    def load(self, session: _Session, url: str, record: bool = True, blocking: bool = True):
+        window = session.window
+        base = urldefrag(url)[0]
+        guard = self.protected.get(base)
+        if guard is not None and not self._logged_in(session, guard[0]):
+            url = base = guard[1]
+        html = self.pages.get(base)
+        if html is None:
+            html = self.pages.get(base.split("?", 1)[0], BLANK_HTML)
+        window.doc = parse_html(html, url)
+        load_time = self.load_times.get(base, 0.0)
+        if blocking:
+            if load_time:
+                time.sleep(load_time)
+            window.ready_at = 0.0
+        else:
+            window.ready_at = time.monotonic() + load_time
+        window.frames = []
+        start = max(time.monotonic(), window.ready_at)
+        window.fetches = sorted([start + delay, html]
+                                for delay, html in self.page_fetches.get(base, ()))
+        window.net_last = start
+        if record:
+            del window.history[window.index + 1:]
+            window.history.append(url)
+            window.index = len(window.history) - 1
+
+    def submit(self, session: _Session, form: Node):
+        doc = session.context
+        action = urljoin(doc.url, form.attrs.get("action") or doc.url)
+        method = form.attrs.get("method", "get").lower()
+        fields = {}
+        for field in form.descendants():
+            name = field.attrs.get("name")
+            if not name or not field.enabled:
+                continue
+            kind = field.attrs.get("type") if field.tag == "input" else None
+            if kind in ("checkbox", "radio") and not field.checked:
+                continue
+            if field.tag in ("input", "textarea", "select"):
+                if kind in ("submit", "button", "image"):
+                    continue
+                fields[name] = field.attribute("value")
+        with self._lock:
+            self.submissions.append({"session": session.id, "url": action, "method": method,
+                                     "fields": fields})
+        cookie = self.login_actions.get(action.split("?", 1)[0])
+        if cookie is not None:
+            token = uuid.uuid4().hex
+            with self._lock:
+                self.tokens.add(token)
+            _add_cookie(self, session, {"cookie": {"name": cookie, "value": token, "path": "/",
+                                                   "domain": urlsplit(action).hostname}})
+        if method == "get" and fields:
+            action = action.split("?", 1)[0] + "?" + urlencode(fields)
+        self.load(session, action)
+
+    def _logged_in(self, session: _Session, cookie: str) -> bool:
+        with self._lock:
+            return any(c.get("name") == cookie and c.get("value") in self.tokens
+                       for c in session.cookies)
+
+    @staticmethod
+    def _storage(session: _Session, which: str) -> Dict[str, str]:
+        origin = "{0.scheme}://{0.netloc}".format(urlsplit(session.context.url))
+        holder = session.local_storage if which == "local" else session.window.session_storage
+        return holder.setdefault(origin, {})
+
+    def click(self, session: _Session, node: Node):
+        if not node.displayed:
+            raise WebDriverError("element not interactable", "element is not displayed")
+        if not node.enabled:
+            return
+        kind = node.attrs.get("type", "").lower()
+        if node.tag == "input" and kind == "checkbox":
+            node.checked = not node.checked
+        elif node.tag == "input" and kind == "radio":
+            form = node.closest("form") or session.context
+            for other in form.descendants():
+                if other.tag == "input" and other.attrs.get("name") == node.attrs.get("name"):
+                    other.checked = other is node
+        elif node.tag == "option":
+            select = node.closest("select")
+            if select is not None and "multiple" not in select.attrs:
+                for other in select.descendants():
+                    other.selected = False
+            multiple = select is not None and "multiple" in select.attrs
+            node.selected = not node.selected if multiple else True
+        target = next((n for n in (node, *node.ancestors())
+                       if n.tag in ("a", "button", "input")), None)
+        if target is None:
+            return
+        href = target.attrs.get("href") if target.tag == "a" else None
+        kind = target.attrs.get("type", "submit" if target.tag == "button" else "").lower()
+        if href and not href.startswith(("#", "javascript:")):
+            self.load(session, urljoin(session.context.url, href))
+        elif (target.tag == "button" and kind == "submit") or \
+                (target.tag == "input" and kind in ("submit", "image")):
+            form = target.closest("form")
+            if form is not None:
+                self.submit(session, form)
+
+    def _ready(self, session: _Session, states, idle_ms, loc, predicate) -> bool:
+        """READY_JS の ready() の Python 版"""
+        window = session.window
+        doc = session.context
+        now = time.monotonic()
+        if ("complete" if now >= window.ready_at else "loading") not in states:
+            return False
+        if idle_ms is not None and (window.fetches or (now - window.net_last) * 1000 < idle_ms):
+            return False
+        if loc and not any(n.displayed for n in find_all(doc, loc[0], loc[1])):
+            return False
+        if predicate:
+            handler = next((h for marker, h in self._scripts if marker in predicate), None)
+            if handler is None:
+                raise WebDriverError("javascript error",
+                                     "the stub server cannot evaluate this predicate")
+            return bool(handler(session, []))
+        return True
+
+    def _wait_ready(self, session: _Session, args: list, blocking: bool) -> bool:
+        states, idle_ms, loc, predicate = args[:4]
+        end = time.monotonic() + (args[4] / 1000.0 if blocking else 0)
+        while not self._ready(session, states, idle_ms, loc, predicate):
+            if time.monotonic() >= end:
+                return False
+            time.sleep(0.005)
+        return True
+
+    # ---- scripts ----
+    def run_script(self, session: _Session, script: str, args: list, is_async: bool):
+        for marker, handler in self._scripts:
+            if marker in script:
+                return handler(session, args)
+        if script == FILL_JS:
+            return [_fill(session.context, *entry) for entry in args[0]]
+        if script == CAPTURE_STORAGE_JS:
+            return {"local": dict(self._storage(session, "local")),
+                    "session": dict(self._storage(session, "session"))}
+        if script == RESTORE_STORAGE_JS:
+            self._storage(session, "local").update(args[0])
+            self._storage(session, "session").update(args[1])
+            return None
+        if script == CLEAR_STORAGE_JS:
+            self._storage(session, "local").clear()
+            self._storage(session, "session").clear()
+            return None
+        if script == NAVIGATE_JS:
+            self.load(session, args[0], blocking=False)
+            return None
+        if script in (READY_JS, READY_CHECK_JS):
+            return self._wait_ready(session, args, script == READY_JS)
+        if script == LOADED_JS:
+            return "complete" if time.monotonic() >= session.window.ready_at else None
+        if script.startswith("/* getAttribute */"):
+            return args[0].attribute(args[1])
+        if script.startswith("/* isDisplayed */"):
+            return args[0].displayed
+        if script == EXTRACT_JS:
+            return _extract(session.context, args[0])
+        if script == PAGE_WEIGHT_JS:
+            page = self.pages.get(urldefrag(session.context.url)[0], "")
+            return {"document": len(page), "resources": []}
+        if script == OBSERVE_JS:
+            by, key, limit = args[:3]
+            if any(n.displayed for n in find_all(session.context, by, key)):
+                return True
+            # スタブの DOM は他のコマンドでしか変化しないので、
+            # ブラウザ同様 limit まで待って false
+            time.sleep(limit / 1000.0)
+            return False
+        if "document.readyState" in script:
+            return "complete"
+        if script.strip() == "return 1":
+            return 1
+        if "document.title" in script:
+            return session.context.title
+        if "location.href" in script:
+            return session.context.url
+        if is_async:
+            if "requestAnimationFrame" in script:
+                return 0
+            raise WebDriverError("javascript error",
+                                 "the stub server does not run asynchronous scripts")
+        return None
+
+
+def _fill(root: Node, by: str, key: str, value) -> list:
+    """FILL_JS の Python 版"""
+    found = find_all(root, by, key)
+    if not found:
+        return ["missing", None]
+    node = found[0]
+    if not node.displayed or not node.enabled or "readonly" in node.attrs:
+        return ["unusable", node.tag]
+    kind = node.attrs.get("type", "").lower()
+    if node.tag == "input" and kind in ("checkbox", "radio"):
+        if kind == "radio" and value:
+            form = node.closest("form") or root
+            for other in form.descendants():
+                if other.tag == "input" and other.attrs.get("name") == node.attrs.get("name"):
+                    other.checked = False
+        node.checked = bool(value)
+        return ["ok", node.tag]
+    if node.tag == "select":
+        wanted = [str(v) for v in (value if isinstance(value, list) else [value])]
+        options = [n for n in node.descendants() if n.tag == "option"]
+        for option in options:
+            option.selected = (option.attribute("value") in wanted
+                               or option.visible_text().strip() in wanted)
+        chosen = sum(o.selected for o in options)
+        expected = len(wanted) if "multiple" in node.attrs else 1
+        return ["ok" if chosen == expected else "mismatch", node.tag]
+    if node.tag in ("input", "textarea"):
+        node.value = str(value)
+        return ["ok", node.tag]
+    return ["mismatch", node.tag]
+
+
+def _extract(root: Node, plan: list) -> dict:
+    """EXTRACT_JS の Python 版"""
+    def read(node, attr):
+        if node is None:
+            return None
+        if attr == "text":
+            return node.visible_text().strip()
+        if attr == "html":
+            return node.inner_html()
+        if attr == "value":
+            return node.attribute("value")
+        return node.attrs.get(attr)
+
+    out = {}
+    for entry in plan:
+        name, by, key, attr, mode = entry[:5]
+        found = find_all(root, by, key)
+        if mode == "one":
+            out[name] = read(found[0] if found else None, attr)
+        elif mode == "all":
+            out[name] = [read(n, attr) for n in found]
+        else:
+            out[name] = [_extract(n, entry[5]) for n in found]
+    return out
+
+
+# ---------------------------------------------------------------------------
+# コマンド
+# ---------------------------------------------------------------------------
+def _new_session(server, body):
+    caps = dict((body.get("capabilities") or {}).get("alwaysMatch") or {})
+    caps.update({"browserName": caps.get("browserName") or "chrome", "browserVersion": "stub",
+                 "platformName": "linux", "setWindowRect": True})
+    session = _Session(uuid.uuid4().hex, caps)
+    with server._lock:
+        server._sessions[session.id] = session
+    return {"sessionId": session.id, "capabilities": caps}
+
+
+def _delete_session(server, session, body):
+    with server._lock:
+        server._sessions.pop(session.id, None)
+
+
+def _status(server, body):
+    return {"ready": True, "message": "seleneko stub"}
+
+
+def _navigate(server, session, body):
+    server.load(session, body["url"])
+
+
+def _history(step):
+    def handler(server, session, body):
+        window = session.window
+        if 0 <= window.index + step < len(window.history):
+            window.index += step
+            server.load(session, window.history[window.index], record=False)
+    return handler
+
+
+def _refresh(server, session, body):
+    server.load(session, session.window.doc.url, record=False)
+
+
+def _locate(server, session, body, root: Node, many: bool):
+    try:
+        found = find_all(root, body.get("using"), body.get("value", ""))
+    except InvalidSelector as e:
+        raise WebDriverError("invalid selector", str(e))
+    if many:
+        return [session.ref(n) for n in found]
+    if not found:
+        raise WebDriverError("no such element", f"{body.get('using')}={body.get('value')}")
+    return session.ref(found[0])
+
+
+def _switch_frame(server, session, body):
+    target = body.get("id")
+    window = session.window
+    if target is None:
+        window.frames = []
+        return
+    if isinstance(target, int):
+        frames = [n for n in session.context.descendants() if n.tag in ("iframe", "frame")]
+        if target >= len(frames):
+            raise WebDriverError("no such frame", f"frame index {target}")
+        frame = frames[target]
+    else:
+        frame = session.node(target[ELEMENT_KEY])
+        if frame.tag not in ("iframe", "frame"):
+            raise WebDriverError("no such frame", "element is not a frame")
+    if frame.content is None:
+        src = urljoin(session.context.url, frame.attrs.get("src", "about:blank"))
+        frame.content = parse_html(server.pages.get(urldefrag(src)[0], BLANK_HTML), src)
+        frame.content.parent = None
+    window.frames.append(frame)
+
+
+def _switch_window(server, session, body):
+    handle = body.get("handle")
+    if handle not in session.windows:
+        raise WebDriverError("no such window", f"no window {handle}")
+    session.current = session.windows[handle]
+
+
+def _close_window(server, session, body):
+    session.windows.pop(session.window.handle, None)
+    session.current = None
+    return list(session.windows)
+
+
+def _new_window(server, session, body):
+    return {"handle": session.open_window().handle, "type": body.get("type", "tab")}
+
+
+def _send_keys(server, session, body, id):
+    node = session.node(id)
+    if node.tag not in ("input", "textarea"):
+        return
+    for ch in body.get("text") or "".join(body.get("value") or []):
+        if ch in _ENTER:
+            form = node.closest("form")
+            if form is not None and node.tag == "input":
+                server.submit(session, form)
+                return
+        elif ch == _BACKSPACE:
+            node.value = node.value[:-1]
+        elif not ("\ue000" <= ch <= "\uf8ff"):  # その他の特殊キーは無視
+            node.value += ch
+
+
+def _clear(server, session, body, id):
+    session.node(id).value = ""
+
+
+def _convert_args(session, value):
+    if isinstance(value, dict):
+        if ELEMENT_KEY in value:
+            return session.node(value[ELEMENT_KEY])
+        return {k: _convert_args(session, v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_convert_args(session, v) for v in value]
+    return value
+
+
+def _convert_result(session, value):
+    if isinstance(value, Node):
+        return session.ref(value)
+    if isinstance(value, dict):
+        return {k: _convert_result(session, v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_convert_result(session, v) for v in value]
+    return value
+
+
+def _execute(is_async):
+    def handler(server, session, body):
+        args = _convert_args(session, body.get("args") or [])
+        result = server.run_script(session, body.get("script", ""), args, is_async)
+        return _convert_result(session, result)
+    return handler
+
+
+def _actions(server, session, body):
+    """ActionChains のうちポインタのクリックだけを再現する。"""
+    for source in body.get("actions", []):
+        target = None
+        for action in source.get("actions", []):
+            origin = action.get("origin")
+            if action.get("type") == "pointerMove" and isinstance(origin, dict) \
+                    and ELEMENT_KEY in origin:
+                target = session.node(origin[ELEMENT_KEY])
+            elif action.get("type") == "pointerUp" and target is not None:
+                server.click(session, target)
+
+
+def _visible(session, cookie) -> bool:
+    """cookie が現在のページのホストに送られるか"""
+    host = urlsplit(session.window.doc.url).hostname or ""
+    domain = (cookie.get("domain") or "").lstrip(".")
+    return host == domain or host.endswith("." + domain)
+
+
+def _add_cookie(server, session, body):
+    cookie = dict(body.get("cookie") or {})
+    cookie.setdefault("domain", urlsplit(session.window.doc.url).hostname)
+    key = (cookie.get("name"), cookie["domain"])
+    session.cookies = [c for c in session.cookies if (c.get("name"), c.get("domain")) != key]
+    session.cookies.append(cookie)
+
+
+def _get_cookie(server, session, body, name):
+    for cookie in session.cookies:
+        if cookie.get("name") == name and _visible(session, cookie):
+            return cookie
+    raise WebDriverError("no such cookie", name)
+
+
+def _delete_cookie(server, session, body, name=None):
+    session.cookies = [c for c in session.cookies
+                       if not (_visible(session, c) and name in (None, c.get("name")))]
+
+
+def _execute_cdp(server, session, body):
+    cmd, params = body.get("cmd"), body.get("params") or {}
+    if not server.cdp:
+        raise WebDriverError("unknown command", f"CDP {cmd}")
+    if cmd == "Page.addScriptToEvaluateOnNewDocument":
+        with server._lock:
+            server.new_document_scripts.append(params.get("source", ""))
+        return {"identifier": str(len(server.new_document_scripts))}
+    if cmd == "Target.getTargets":
+        return {"targetInfos": [{"targetId": handle, "type": "page", "title": window.doc.title,
+                                 "url": window.doc.url, "attached": True}
+                                for handle, window in session.windows.items()]}
+    if cmd == "Page.getNavigationHistory":
+        window = session.window
+        return {"currentIndex": window.index,
+                "entries": [{"id": i, "url": url} for i, url in enumerate(window.history)]}
+    if cmd == "Network.clearBrowserCookies":
+        session.cookies = []
+        return {}
+    if cmd == "Storage.clearDataForOrigin":
+        # sessionStorage はタブごとなので対象外（Chrome と同じ）
+        session.local_storage.pop(params.get("origin"), None)
+        return {}
+    raise WebDriverError("unknown command", f"CDP {cmd}")
+
+
+def _set_rect(server, session, body):
+    session.rect.update({k: v for k, v in body.items() if k in session.rect and v is not None})
+    return dict(session.rect)
+
+
+def _element(fn):
+    """/element/{id}/... のハンドラ"""
+    def handler(server, session, body, id, **params):
+        return fn(session.node(id), **params)
+    return handler
+
+
+def _css_value(node, prop):
+    parts = node.attrs.get("style", "").split(";")
+    style = dict(part.split(":", 1) for part in parts if ":" in part)
+    value = {k.strip().lower(): v.strip() for k, v in style.items()}.get(prop.lower())
+    if value is None and prop == "display":
+        return "block" if node.displayed else "none"
+    return value or ""
+
+
+_S = r"/session/(?P<session>[^/]+)"
+_E = _S + r"/element/(?P<id>[^/]+)"
+_ROUTES = [(m, re.compile(p), name, h) for m, p, name, h in [
+    ("POST", r"/session", "new_session", _new_session),
+    ("GET", r"/status", "status", _status),
+    ("DELETE", _S, "delete_session", _delete_session),
+    ("GET", _S + r"/timeouts", "get_timeouts", lambda srv, s, b: dict(s.timeouts)),
+    ("POST", _S + r"/timeouts", "set_timeouts", lambda srv, s, b: s.timeouts.update(b)),
+    ("POST", _S + r"/url", "get", _navigate),
+    ("GET", _S + r"/url", "current_url", lambda srv, s, b: s.window.doc.url),
+    ("POST", _S + r"/back", "back", _history(-1)),
+    ("POST", _S + r"/forward", "forward", _history(1)),
+    ("POST", _S + r"/refresh", "refresh", _refresh),
+    ("GET", _S + r"/title", "title", lambda srv, s, b: s.window.doc.title),
+    ("GET", _S + r"/source", "source", lambda srv, s, b: s.context.outer_html()),
+    ("GET", _S + r"/screenshot", "screenshot", lambda srv, s, b: _PNG),
+    ("GET", _S + r"/window", "window_handle", lambda srv, s, b: s.window.handle),
+    ("GET", _S + r"/window/handles", "window_handles", lambda srv, s, b: list(s.windows)),
+    ("POST", _S + r"/window", "switch_window", _switch_window),
+    ("DELETE", _S + r"/window", "close_window", _close_window),
+    ("POST", _S + r"/window/new", "new_window", _new_window),
+    ("GET", _S + r"/window/rect", "window_rect", lambda srv, s, b: dict(s.rect)),
+    ("POST", _S + r"/window/rect", "set_window_rect", _set_rect),
+    ("POST", _S + r"/window/(?:maximize|minimize|fullscreen)", "resize_window",
+     lambda srv, s, b: dict(s.rect)),
+    ("POST", _S + r"/frame", "switch_frame", _switch_frame),
+    ("POST", _S + r"/frame/parent", "switch_parent_frame",
+     lambda srv, s, b: s.window.frames[-1:] and s.window.frames.pop() and None),
+    ("POST", _S + r"/element", "find_element",
+     lambda srv, s, b: _locate(srv, s, b, s.context, False)),
+    ("POST", _S + r"/elements", "find_elements",
+     lambda srv, s, b: _locate(srv, s, b, s.context, True)),
+    ("POST", _E + r"/element", "find_child_element",
+     lambda srv, s, b, id: _locate(srv, s, b, s.node(id), False)),
+    ("POST", _E + r"/elements", "find_child_elements",
+     lambda srv, s, b, id: _locate(srv, s, b, s.node(id), True)),
+    ("POST", _E + r"/click", "click", lambda srv, s, b, id: srv.click(s, s.node(id))),
+    ("POST", _E + r"/clear", "clear", _clear),
+    ("POST", _E + r"/value", "send_keys", _send_keys),
+    ("GET", _E + r"/text", "text", _element(lambda n: n.visible_text().strip())),
+    ("GET", _E + r"/name", "tag_name", _element(lambda n: n.tag)),
+    ("GET", _E + r"/selected", "is_selected", _element(lambda n: n.selected or n.checked)),
+    ("GET", _E + r"/enabled", "is_enabled", _element(lambda n: n.enabled)),
+    ("GET", _E + r"/displayed", "is_displayed", _element(lambda n: n.displayed)),
+    ("GET", _E + r"/rect", "element_rect",
+     _element(lambda n: {"x": 0, "y": 0, "width": 100 if n.displayed else 0,
+                         "height": 20 if n.displayed else 0})),
+    ("GET", _E + r"/attribute/(?P<name>[^/]+)", "dom_attribute",
+     _element(lambda n, name: n.attrs.get(name))),
+    ("GET", _E + r"/property/(?P<name>[^/]+)", "property",
+     _element(lambda n, name: n.attribute(name))),
+    ("GET", _E + r"/css/(?P<prop>[^/]+)", "css_value", _element(_css_value)),
+    ("GET", _E + r"/screenshot", "element_screenshot", _element(lambda n: _PNG)),
+    ("POST", _S + r"/execute/sync", "execute_script", _execute(False)),
+    ("POST", _S + r"/execute/async", "execute_async_script", _execute(True)),
+    ("POST", _S + r"/actions", "actions", _actions),
+    ("DELETE", _S + r"/actions", "release_actions", lambda srv, s, b: None),
+    ("GET", _S + r"/cookie", "get_cookies",
+     lambda srv, s, b: [c for c in s.cookies if _visible(s, c)]),
+    ("POST", _S + r"/cookie", "add_cookie", _add_cookie),
+    ("GET", _S + r"/cookie/(?P<name>[^/]+)", "get_cookie", _get_cookie),
+    ("DELETE", _S + r"/cookie", "delete_cookies", _delete_cookie),
+    ("DELETE", _S + r"/cookie/(?P<name>[^/]+)", "delete_cookie", _delete_cookie),
+    ("POST", _S + r"/se/log", "get_log", lambda srv, s, b: []),
+    ("GET", _S + r"/se/log/types", "log_types", lambda srv, s, b: ["browser"]),
+    ("POST", _S + r"/goog/cdp/execute", "execute_cdp", _execute_cdp),
+]]
+
+
+def _error_payload(error: str, message: str) -> dict:
+    return {"value": {"error": error, "message": message, "stacktrace": ""}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _dispatch(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else {}
+            value = self.server.stub.handle(self.command, self.path.split("?")[0], body)
+            status, payload = 200, {"value": value}
+        except WebDriverError as e:
+            status, payload = e.status, _error_payload(e.error, str(e))
+        except Exception as e:
+            # スタブ自身の不具合も WebDriver のエラーとして返す
+            status, payload = 500, _error_payload("unknown error", repr(e))
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_DELETE = _dispatch
+
+    def log_message(self, *args):
+        pass
@@ -0,0 +1,228 @@
+"""
+FakeDriver 上で seleneko 自身のオーバーヘッドを測るベンチマーク。
+
+    python -m seleneko.benchmarks.suite --save baseline.json
+    python -m seleneko.benchmarks.suite --compare baseline.json --tolerance 0.25
+
+--latency で WebDriver 呼び出し1回ごとの疑似遅延（秒）を与えられる。
+--compare では基準より tolerance を超えて遅くなった項目があれば
+終了コード 1 を返す。
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+from selenium.webdriver.common.by import By
+from .fakes import FakeDriver, FakeElement
+
+
+class LatencyElement(FakeElement):
+    """WebDriver 呼び出しごとに latency 秒待つ FakeElement"""
+
+    def __init__(self, latency: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+
+    def _delay(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def click(self):
+        self._delay()
+        super().click()
+
+    def clear(self):
+        self._delay()
+        super().clear()
+
+    def send_keys(self, value):
+        self._delay()
+        super().send_keys(value)
+
+    def get_attribute(self, key):
+        self._delay()
+        return super().get_attribute(key)
+
+    def is_displayed(self):
+        self._delay()
+        return super().is_displayed()
+
+    def is_enabled(self):
+        self._delay()
+        return super().is_enabled()
+
+
+class LatencyDriver(FakeDriver):
+    """WebDriver 呼び出しごとに latency 秒待つ FakeDriver"""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+
+    def _delay(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def find_element(self, by, key):
+        self._delay()
+        return super().find_element(by, key)
+
+    def execute_script(self, script, *args):
+        self._delay()
+        return super().execute_script(script, *args)
+
+    def execute_async_script(self, script, *args):
+        self._delay()
+        return 0.0
+
+    def get(self, url):
+        self._delay()
+        super().get(url)
+
+
+def _login_page(latency: float) -> LatencyDriver:
+    driver = LatencyDriver(latency)
+    for key in ("#user", "#pass", "#q"):
+        driver.add_element(By.CSS_SELECTOR, key, LatencyElement(latency))
+    driver.add_element(By.CSS_SELECTOR, "#go", LatencyElement(latency))
+    return driver
+
+
+def _client(client_cls, driver, work_directory: str):
+    from seleneko.automation import DriverSettings
+    cli = client_cls(DriverSettings(adaptive_click=True), work_directory=work_directory)
+    cli.driver = driver
+    return cli
+
+
+def build_cases(latency: float, work_directory: str, conf) -> Dict[str, Callable[[], object]]:
+    """ベンチマーク名 -> 1回分の処理（クライアントも conf を使う）"""
+    from seleneko.automation import SeleniumClient
+    from seleneko.core import Enc
+    client_cls = type("BenchClient", (SeleniumClient,), {"conf": conf})
+    cli = _client(client_cls, _login_page(latency), work_directory)
+    # キャッシュなしで毎回要素を探すクライアント
+    cold = _client(client_cls, _login_page(latency), work_directory)
+    enc = Enc()
+    secret = "user@example.com:p4ss w0rd!"
+    counter = iter(range(10 ** 12))
+
+    def cold_find():
+        cold.invalidate_elements()
+        return cold.find_visible("#q", method="css")
+
+    def config_write():
+        with conf.batch():
+            conf.set_data("bench", str(next(counter)))
+
+    return {
+        "find_visible": lambda: cli.find_visible("#q", method="css"),
+        "find_visible_cold": cold_find,
+        "click_smart": lambda: cli.click_smart(("css", "#go"), delay=0),
+        "type_text_smart": lambda: cli.type_text_smart(("css", "#q"), "neko"),
+        "login": lambda: cli.login("https://example.com/login", ("css", "#user"), ("css", "#pass"),
+                                   ("css", "#go"), "user", "secret"),
+        "expect_url_change":
+            lambda: cli.expect_url_change("https://example.com/")["callable"](cli.driver),
+        "expect_appears": lambda: cli.expect_appears(("css", "#q"))["callable"](cli.driver),
+        "expect_disappears": lambda: cli.expect_disappears(("css", "#q"))["callable"](cli.driver),
+        "config_read": lambda: conf.get_data("bench"),
+        "config_write": config_write,
+        "enc_roundtrip": lambda: enc.decrypt(enc.encrypt(secret)),
+    }
+
+
+def time_case(fn: Callable[[], object], number: int, repeat: int) -> float:
+    """
+    number 回の実行を repeat 回計り、
+    最速回の1回あたり秒数を返す（外乱に強い）。
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+def run(latency: float = 0.0, number: int = 200, repeat: int = 5, only=None) -> dict:
+    from seleneko.core import config
+    # ロガーは config 間で共有。ここで足したハンドラは最後に外す
+    logger = logging.getLogger(config.__module__)
+    existing = list(logger.handlers)
+    # 作業ディレクトリ・設定・ログは一時ディレクトリに置く
+    with tempfile.TemporaryDirectory(prefix="seleneko-bench-") as tmp:
+        conf = config(name="seleneko.benchmarks", base_dir=tmp)
+        try:
+            cases = build_cases(latency, tmp, conf)
+            results = {}
+            for name, fn in cases.items():
+                if only and name not in only:
+                    continue
+                fn()  # ウォームアップ
+                results[name] = {"per_op_us": time_case(fn, number, repeat) * 1e6}
+        finally:
+            for handler in list(logger.handlers):
+                if handler not in existing:
+                    logger.removeHandler(handler)
+                    handler.close()
+    return {
+        "meta": {"latency": latency, "number": number, "repeat": repeat,
+                 "python": platform.python_version(), "platform": platform.platform()},
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.25) -> Dict[str, dict]:
+    """基準より (1 + tolerance) 倍を超えて遅くなった項目を返す。"""
+    regressions = {}
+    for name, base in baseline.get("results", {}).items():
+        now = current["results"].get(name)
+        if now is None or not base.get("per_op_us"):
+            continue
+        ratio = now["per_op_us"] / base["per_op_us"]
+        if ratio > 1 + tolerance:
+            regressions[name] = {"baseline_us": base["per_op_us"], "current_us": now["per_op_us"],
+                                 "ratio": ratio}
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="seleneko overhead benchmarks on fake drivers")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="simulated seconds per WebDriver call")
+    parser.add_argument("--number", type=int, default=200, help="calls per timing round")
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds (fastest is kept)")
+    parser.add_argument("--only", nargs="*", help="run only these benchmarks")
+    parser.add_argument("--save", help="write results as a baseline JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown ratio")
+    args = parser.parse_args(argv)
+
+    result = run(args.latency, args.number, args.repeat, args.only)
+    for name, r in result["results"].items():
+        print(f"{name:20s} {r['per_op_us']:12.1f} us/op")
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("latency") != args.latency:
+            print("warning: baseline was recorded with a different --latency", file=sys.stderr)
+        regressions = compare(result, baseline, args.tolerance)
+        for name, r in regressions.items():
+            print(f"REGRESSION {name}: {r['baseline_us']:.1f} -> {r['current_us']:.1f} us/op "
+                  f"(x{r['ratio']:.2f})", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
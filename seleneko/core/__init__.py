@@ -1,7 +1,7 @@
 """
 Core modules: configuration, encryption, and shared utilities.
 """
-from .config import config
+from .config import config, lazy_config, log_context
 from .encrypter import Enc
 
-__all__ = ["config", "Enc"]
+__all__ = ["config", "lazy_config", "log_context", "Enc"]
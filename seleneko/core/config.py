@@ -1,30 +1,158 @@
 import os
+import copy
+import json
+import queue
+import atexit
 import logging
+import tempfile
+import threading
+import contextvars
+from contextlib import contextmanager
 from datetime import datetime as dt
 from logging import getLogger, Formatter
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from .encrypter import Enc
 import traceback
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+_MISSING = object()
+
+# ログに付与するセッション / ジョブ ID などの文脈情報
+_log_context = contextvars.ContextVar("seleneko_log_context", default={})
+# 非同期ログのリスナー（ロガーはモジュール共通なのでリスナーも1つ）
+_listener = None
+_listener_lock = threading.Lock()
+
+
+@contextmanager
+def log_context(**fields):
+    """with 内で出力したログに fields（例: session_id, job_id）を付与する。"""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class _ContextFilter(logging.Filter):
+    """
+    呼び出し元スレッドの文脈情報をレコードに写す。
+    リスナースレッドからは見えないため。
+    """
+
+    def filter(self, record):
+        record.log_context = _log_context.get()
+        return True
+
+
+class _JsonFormatter(Formatter):
+    """1行1JSON形式のフォーマッタ"""
+
+    def format(self, record):
+        payload = {
+            "time": self.formatTime(record, "%Y-%m-%d %H:%M:%S"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        payload.update(getattr(record, "log_context", {}))
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _BoundedQueueHandler(QueueHandler):
+    """
+    上限付きキューへの投入。
+    満杯時は overflow="block" なら block_timeout 秒まで待ち、
+    overflow="drop" なら即座に破棄する。破棄件数は dropped に数える。
+    """
+
+    def __init__(self, q, overflow="drop", block_timeout=1.0):
+        super().__init__(q)
+        if overflow not in ("block", "drop"):
+            raise ValueError("overflow must be 'block' or 'drop'")
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def prepare(self, record):
+        """
+        既定の prepare は例外を message に畳み込んで exc_info を消すため、
+        JSON の "exc" に出せるよう exc_info を残したまま引数だけ展開する。
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            if self.overflow == "block":
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(QueueListener):
+    """満杯のキューでも停止できるよう、終了の印は空きを待って入れる"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def _stop_listener():
+    global _listener
+    with _listener_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()  # キューに残ったレコードを書き出してから止まる
+
+
+atexit.register(_stop_listener)
+
+
 class config:
     """
     改良版 config クラス
     - ロガー多重登録防止
     - OS依存パスの除去
-    - 安全なデータ書き込み
+    - 安全なデータ書き込み（一時ファイル + rename、ファイルロック）
+    - 他プロセスの更新とのマージ
+    - batch() / flush_delay による書き込みの集約
     - 例外ログ強化
     """
     __enc = Enc()
 
-    def __init__(self, delimita=":::", name=__name__):
+    def __init__(self, delimita=":::", name=__name__, flush_delay=None, base_dir=None):
+        # data/ と log/ を置くディレクトリ（既定はカレントディレクトリ）
+        base_dir = os.path.abspath(base_dir or os.getcwd())
         self.data = {
             "loglevel": logging.INFO,
             "encrypt": 0,
             "work_dir": 0,
-            "data_path": os.path.join(os.getcwd(), "data"),
-            "log_path": os.path.join(os.getcwd(), "log"),
+            "data_path": os.path.join(base_dir, "data"),
+            "log_path": os.path.join(base_dir, "log"),
         }
         self.delimita = delimita
         self.setting_path = os.path.join(self.data["data_path"], "setting.data")
+        self.lock_path = self.setting_path + ".lock"
+        self.flush_delay = flush_delay
+        self._synced = {}
+        self._io_lock = threading.RLock()
+        self._batch_depth = 0
+        self._flush_timer = None
+        self._atexit_registered = False
         self.log_name = os.path.join(self.data["log_path"], f"{name}.log")
 
         os.makedirs(self.data["data_path"], exist_ok=True)
@@ -59,6 +187,57 @@ class config:
         self.logger.addHandler(fl_handler)
         return self.logger
 
+    def configure_logging(self, async_mode=True, max_bytes=0, backup_count=3, json_lines=False,
+                          queue_size=10000, overflow="drop", block_timeout=1.0):
+        """
+        ログ出力先を組み直す。
+        - async_mode: 呼び出しスレッドはキューに積むだけにし、
+          書き込みは専用スレッドで行う
+        - max_bytes / backup_count:
+          ログファイルのサイズ上限とローテーション世代数（0 で無制限）
+        - json_lines: ファイルを1行1JSONで出力し、log_context() の値を含める
+        - queue_size / overflow / block_timeout:
+          キュー満杯時の振る舞い（"drop" または "block"）
+        """
+        self._init_logger_once()
+        _stop_listener()
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+            handler.close()
+
+        log_format = Formatter("[%(levelname)s %(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S")
+        st_handler = logging.StreamHandler()
+        st_handler.setFormatter(log_format)
+        if max_bytes:
+            fl_handler = RotatingFileHandler(self.log_name, maxBytes=max_bytes,
+                                             backupCount=backup_count, encoding="utf-8")
+        else:
+            fl_handler = logging.FileHandler(filename=self.log_name, encoding="utf-8")
+        fl_handler.setFormatter(_JsonFormatter() if json_lines else log_format)
+
+        if not async_mode:
+            for handler in (st_handler, fl_handler):
+                handler.addFilter(_ContextFilter())
+                self.logger.addHandler(handler)
+            return self.logger
+
+        global _listener
+        q_handler = _BoundedQueueHandler(queue.Queue(maxsize=queue_size), overflow, block_timeout)
+        q_handler.addFilter(_ContextFilter())
+        listener = _Listener(q_handler.queue, st_handler, fl_handler, respect_handler_level=True)
+        listener.start()
+        with _listener_lock:
+            _listener = listener
+        self.logger.addHandler(q_handler)
+        return self.logger
+
+    def log_dropped(self) -> int:
+        """非同期ログでキュー満杯のため破棄された件数"""
+        self._init_logger_once()
+        return sum(getattr(h, "dropped", 0) for h in self.logger.handlers)
+
+    log_context = staticmethod(log_context)
+
     def set_log(self, level: int = None):
         """明示的にログレベル変更（例: logging.DEBUG）"""
         if level:
@@ -89,28 +268,138 @@ class config:
         if not os.path.exists(self.setting_path):
             self.write_data()
             return
+        with self._io_lock:
+            loaded = self._read_file()
+            self.data.update(loaded)
+            self._synced = dict(loaded)
+
+    def _read_file(self) -> dict:
         with open(self.setting_path, "r", encoding="utf-8") as f:
             lines = [line.strip() for line in f if line.strip()]
+        loaded = {}
         for line in lines[1:]:  # skip header
             parts = line.strip('"').split(f'"{self.delimita}"')
             if len(parts) != 2:
                 continue
             k, v = parts
             try:
-                self.data[k] = int(v)
+                loaded[k] = int(v)
             except ValueError:
-                self.data[k] = v
+                loaded[k] = v
+        return loaded
 
-    def write_data(self):
+    def _write_file(self, data: dict):
+        """
+        一時ファイルに書いてから rename する。
+        途中で落ちても壊れたファイルを残さない。
+        """
         header = f'"KEY"{self.delimita}"VALUE"\n'
-        body = "".join([f'"{k}"{self.delimita}"{v}"\n' for k, v in self.data.items()])
-        with open(self.setting_path, "w", encoding="utf-8") as f:
-            f.write(header + body)
+        body = "".join([f'"{k}"{self.delimita}"{v}"\n' for k, v in data.items()])
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.setting_path),
+                                   prefix=".setting.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(header + body)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.setting_path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    @contextmanager
+    def _file_lock(self):
+        """プロセス間の排他ロック"""
+        with open(self.lock_path, "a+") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                elif msvcrt is not None:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def write_data(self):
+        """
+        前回の同期以降に変更・削除されたキーだけを、
+        ロック下で最新のファイル内容にマージして書き込む。
+        他プロセスが書いたキーは上書きせず、
+        逆にこのインスタンスへ取り込む。
+        """
+        with self._io_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            changed = {k: v for k, v in self.data.items() if self._synced.get(k, _MISSING) != v}
+            removed = [k for k in self._synced if k not in self.data]
+            exists = os.path.exists(self.setting_path)
+            if exists and not changed and not removed:
+                return
+            with self._file_lock():
+                merged = self._read_file() if os.path.exists(self.setting_path) else {}
+                merged.update(changed)
+                for k in removed:
+                    merged.pop(k, None)
+                self._write_file(merged)
+            for k in list(self.data):
+                if k in self._synced and k not in merged and k not in changed:
+                    del self.data[k]
+            self.data.update({k: v for k, v in merged.items() if k not in changed})
+            self._synced = dict(merged)
+
+    def flush(self):
+        """保留中の変更を直ちに書き込む"""
+        self.write_data()
+
+    @contextmanager
+    def batch(self):
+        """
+        with 内の set_data / del_data をまとめ、抜けるときに1回だけ書き込む。
+        """
+        with self._io_lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._io_lock:
+                self._batch_depth -= 1
+                outermost = self._batch_depth == 0
+            if outermost:
+                self._persist()
+
+    def _persist(self):
+        """
+        即時書き込み・batch 中は保留・
+        flush_delay 指定時は遅延書き込みのいずれか
+        """
+        with self._io_lock:
+            if self._batch_depth:
+                return
+            if not self.flush_delay:
+                self.write_data()
+                return
+            if self._flush_timer is None:
+                # 最初の変更から flush_delay 秒後に、
+                # その間の変更をまとめて書き込む
+                self._flush_timer = threading.Timer(self.flush_delay, self.write_data)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+                if not self._atexit_registered:
+                    atexit.register(self.write_data)
+                    self._atexit_registered = True
 
     def set_data(self, key, value):
         self.data[key] = value
-        # 頻繁に呼ばれるため即書き込みは避ける設計も可能
-        self.write_data()
+        self._persist()
 
     def get_data(self, key):
         return self.data.get(key)
@@ -118,15 +407,15 @@ class config:
     def del_data(self, key):
         if key in self.data:
             self.data.pop(key)
-            self.write_data()
+            self._persist()
 
     # -----------------------------------------
     # 認証情報関連
     # -----------------------------------------
     def set_id(self, id_line, pwd_line):
-        self.data["id"] = self.__enc.encrypt(id_line)
-        self.data["pwd"] = self.__enc.encrypt(pwd_line)
-        self.write_data()
+        with self.batch():
+            self.set_data("id", self.__enc.encrypt(id_line))
+            self.set_data("pwd", self.__enc.encrypt(pwd_line))
 
     def get_id(self):
         id_enc = self.data.get("id")
@@ -141,8 +430,9 @@ class config:
             return None, None
 
     def del_id(self):
-        for key in ("id", "pwd"):
-            self.del_data(key)
+        with self.batch():
+            for key in ("id", "pwd"):
+                self.del_data(key)
 
     # -----------------------------------------
     # Utility
@@ -163,3 +453,28 @@ class config:
                 self.write_log(f"{func.__name__}() failed: {e}\n{err_trace}", species="ERROR")
                 raise
         return wrapper
+
+
+class lazy_config:
+    """
+    クラス属性用のディスクリプタ。
+    初回アクセス時に config を生成し、以降は同じものを返す。
+    import 時にディレクトリ作成・設定ファイル読み込み・
+    ログハンドラ生成を行わないために使う。
+
+        class SeleniumClient:
+            conf = lazy_config(name=__name__)
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._args = args
+        self._kwargs = kwargs
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def __get__(self, obj, owner=None) -> config:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = config(*self._args, **self._kwargs)
+        return self._instance
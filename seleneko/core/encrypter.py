@@ -1,10 +1,15 @@
 #!/usr/bin/env python3
 
 import string
+import threading
 
 class Enc(object):
     __alphabets = string.ascii_lowercase + string.ascii_uppercase + string.digits + " " + string.punctuation
     __default_set = ["&",")",">","x","K","A","w","f","?","z","C"]
+    # (n, enc_set) ごとの変換テーブル。同じ設定の Enc 同士で共有する
+    __tables = {}
+    __tables_lock = threading.Lock()
+
     def __init__(self,
         n=4, # encrypt number
         enc_set=__default_set, # encrypt symbols
@@ -22,6 +27,7 @@ class Enc(object):
             self.n = 2
         else:
             self.n = n
+        self._tables = self.__build_tables()
 
     def Base_10_to_n(self,X):
         X_dumy = X
@@ -40,7 +46,84 @@ class Enc(object):
             out += int(X[-i])*(n**(i-1))
         return out
 
+    # -----------------------------------------
+    # 変換テーブル
+    # -----------------------------------------
+    def __build_tables(self):
+        """
+        文字 -> 暗号トークン / 暗号トークン -> 文字 の表を作る。
+        記号がすべて数字を含まない1文字なら、
+        記号置換は文字単位の str.translate と等価になる。
+        そうでない enc_set では従来の逐次 replace を使う（tables は None）。
+        """
+        key = (self.n, tuple(str(sym) for sym in self.enc_set))
+        with self.__tables_lock:
+            if key in self.__tables:
+                return self.__tables[key]
+        symbols = key[1]
+        if any(len(sym) != 1 or sym.isdigit() for sym in symbols):
+            tables = None
+        else:
+            to_sym = str.maketrans({str(i): sym for i, sym in enumerate(symbols) if i < 10})
+            from_sym = {}
+            for j, sym in enumerate(symbols):
+                from_sym.setdefault(sym, str(j))
+            encode = {}
+            for index, char in enumerate(self.__alphabets):
+                encode.setdefault(char, self.__token(index).translate(to_sym))
+            unknown = self.__token(-1).translate(to_sym)
+            from_sym = str.maketrans(from_sym)
+            # 記号が重複していても従来の復号結果と一致するよう、
+            # 逆変換して計算した値を使う
+            decode = {token: self.__decode_number(token.translate(from_sym))
+                      for token in set(encode.values())}
+            tables = (encode, unknown, decode, from_sym)
+        with self.__tables_lock:
+            self.__tables.setdefault(key, tables)
+        return tables
+
+    def __token(self, index):
+        tmp_num = (index + 13) % len(self.__alphabets)
+        return str(self.Base_10_to_n(tmp_num)).zfill(3)
+
+    # -----------------------------------------
+    # 暗号化 / 復号
+    # -----------------------------------------
     def encrypt(self,keyword):
+        if self._tables is None:
+            return self.__encrypt_slow(keyword)
+        encode, unknown, _, _ = self._tables
+        return "-".join([encode.get(c, unknown) for c in keyword])
+
+    def decrypt(self,keyword):
+        if self._tables is None or not keyword:
+            return self.__decrypt_slow(keyword)
+        _, _, decode, from_sym = self._tables
+        out = []
+        for token in keyword.split("-"):
+            char = decode.get(token)
+            if char is None:
+                # 表にない表記（ゼロ埋めなし等）は従来どおり計算する
+                char = self.__decode_number(token.translate(from_sym))
+            out.append(char)
+        return "".join(out)
+
+    def encrypt_many(self, keywords):
+        """複数文字列をまとめて暗号化する"""
+        return [self.encrypt(k) for k in keywords]
+
+    def decrypt_many(self, keywords):
+        """複数文字列をまとめて復号する"""
+        return [self.decrypt(k) for k in keywords]
+
+    def __decode_number(self, key):
+        tmp_num = self.Base_n_to_10(int(key))
+        tmp_num -= 13
+        tmp_num += len(self.__alphabets)
+        tmp_num = tmp_num % len(self.__alphabets)
+        return self.__alphabets[tmp_num]
+
+    def __encrypt_slow(self,keyword):
         num_array = ""
         for i in range(len(keyword)):
             tmp_num = self.__alphabets.find(keyword[i])
@@ -55,17 +138,8 @@ class Enc(object):
         for i,sym in enumerate(self.enc_set):
             num_array = num_array.replace(str(i),str(sym))
         return num_array
-    
-    def decrypt(self,keyword):
+
+    def __decrypt_slow(self,keyword):
         for j,sym in enumerate(self.enc_set):
             keyword = keyword.replace(str(sym),str(j))
-        num_array = ""
-        for key in keyword.split("-"):
-            tmp_num = int(key)
-            tmp_num = self.Base_n_to_10(tmp_num)
-            tmp_num -= 13
-            tmp_num += len(self.__alphabets)
-            tmp_num = tmp_num % len(self.__alphabets)
-            num_array += self.__alphabets[tmp_num]
-        return num_array
-    
+        return "".join([self.__decode_number(key) for key in keyword.split("-")])
@@ -0,0 +1,69 @@
+import asyncio
+import time
+import pytest
+from selenium.webdriver.common.by import By
+from seleneko.automation import AsyncSeleniumClient, SeleniumClient
+from seleneko.tests.conftest import FakeDriver, FakeElement
+
+
+class SlowDriver(FakeDriver):
+    def get(self, url):
+        time.sleep(0.2)
+        super().get(url)
+
+
+def make_async(driver):
+    cli = SeleniumClient()
+    cli.driver = driver
+    return AsyncSeleniumClient(client=cli)
+
+
+def test_sessions_run_concurrently_on_one_loop():
+    """複数セッションの get が1つのイベントループ上で並行に進むか"""
+    clients = [make_async(SlowDriver()) for _ in range(4)]
+
+    async def main():
+        t0 = time.perf_counter()
+        await asyncio.gather(*(c.get(f"https://example.com/{i}") for i, c in enumerate(clients)))
+        return time.perf_counter() - t0
+
+    elapsed = asyncio.run(main())
+    assert elapsed < 0.6
+    urls = [c.client.driver.current_url for c in clients]
+    assert urls == [f"https://example.com/{i}" for i in range(4)]
+
+
+def test_smart_actions_and_expectations():
+    driver = FakeDriver()
+    button = FakeElement(
+        on_click=lambda: setattr(driver, "current_url", "https://example.com/home"))
+    driver.add_element(By.CSS_SELECTOR, "#go", button)
+    driver.add_element(By.CSS_SELECTOR, "#q", FakeElement())
+    cli = make_async(driver)
+
+    async def main():
+        assert await cli.type_text_smart(("css", "#q"), "neko")
+        before = driver.current_url
+        assert await cli.click_smart(("css", "#go"), success=cli.expect_url_change(before))
+        assert await cli.wait_for(cli.expect_appears(("css", "#q")))
+        assert not await cli.wait_for(cli.expect_disappears(("css", "#q"), timeout=0.1))
+        await cli.quit()
+
+    asyncio.run(main())
+    assert driver.elements[(By.CSS_SELECTOR, "#q")].attrs["value"] == "neko"
+    assert driver.quit_called
+
+
+def test_client_built_outside_loop_and_wait_errors_propagate():
+    """ループ外で作ったクライアントを使え、待機中の例外が伝わるか"""
+    cli = make_async(FakeDriver())
+
+    def broken(driver):
+        raise ValueError("bug in condition")
+
+    async def main():
+        assert not await cli.wait_for(lambda d: False, timeout=0.05)
+        with pytest.raises(ValueError):
+            await cli.wait_for(broken, timeout=0.05)
+
+    asyncio.run(main())
@@ -0,0 +1,29 @@
+import pytest
+import json
+from seleneko.benchmarks import suite
+
+pytestmark = pytest.mark.stub_js
+
+
+def test_suite_runs_every_case(tmp_path):
+    result = suite.run(number=3, repeat=1)
+    # 設定ファイルやログをカレントディレクトリに残さない
+    assert list(tmp_path.iterdir()) == []
+    assert {"click_smart", "type_text_smart", "login", "find_visible", "expect_url_change",
+            "expect_appears", "expect_disappears", "config_read", "config_write",
+            "enc_roundtrip"} <= set(result["results"])
+    assert all(r["per_op_us"] > 0 for r in result["results"].values())
+
+
+def test_regression_against_saved_baseline(tmp_path):
+    """基準より遅くなった項目があれば終了コード 1 になるか"""
+    baseline = tmp_path / "baseline.json"
+    assert suite.main(["--only", "enc_roundtrip", "--number", "3", "--repeat", "1",
+                       "--save", str(baseline)]) == 0
+    saved = json.loads(baseline.read_text())
+    saved["results"]["enc_roundtrip"]["per_op_us"] /= 1000
+    baseline.write_text(json.dumps(saved))
+    assert suite.main(["--only", "enc_roundtrip", "--number", "3", "--repeat", "1",
+                       "--compare", str(baseline)]) == 1
+    current = {"results": {"x": {"per_op_us": 1.1}}}
+    assert suite.compare(current, {"results": {"x": {"per_op_us": 1.0}}}, tolerance=0.25) == {}
@@ -109,3 +109,82 @@ def test_login_flow(fake_driver):
         password="secret",
     )
     assert fake_driver.current_url.endswith("/home")
+
+
+def test_extract_single_round_trip(fake_driver):
+    """extract が spec を1回の execute_script にまとめるか"""
+    calls = []
+
+    def execute_script(script, *args):
+        calls.append(args)
+        return {"title": "Hello", "rows": [{"name": "a"}, {"name": "b"}]}
+
+    fake_driver.execute_script = execute_script
+    cli = make_client(fake_driver)
+    out = cli.extract({
+        "title": ("css", "h1"),
+        "link": (("xpath", "//a"), "href"),
+        "tags": {"locator": ("class", "tag"), "all": True},
+        "rows": {"locator": ("css", "table tr"), "fields": {"name": ("css", "td")}},
+    })
+    assert out["rows"][1]["name"] == "b"
+    assert len(calls) == 1
+    (plan,) = calls[0]
+    assert plan[0] == ["title", "css selector", "h1", "text", "one"]
+    assert plan[1] == ["link", "xpath", "//a", "href", "one"]
+    assert plan[2] == ["tags", "class name", "tag", "text", "all"]
+    assert plan[3] == ["rows", "css selector", "table tr", "text", "rows",
+                       [["name", "css selector", "td", "text", "one"]]]
+
+
+def test_click_smart_adaptive_skips_fixed_sleep(fake_driver, monkeypatch):
+    """adaptive モードでは固定 sleep せず、安定待ち時間が記録されるか"""
+    from seleneko.tests.conftest import FakeElement
+    import seleneko.automation.smart_actions as sa
+    sleeps = []
+    monkeypatch.setattr(sa.time, "sleep", lambda s: sleeps.append(s))
+    fake_driver.execute_async_script = lambda script, *args: 42.0
+    elem = FakeElement()
+    fake_driver.add_element(By.CSS_SELECTOR, "#go", elem)
+
+    cli = make_client(fake_driver)
+    assert cli.click_smart(("css", "#go"), adaptive=True)
+    assert elem.clicked
+    assert sleeps == []
+    stats = cli.settle_stats()[("css", "#go")]
+    assert stats["count"] == 1 and stats["last_ms"] == 42.0
+
+
+def test_element_cache_skips_find_and_refetches_stale(fake_driver):
+    """同じロケータの再操作で find_element を省き、古い参照は取り直すか"""
+    from selenium.common.exceptions import StaleElementReferenceException
+    from seleneko.tests.conftest import FakeElement
+    finds = []
+    original_find = fake_driver.find_element
+
+    def find_element(by, key):
+        finds.append((by, key))
+        return original_find(by, key)
+
+    fake_driver.find_element = find_element
+    elem = FakeElement()
+    fake_driver.add_element(By.CSS_SELECTOR, "#q", elem)
+    cli = make_client(fake_driver)
+
+    cli.type_text("#q", "a", method="css")
+    cli.type_text("#q", "b", method="css")
+    cli.click("#q", method="css")
+    assert len(finds) == 1
+
+    def stale():
+        raise StaleElementReferenceException("stale")
+
+    elem.is_displayed = stale
+    fresh = FakeElement()
+    fake_driver.add_element(By.CSS_SELECTOR, "#q", fresh)
+    assert cli.type_text("#q", "c", method="css") is fresh
+    assert len(finds) == 2
+
+    cli.get("https://example.com/next")
+    cli.find_visible("#q", method="css")
+    assert len(finds) == 3
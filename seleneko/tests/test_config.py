@@ -0,0 +1,112 @@
+import json
+import logging
+import os
+import threading
+import pytest
+from seleneko.core import config
+
+
+def test_batch_writes_once(tmp_path, monkeypatch):
+    """batch 内の複数更新が1回の書き込みにまとまるか"""
+    monkeypatch.chdir(tmp_path)
+    conf = config(name="test_batch")
+    writes = []
+    original = conf._write_file
+    monkeypatch.setattr(conf, "_write_file",
+                        lambda data: (writes.append(dict(data)), original(data)))
+    with conf.batch():
+        conf.set_data("a", "1")
+        conf.set_data("b", "2")
+        conf.del_data("a")
+    assert len(writes) == 1
+    assert "a" not in writes[0] and writes[0]["b"] == "2"
+    assert not [f for f in os.listdir(tmp_path / "data") if f.endswith(".tmp")]
+
+
+def test_instances_merge_without_lost_updates(tmp_path, monkeypatch):
+    """設定ファイルを共有する2インスタンスの更新が互いに消えないか"""
+    monkeypatch.chdir(tmp_path)
+    first = config(name="test_merge")
+    second = config(name="test_merge")
+    first.set_data("from_first", "x")
+    second.set_data("from_second", "y")
+    first.del_data("from_first")
+
+    third = config(name="test_merge")
+    assert third.get_data("from_second") == "y"
+    assert third.get_data("from_first") is None
+    assert first.get_data("from_second") == "y"
+
+
+def test_flush_delay_coalesces_writes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    conf = config(name="test_delay", flush_delay=60)
+    conf.set_data("k", "v")
+    assert config(name="test_delay").get_data("k") is None
+    conf.flush()
+    assert config(name="test_delay").get_data("k") == "v"
+
+
+@pytest.fixture
+def async_conf(tmp_path, monkeypatch):
+    """
+    非同期ログ用の config。共有ロガーのハンドラはテスト後に元へ戻す。
+    """
+    monkeypatch.chdir(tmp_path)
+    conf = config(name="test_async_log")
+    conf.log_name = str(tmp_path / "async.log")
+    logger = conf._init_logger_once()
+    saved = list(logger.handlers)
+    yield conf
+    conf.configure_logging(async_mode=False)  # リスナーを止める
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    for handler in saved:
+        logger.addHandler(handler)
+
+
+def _records(conf):
+    conf.configure_logging(async_mode=False)  # リスナー停止時に残りを書き出す
+    return [json.loads(line) for line in open(conf.log_name, encoding="utf-8")]
+
+
+def test_async_json_logging_with_context(async_conf):
+    """非同期モードで JSON 行に log_context の値が載るか"""
+    async_conf.configure_logging(json_lines=True, queue_size=1000)
+    with config.log_context(session_id="s1", job_id=7):
+        async_conf.write_log("hello", species="INFO")
+    records = _records(async_conf)
+    assert records[-1]["message"] == "hello"
+    assert records[-1]["session_id"] == "s1" and records[-1]["job_id"] == 7
+
+
+def test_async_json_logging_keeps_exception(async_conf):
+    async_conf.configure_logging(json_lines=True)
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        async_conf.logger.exception("failed %s", "x")
+    record = _records(async_conf)[-1]
+    assert record["message"] == "failed x"
+    assert "ZeroDivisionError" in record["exc"]
+
+
+def test_async_logging_drops_when_full(async_conf, monkeypatch):
+    """キュー満杯時は破棄し、破棄件数が数えられるか"""
+    entered, release = threading.Event(), threading.Event()
+    emit = logging.FileHandler.emit
+
+    def blocking_emit(handler, record):
+        if handler.baseFilename == async_conf.log_name:
+            entered.set()
+            release.wait(5)
+        emit(handler, record)
+    monkeypatch.setattr(logging.FileHandler, "emit", blocking_emit)
+    async_conf.configure_logging(queue_size=1, overflow="drop")
+    async_conf.write_log("first")
+    assert entered.wait(5)  # リスナーが書き込み中で止まっている
+    for _ in range(3):
+        async_conf.write_log("flood")
+    assert async_conf.log_dropped() == 2
+    release.set()
@@ -0,0 +1,86 @@
+import pytest
+from seleneko.automation import DriverSettings, SeleniumClient
+from seleneko.benchmarks.stub_webdriver import StubWebDriverServer
+
+BASE = "http://stub.test"
+
+
+def _page(title, body=""):
+    return f"<html><head><title>{title}</title></head><body>{body}</body></html>"
+
+
+@pytest.fixture(params=[True, False], ids=["cdp", "probe"])
+def env(request, tmp_path):
+    with StubWebDriverServer(cdp=request.param) as server:
+        server.add_page(f"{BASE}/a", _page("A", '<iframe id="f" src="/inner"></iframe>'))
+        server.add_page(f"{BASE}/b", _page("B"))
+        server.add_page(f"{BASE}/inner", _page("Inner", '<p id="in">inside</p>'))
+        with SeleniumClient(DriverSettings(remote_url=server.url, download_dir=str(tmp_path)),
+                            work_directory=str(tmp_path)) as cli:
+            yield server, cli
+
+
+def _switches(server):
+    return server.command_counts["switch_window"] + server.command_counts["switch_frame"]
+
+
+def test_switch_window_by_title_jumps_and_skips(env):
+    server, cli = env
+    cli.get(f"{BASE}/a")
+    home = cli.contexts.current
+    cli.contexts.open_window("tab")
+    cli.get(f"{BASE}/b")
+    cli.switch_to_window_by_title("A")
+    assert cli.driver.current_window_handle == home
+    if server.cdp:
+        stats = cli.contexts.stats()
+        assert stats["batched_refreshes"] == 1 and stats["probes"] == 0
+    before = _switches(server)
+    cli.switch_to_window_by_title("A")
+    assert _switches(server) == before
+
+
+def test_switch_to_frame_caches_frame_element(env):
+    server, cli = env
+    cli.get(f"{BASE}/a")
+    cli.switch_to_frame("#f", method="css")
+    assert cli.find_visible("#in", method="css").text == "inside"
+    finds = server.command_counts["find_element"]
+    cli.switch_to_frame("#f", method="css")
+    cli.switch_to_default_content()
+    before = _switches(server)
+    cli.switch_to_default_content()
+    assert _switches(server) == before
+    cli.switch_to_frame("#f", method="css")
+    assert server.command_counts["find_element"] == finds
+    assert cli.find_visible("#in", method="css").text == "inside"
+    # 遷移後は frame 参照を取り直す
+    cli.switch_to_default_content()
+    cli.get(f"{BASE}/a")
+    cli.switch_to_frame("#f", method="css")
+    assert server.command_counts["find_element"] > finds
+
+
+def test_switch_to_frame_reenters_after_page_redirect(env):
+    server, cli = env
+    server.add_script("location.assign", lambda session, args: server.load(session, f"{BASE}/a"))
+    cli.get(f"{BASE}/a")
+    cli.switch_to_frame("#f", method="css")
+    # ページ側のスクリプトでトップレベルが遷移し、frame から外れる
+    cli.driver.execute_script("location.assign('/a')")
+    cli.switch_to_frame("#f", method="css")
+    assert cli.find_visible("#in", method="css").text == "inside"
+
+
+def test_find_window_after_current_popup_closed_itself(env):
+    server, cli = env
+    server.add_script("window.close()",
+                      lambda session, args: session.windows.pop(session.current.handle) and None)
+    cli.get(f"{BASE}/a")
+    home = cli.contexts.current
+    cli.contexts.open_window("tab")
+    cli.get(f"{BASE}/b")
+    cli.driver.execute_script("window.close()")
+    cli.switch_to_window_by_title("A", timeout=1)
+    assert cli.driver.current_window_handle == home
+    assert cli.driver.title == "A"
@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+import pytest
+from seleneko.automation import DriverSettings, SeleniumClient
+from seleneko.automation.downloads import DownloadWatcher
+from seleneko.tests.conftest import FakeDriver
+
+
+def _later(delay, fn, *args):
+    timer = threading.Timer(delay, fn, args)
+    timer.start()
+    return timer
+
+
+def _write(path, data=b"x" * 1024):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_waits_for_crdownload_rename(tmp_path):
+    """.crdownload が最終名にリネームされた時点で完了とするか"""
+    partial = tmp_path / "report.csv.crdownload"
+    _write(tmp_path / "old.csv")  # 監視開始前からあるファイルは対象外
+    watcher = DownloadWatcher(str(tmp_path), "*.csv", timeout=5)
+    _write(partial)
+    _later(0.2, os.rename, partial, tmp_path / "report.csv")
+    result = watcher.wait()
+    assert result.path == str(tmp_path / "report.csv")
+    assert result.size == 1024
+    assert 0.1 < result.duration < 5
+    assert result.throughput > 0
+
+
+def test_firefox_part_file_and_concurrent_watchers(tmp_path):
+    """
+    最終名の空ファイル + .part の間は未完了とし、
+    同時の watcher は別々のファイルを返すか
+    """
+    claimed = set()
+    first = DownloadWatcher(str(tmp_path), "*.zip", timeout=5, claimed=claimed)
+    second = DownloadWatcher(str(tmp_path), "*.zip", timeout=5, claimed=claimed)
+    _write(tmp_path / "a.zip", b"")
+    _write(tmp_path / "a.zip.part")
+    _later(0.2, os.replace, tmp_path / "a.zip.part", tmp_path / "a.zip")
+    _later(0.3, _write, tmp_path / "b.zip")
+    paths = {first.wait().path, second.wait().path}
+    assert paths == {str(tmp_path / "a.zip"), str(tmp_path / "b.zip")}
+
+
+def test_client_expect_download_timeout_and_stats(tmp_path):
+    cli = SeleniumClient(DriverSettings(download_dir=str(tmp_path)))
+    cli.driver = FakeDriver()
+    with cli.expect_download("*.pdf", timeout=5) as dl:
+        _later(0.1, _write, tmp_path / "invoice.pdf")
+    assert dl.result.path.endswith("invoice.pdf")
+    with pytest.raises(TimeoutError):
+        cli.expect_download("*.pdf", timeout=0.2).wait()
+    stats = cli.download_stats()
+    assert stats["count"] == 1 and stats["bytes"] == 1024
+
+
+def test_isolated_download_dir_is_removed_on_quit(tmp_path):
+    from seleneko.benchmarks.stub_webdriver import StubWebDriverServer
+    with StubWebDriverServer() as server:
+        shared = DriverSettings(remote_url=server.url, download_dir=str(tmp_path))
+        with SeleniumClient(shared, work_directory=str(tmp_path)) as cli:
+            assert cli.download_dir == str(tmp_path)  # 既定は download_dir にそのまま保存
+        settings = DriverSettings(remote_url=server.url, download_dir=str(tmp_path),
+                                  isolate_downloads=True)
+        with SeleniumClient(settings, work_directory=str(tmp_path)) as cli:
+            isolated = cli.download_dir
+            assert os.path.dirname(isolated) == str(tmp_path) and os.path.isdir(isolated)
+        assert not os.path.exists(isolated)
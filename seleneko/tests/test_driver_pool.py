@@ -0,0 +1,110 @@
+import pytest
+from seleneko.automation import DriverPool, DriverSettings, SeleniumClient
+from seleneko.automation.sessions import SessionSnapshot, capture_session, restore_session
+from seleneko.benchmarks.stub_webdriver import StubWebDriverServer
+from seleneko.tests.conftest import FakeDriver
+
+
+def make_pool(**kwargs):
+    created = []
+
+    def factory(settings, conf):
+        driver = FakeDriver()
+        created.append(driver)
+        return driver, None
+
+    pool = DriverPool(DriverSettings(), conf=SeleniumClient.conf, factory=factory, **kwargs)
+    return pool, created
+
+
+def test_checkout_reuses_warm_driver():
+    """warm 済みの driver が再利用され、返却時に状態がリセットされるか"""
+    pool, created = make_pool(size=1)
+    assert pool.warm() == 1
+    drv = pool.checkout()
+    drv.cookies.append({"name": "sid"})
+    drv.window_handles.append("popup")
+    drv.current_url = "https://example.com/private"
+    pool.checkin(drv)
+
+    again = pool.checkout()
+    assert again is drv
+    assert drv.cookies == []
+    assert drv.window_handles == [drv.current_window_handle]
+    assert drv.current_url == "about:blank"
+    stats = pool.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 0
+    assert stats["launches"] == 1
+    pool.checkin(again)
+    pool.close()
+    assert drv.quit_called
+
+
+def test_recycle_after_max_uses_and_unhealthy():
+    """使い切った・応答のない driver は破棄して起動し直すか"""
+    pool, created = make_pool(size=1, max_uses=2)
+    first = pool.checkout()
+    pool.checkin(first)
+    assert pool.checkout() is first
+    pool.checkin(first)  # 2回目の貸し出しで上限到達
+    assert first.quit_called
+
+    second = pool.checkout()
+    assert second is not first
+    pool.checkin(second)
+    second.quit_called = True  # プロセス死亡を模倣
+    assert pool.health_check() == 1
+    assert pool.stats()["launches"] == 2
+
+
+def test_checkout_timeout_when_exhausted():
+    pool, _ = make_pool(size=1)
+    pool.checkout()
+    with pytest.raises(TimeoutError):
+        pool.checkout(timeout=0.05)
+
+
+def test_client_leases_from_pool():
+    """SeleniumClient(pool=...) がプールから借り、終了時に返却するか"""
+    pool, created = make_pool(size=1)
+    with SeleniumClient(pool=pool) as cli:
+        assert cli.driver is created[0]
+    assert not created[0].quit_called
+    assert pool.stats()["idle"] == 1
+    assert SeleniumClient(pool=pool).settings is pool.settings
+    with pytest.raises(ValueError):
+        SeleniumClient(DriverSettings(), pool=pool)
+
+
+@pytest.mark.stub_js
+def test_reset_clears_every_origin_of_the_lease(tmp_path):
+    """1回の貸し出しで回った全オリジンの cookie / storage が消えるか"""
+    origins = ("http://a.test", "http://b.test")
+    with StubWebDriverServer() as server:
+        settings = DriverSettings(remote_url=server.url, download_dir=str(tmp_path))
+        with DriverPool(settings, size=1, conf=SeleniumClient.conf) as pool:
+            drv = pool.checkout()
+            for origin in origins:
+                cookies = [{"name": "sid", "value": origin}]
+                state = SessionSnapshot(origin, "neko", origin + "/", cookies,
+                                        {"token": origin}, {"tab": origin}, 0, 0)
+                restore_session(drv, state, origin + "/")
+            pool.checkin(drv)
+
+            again = pool.checkout()
+            assert again is drv
+            for origin in origins:
+                drv.get(origin + "/")
+                state = capture_session(drv, origin, "neko", 60)
+                assert (state.cookies, state.local_storage, state.session_storage) == ([], {}, {})
+            pool.checkin(again)
+
+
+def test_driver_without_cdp_is_not_leased_again():
+    """CDP で初期化できない driver（Firefox）は返却時に破棄されるか"""
+    pool, created = make_pool(size=1)
+    drv = pool.checkout()
+    drv.caps = {"browserName": "firefox"}
+    pool.checkin(drv)
+    assert drv.quit_called
+    assert pool.checkout() is not drv
@@ -0,0 +1,34 @@
+import string
+from seleneko.core import Enc
+from seleneko.benchmarks.bench_encrypter import LegacyEnc, compare, make_payloads
+
+
+def test_output_matches_legacy_format():
+    """テーブル化後も旧実装と同じ暗号文・復号結果になるか"""
+    payloads = make_payloads(40, 50) + ["", "a", "日本語", string.printable]
+    for n in (2, 4, 9):
+        enc, legacy = Enc(n=n), LegacyEnc(n=n)
+        for p in payloads:
+            assert enc.encrypt(p) == legacy.encrypt(p)
+            if p:
+                assert enc.decrypt(legacy.encrypt(p)) == legacy.decrypt(legacy.encrypt(p))
+
+
+def test_custom_and_fallback_symbol_sets():
+    for symbols in (["a", "b", "a", "c"], ["1", "0", "#", "%", "*"], ["ab", "c", "d", "e"]):
+        enc, legacy = Enc(enc_set=symbols), LegacyEnc(enc_set=symbols)
+        for p in ("password", "P@ss w0rd!"):
+            assert enc.encrypt(p) == legacy.encrypt(p)
+            assert enc.decrypt(enc.encrypt(p)) == legacy.decrypt(legacy.encrypt(p))
+
+
+def test_bulk_api_round_trip():
+    enc = Enc()
+    payloads = make_payloads(16, 20)
+    assert enc.decrypt_many(enc.encrypt_many(payloads)) == payloads
+
+
+def test_faster_than_legacy():
+    results = compare(size=64, count=200)
+    assert results["encrypt"]["speedup"] > 1
+    assert results["decrypt"]["speedup"] > 1
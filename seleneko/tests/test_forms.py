@@ -0,0 +1,62 @@
+import pytest
+from seleneko.automation import DriverSettings, SeleniumClient
+from seleneko.automation.scenarios import compile_scenario
+from seleneko.benchmarks.stub_webdriver import StubWebDriverServer, _fill
+
+pytestmark = pytest.mark.stub_js
+
+URL = "http://stub.test/form"
+FORM = """<html><head><title>Form</title></head><body><form action="/done" method="post">
+<input id="name" name="name"><textarea id="note" name="note"></textarea>
+<select id="pref" name="pref">
+<option value="tk">Tokyo</option><option value="os">Osaka</option></select>
+<input id="agree" name="agree" type="checkbox" value="y">
+<input id="code" name="code" readonly value="fixed">
+<button id="go">send</button></form></body></html>"""
+
+
+@pytest.fixture
+def env(tmp_path):
+    with StubWebDriverServer() as server:
+        server.add_page(URL, FORM)
+        with SeleniumClient(DriverSettings(remote_url=server.url, download_dir=str(tmp_path)),
+                            work_directory=str(tmp_path)) as cli:
+            cli.get(URL)
+            yield server, cli
+
+
+def test_fill_form_in_one_round_trip(env):
+    server, cli = env
+    server.command_counts.clear()
+    filled = cli.fill_form({("css", "#name"): "ねこ", ("id", "note"): "a\nb",
+                            ("css", "#pref"): "Osaka", ("css", "#agree"): True})
+    assert all(filled.values())
+    assert dict(server.command_counts) == {"execute_script": 1}
+    cli.click("go", method="id")
+    assert server.submissions[-1]["fields"] == {"name": "ねこ", "note": "a\nb", "pref": "os",
+                                                "agree": "y", "code": "fixed"}
+
+
+def test_fill_form_falls_back_only_for_failed_fields(env):
+    server, cli = env
+    # ブラウザ内の設定が #note だけ効かなかったことにする
+    server.add_script("function fill(el, v)", lambda session, args: [
+        ["mismatch", "textarea"] if key == "#note" else _fill(session.context, by, key, value)
+        for by, key, value in args[0]])
+    server.command_counts.clear()
+    filled = cli.fill_form({("css", "#name"): "tama", ("css", "#note"): "hello",
+                            ("css", "#missing"): "x"}, timeout=0.2)
+    assert filled == {("css", "#name"): True, ("css", "#note"): True, ("css", "#missing"): False}
+    assert server.command_counts["send_keys"] == 1
+
+
+def test_fill_form_scenario_step(env):
+    server, cli = env
+    scenario = compile_scenario([
+        {"action": "fill_form", "fields": [{"locator": ["css", "#name"], "value": "${user}"},
+                                           {"locator": ["css", "#agree"], "value": True}]},
+        {"action": "click_smart", "locator": ["css", "#go"]},
+    ])
+    scenario.run(cli, user="mike")
+    assert server.submissions[-1]["fields"]["name"] == "mike"
+    assert server.submissions[-1]["fields"]["agree"] == "y"
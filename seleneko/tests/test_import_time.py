@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+# seleneko 自身のモジュールの import 時間の上限
+# （依存ライブラリは除く）
+SELF_IMPORT_BUDGET_US = 150_000
+
+
+def _import_seleneko(cwd):
+    env = dict(os.environ, PYTHONPATH=str(ROOT) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import seleneko.cli"],
+                          cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    return proc.stderr
+
+
+def test_import_does_no_filesystem_io(tmp_path):
+    """import seleneko でカレントに data/ log/ などが作られないか"""
+    _import_seleneko(tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_import_time_budget(tmp_path):
+    """-X importtime の self 時間を seleneko の分だけ合計して上限と比べる"""
+    total = 0
+    for line in _import_seleneko(tmp_path).splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2].startswith("seleneko"):
+            total += int(parts[0].rsplit(":", 1)[-1])
+    assert 0 < total < SELF_IMPORT_BUDGET_US, f"seleneko import took {total}us"
@@ -0,0 +1,62 @@
+import json
+from selenium.webdriver.common.by import By
+from seleneko.automation import Instrumentation, JsonlSpanSink, SeleniumClient
+from seleneko.tests.conftest import FakeDriver, FakeElement
+
+
+class CommandDriver(FakeDriver):
+    """find_element を WebDriver コマンド (execute) 経由で処理する FakeDriver"""
+
+    def execute(self, driver_command, params=None):
+        return FakeDriver.find_element(self, params["using"], params["value"])
+
+    def find_element(self, by, key):
+        return self.execute("findElement", {"using": by, "value": key})
+
+
+def test_commands_attributed_to_top_level_action(tmp_path):
+    """コマンドが最上位の操作に帰属し、span がファイルに出力されるか"""
+    path = tmp_path / "spans.jsonl"
+    inst = Instrumentation(sinks=[JsonlSpanSink(str(path))])
+    driver = CommandDriver()
+    driver.add_element(By.ID, "user", FakeElement(attrs={"value": ""}))
+    cli = SeleniumClient(instrumentation=inst)
+    cli.driver = driver
+
+    assert cli.type_text_smart(("id", "user"), "niko")
+    stats = inst.stats()
+    assert stats["commands"]["findElement"]["count"] >= 1
+    assert set(stats["by_action"]) == {"type_text_smart"}
+    assert stats["actions"]["find_visible"]["count"] == 1
+    assert stats["actions"]["type_text_smart"]["p99"] > 0
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    command = next(s for s in spans if s["kind"] == "command")
+    assert command["action"] == "type_text_smart" and command["parent"] == "find_visible"
+
+    cli.driver = None
+    assert "execute" not in driver.__dict__
+
+
+def test_disabled_client_is_not_wrapped():
+    cli = SeleniumClient()
+    assert "click_smart" not in cli.__dict__
+
+
+# ブラウザ操作ではない公開メンバ
+# （条件の生成・集計・ライフサイクル）
+_NOT_ACTIONS = {
+    "compile_extract", "conf", "contexts", "download_dir", "download_stats", "driver",
+    "expect_appears", "expect_disappears", "expect_url_change", "invalidate_elements", "quit",
+    "session_store", "settle_stats", "snapshot_writer", "tabs",
+}
+
+
+def test_every_public_action_is_instrumented():
+    """
+    クライアントに公開操作を追加したら
+    INSTRUMENTED_ACTIONS か _NOT_ACTIONS に載せる
+    """
+    from seleneko.automation.instrumentation import INSTRUMENTED_ACTIONS
+    public = {name for name in dir(SeleniumClient) if not name.startswith("_")}
+    assert public - _NOT_ACTIONS == set(INSTRUMENTED_ACTIONS)
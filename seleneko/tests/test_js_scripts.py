@@ -0,0 +1,120 @@
+"""
+スタブが Python で代行しているスクリプトを Node.js で実際に動かす。
+DOM は使わず、必要な window / document だけを prelude で用意する。
+"""
+import json
+import shutil
+import subprocess
+import pytest
+from seleneko.automation.extraction import EXTRACT_JS
+from seleneko.automation.forms import FILL_JS
+from seleneko.automation.network import PAGE_WEIGHT_JS
+from seleneko.automation.readiness import READY_CHECK_JS, READY_JS, TRACKER_JS
+from seleneko.automation.sessions import CAPTURE_STORAGE_JS, CLEAR_STORAGE_JS, RESTORE_STORAGE_JS
+from seleneko.automation.tabs import LOADED_JS, NAVIGATE_JS
+from seleneko.automation.waits import OBSERVE_JS
+
+NODE = shutil.which("node")
+pytestmark = pytest.mark.skipif(NODE is None, reason="Node.js がない")
+
+# steps を同じ window で順に実行し、戻り値の一覧を JSON で返す
+_HARNESS = """
+const input = JSON.parse(require("fs").readFileSync(0, "utf8"));
+globalThis.window = globalThis;
+(0, eval)(input.prelude);
+(async () => {
+  const results = [];
+  for (const [script, args, isAsync] of input.steps) {
+    const fn = new Function(script);
+    results.push(await (isAsync
+      ? new Promise((done) => fn.apply(window, args.concat([done])))
+      : fn.apply(window, args)));
+  }
+  process.stdout.write(JSON.stringify(results));
+})();
+"""
+
+_STORAGE = """
+function Store() { this.items = {}; }
+Store.prototype = {
+  get length() { return Object.keys(this.items).length; },
+  key: function (i) { return Object.keys(this.items)[i]; },
+  getItem: function (k) { return k in this.items ? this.items[k] : null; },
+  setItem: function (k, v) { this.items[k] = String(v); },
+  clear: function () { this.items = {}; },
+};
+var localStorage = new Store(), sessionStorage = new Store();
+"""
+
+_LOCATION = """
+var location = {href: "http://stub.test/a?x=1#top"};
+var document = {readyState: "complete", createElement: function () {
+  return {set href(v) { this.url = new URL(v, location.href).href; },
+          get href() { return this.url; }};
+}};
+"""
+
+
+def _run(prelude, *steps):
+    """steps: (script, args, is_async) の並び"""
+    payload = json.dumps({"prelude": prelude, "steps": [list(s) for s in steps]})
+    out = subprocess.run([NODE, "-e", _HARNESS], input=payload, capture_output=True,
+                         text=True, timeout=30)
+    assert out.returncode == 0, out.stderr
+    return json.loads(out.stdout)
+
+
+def test_every_mirrored_script_compiles():
+    scripts = [EXTRACT_JS, FILL_JS, PAGE_WEIGHT_JS, READY_JS, READY_CHECK_JS, TRACKER_JS,
+               CAPTURE_STORAGE_JS, RESTORE_STORAGE_JS, CLEAR_STORAGE_JS, NAVIGATE_JS,
+               LOADED_JS, OBSERVE_JS]
+    compile_all = ("return arguments[0].map(function (s) {"
+                   " try { new Function(s); return null; } catch (e) { return String(e); } });")
+    assert _run("", (compile_all, [scripts], False)) == [[None] * len(scripts)]
+
+
+def test_storage_round_trip():
+    results = _run(
+        _STORAGE,
+        (RESTORE_STORAGE_JS, [{"token": "abc", "n": "1"}, {"tab": "x"}], False),
+        (CAPTURE_STORAGE_JS, [], False),
+        (CLEAR_STORAGE_JS, [], False),
+        (CAPTURE_STORAGE_JS, [], False),
+    )
+    assert results[1] == {"local": {"token": "abc", "n": "1"}, "session": {"tab": "x"}}
+    assert results[3] == {"local": {}, "session": {}}
+
+
+def test_navigate_marks_only_document_changes():
+    leaving = "return !!window.__selenekoLeaving;"
+    results = _run(
+        _LOCATION,
+        (NAVIGATE_JS, ["#other"], False),
+        (leaving, [], False),
+        (LOADED_JS, [], False),
+        ("location.href = 'http://stub.test/a?x=1';", [], False),
+        (NAVIGATE_JS, ["/b"], False),
+        (leaving, [], False),
+        (LOADED_JS, [], False),
+    )
+    assert results[1:3] == [False, "complete"]
+    assert results[5:7] == [True, None]
+
+
+def test_ready_waits_for_network_idle():
+    prelude = """
+    var document = {readyState: "complete",
+                    addEventListener: function () {}, removeEventListener: function () {}};
+    var fetch = function () {
+      return new Promise(function (r) { setTimeout(function () { r("ok"); }, 80); });
+    };
+    var started = performance.now();
+    setTimeout(function () { window.fetch("/api"); }, 10);
+    """
+    elapsed = "return performance.now() - started;"
+    ready, took = _run(prelude, (READY_JS, [["complete"], 50, None, None, 2000], True),
+                       (elapsed, [], False))
+    assert ready is True
+    assert took >= 130
+    assert _run(prelude, (READY_JS, [["complete"], None, None, "return false;", 100], True)) \
+        == [False]
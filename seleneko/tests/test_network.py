@@ -0,0 +1,84 @@
+import pytest
+from seleneko.automation import BlockPolicy, DriverSettings, SeleniumClient
+from seleneko.automation.network import apply_block_policy, summarize_page_weight
+from seleneko.benchmarks.stub_webdriver import StubWebDriverServer
+
+
+class CdpDriver:
+    def __init__(self):
+        self.cdp = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((cmd, params))
+
+
+class FirefoxDriver:
+    """webdriver.Firefox と同じく execute_cdp_cmd を持つが、呼ぶと例外になる"""
+    caps = {"browserName": "firefox"}
+
+    def execute_cdp_cmd(self, cmd, params):
+        raise RuntimeError("CDP is not supported on Firefox")
+
+
+def test_policy_patterns_and_cdp():
+    """リソース種別と URL glob が setBlockedURLs のパターンに展開されるか"""
+    settings = DriverSettings(block=["fonts", "third_party_scripts", "*://ads.example.com/*"])
+    policy = settings.block
+    assert policy.classify("https://x.test/a/font.woff2?v=3") == "fonts"
+    assert policy.classify("https://www.googletagmanager.com/gtm.js") == "third_party_scripts"
+    assert policy.classify("https://ads.example.com/banner") == "urls"
+    assert policy.classify("https://x.test/app.js") is None
+
+    driver = CdpDriver()
+    assert apply_block_policy(driver, policy)
+    assert driver.cdp[0] == ("Network.enable", {})
+    assert "*.woff2" in driver.cdp[1][1]["urls"]
+    # Firefox には CDP を送らない
+    assert not apply_block_policy(FirefoxDriver(), policy)
+    assert BlockPolicy(resources=["images"]).firefox_prefs() == {"permissions.default.image": 2}
+    assert BlockPolicy(resources=["images"]).firefox_warnings() == []
+    assert len(BlockPolicy(resources=["media"], urls=["*://ads.test/*"]).firefox_warnings()) == 2
+    with pytest.raises(ValueError):
+        BlockPolicy(resources=["videos"])
+
+
+def test_page_weight_summary():
+    policy = BlockPolicy(resources=["fonts", "stylesheets"], typical_sizes={"fonts": 1000})
+    raw = {"document": 500, "origin": "https://x.test", "resources": [
+        ["https://x.test/a.woff", "css", 0, 0],
+        ["https://x.test/b.woff", "css", 0, 0],
+        # キャッシュから読まれた（ブロックではない）
+        ["https://x.test/site.css", "link", 0, 300],
+        ["https://x.test/app.js", "script", 2000, 5000],
+        # Timing-Allow-Origin のない別オリジンは読み込めてもサイズ 0
+        ["https://fonts.cdn.test/c.woff2", "css", 0, 0],
+    ]}
+    summary = summarize_page_weight(raw, policy)
+    assert summary["transferred_bytes"] == 2500
+    assert summary["resources"] == 5
+    assert summary["blocked"] == {"fonts": 2}
+    assert summary["possibly_blocked"] == {"fonts": 1}
+    assert summary["estimated_bytes_saved"] == 2000
+    assert summary["estimated_bytes_saved_max"] == 3000
+
+
+def test_block_policy_without_cdp_is_skipped(tmp_path):
+    """CDP を中継しないリモートでもセッションを作れるか"""
+    with StubWebDriverServer(cdp=False) as server:
+        settings = DriverSettings(remote_url=server.url, download_dir=str(tmp_path),
+                                  block=["fonts"])
+        with SeleniumClient(settings, work_directory=str(tmp_path)) as cli:
+            assert cli.driver is not None
+            assert server.session_count == 1
+        assert server.session_count == 0
+
+
+def test_failed_setup_quits_the_session(tmp_path):
+    """起動後の設定に失敗したらセッションと専用 DL 先を消すか"""
+    with StubWebDriverServer() as server:
+        settings = DriverSettings(remote_url=server.url, download_dir=str(tmp_path),
+                                  isolate_downloads=True, window_size=("wide", "tall"))
+        with pytest.raises(ValueError), SeleniumClient(settings, work_directory=str(tmp_path)):
+            pass
+        assert server.session_count == 0
+    assert not any(p.name.startswith("downloads-") for p in tmp_path.iterdir())
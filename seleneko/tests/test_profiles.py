@@ -0,0 +1,78 @@
+import errno
+import json
+import os
+import pytest
+from seleneko.automation import DriverSettings, ProfileTemplate
+from seleneko.automation.driver_factory import cleanup_tmpdir
+from seleneko.automation import profiles
+from seleneko.automation.profiles import reaper
+
+
+def test_template_built_once_and_cloned(tmp_path):
+    """テンプレートが一度だけ作られ、clone で独立した複製が得られるか"""
+    template = ProfileTemplate(str(tmp_path / "chrome-template"))
+    path = template.ensure()
+    prefs = json.load(open(os.path.join(path, "Default", "Preferences")))
+    assert prefs["download"]["prompt_for_download"] is False
+    assert os.path.exists(os.path.join(path, "First Run"))
+    assert template.ensure() == path
+
+    clone = template.clone()
+    try:
+        assert os.path.isdir(os.path.join(clone, "Default", "Cache"))
+        assert not os.path.exists(os.path.join(clone, ".seleneko-template"))
+        with open(os.path.join(clone, "Default", "Preferences"), "w") as f:
+            f.write("{}")
+        # 複製を書き換えてもテンプレートは変わらない
+        assert json.load(open(os.path.join(path, "Default", "Preferences"))) == prefs
+    finally:
+        cleanup_tmpdir(clone)
+
+
+def test_template_creates_missing_parent_dirs(tmp_path):
+    template = ProfileTemplate(str(tmp_path / "cache" / "seleneko" / "chrome-template"))
+    assert os.path.exists(os.path.join(template.ensure(), "Local State"))
+    assert os.listdir(tmp_path / "cache" / "seleneko") == ["chrome-template"]
+
+
+def test_settings_accepts_path_and_reaper_deletes_in_background(tmp_path):
+    settings = DriverSettings(browser="firefox", profile_template=str(tmp_path / "ff"))
+    assert settings.profile_template.is_firefox
+    clone = settings.profile_template.clone()
+    assert os.path.exists(os.path.join(clone, "user.js"))
+    cleanup_tmpdir(clone, background=True)
+    reaper.drain(timeout=5)
+    assert not os.path.exists(clone)
+
+
+def test_clone_is_created_next_to_the_template(tmp_path):
+    """複製はテンプレートと同じファイルシステム（隣）に作る"""
+    template = ProfileTemplate(str(tmp_path / "cache" / "chrome-template"))
+    clone = template.clone()
+    try:
+        assert os.path.dirname(clone) == str(tmp_path / "cache")
+    finally:
+        cleanup_tmpdir(clone)
+    elsewhere = ProfileTemplate(str(tmp_path / "t"), clone_root=str(tmp_path / "clones")).clone()
+    assert os.path.dirname(elsewhere) == str(tmp_path / "clones")
+
+
+@pytest.mark.skipif(profiles.fcntl is None, reason="reflink needs fcntl")
+@pytest.mark.parametrize("code, calls", [(errno.EXDEV, "every file"), (errno.EOPNOTSUPP, "once")])
+def test_reflink_disabled_only_when_unsupported(tmp_path, monkeypatch, code, calls):
+    attempts = []
+
+    def ioctl(*args):
+        attempts.append(args)
+        raise OSError(code, os.strerror(code))
+
+    template = ProfileTemplate(str(tmp_path / "chrome-template"))
+    template.ensure()
+    monkeypatch.setattr(profiles.fcntl, "ioctl", ioctl)
+    clone = template.clone()
+    try:
+        copied = sum(len(files) for _, _, files in os.walk(clone))
+        assert copied > 1
+        assert len(attempts) == (copied if calls == "every file" else 1)
+    finally:
+        cleanup_tmpdir(clone)
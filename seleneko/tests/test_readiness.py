@@ -0,0 +1,60 @@
+import time
+import pytest
+from selenium.common.exceptions import TimeoutException
+from seleneko.automation import DriverSettings, ReadyPolicy, SeleniumClient
+from seleneko.automation.readiness import TRACKER_JS
+from seleneko.benchmarks.stub_webdriver import StubWebDriverServer
+
+pytestmark = pytest.mark.stub_js
+
+URL = "http://stub.test/list"
+PAGE = '<html><head><title>List</title></head><body><div id="app">loading</div></body></html>'
+ROWS = [(0.1, '<p class="row">a</p>'), (0.3, '<p class="row" id="last">b</p>')]
+
+
+@pytest.fixture(params=[True, False], ids=["cdp", "injected"])
+def make(request, tmp_path):
+    with StubWebDriverServer(cdp=request.param) as server:
+        server.add_page(URL, PAGE, fetches=ROWS)
+
+        def make(ready=None):
+            settings = DriverSettings(remote_url=server.url, download_dir=str(tmp_path),
+                                      ready=ready)
+            return SeleniumClient(settings, work_directory=str(tmp_path))
+        yield server, make
+
+
+def test_network_idle_waits_for_late_requests(make):
+    server, make = make
+    with make(ReadyPolicy(network_idle=100)) as cli:
+        cli.driver  # 起動時の CDP 設定を済ませておく
+        assert server.new_document_scripts == ([TRACKER_JS] if server.cdp else [])
+        server.command_counts.clear()
+        started = time.monotonic()
+        cli.get(URL)
+        assert time.monotonic() - started >= 0.4
+        assert server.command_counts["execute_async_script"] == 1
+        assert len(cli.driver.find_elements("css selector", "p.row")) == 2
+
+
+def test_selector_and_predicate(make):
+    server, make = make
+    with make({"selector": ("css", "#last")}) as cli:
+        cli.get(URL)
+        assert cli.driver.find_elements("css selector", "#last")
+
+        server.add_script("window.appReady",
+                          lambda session, args: "b" in session.context.raw_text())
+        cli.get(URL, ready={"predicate": "return window.appReady === true;"})
+        assert cli.driver.find_elements("css selector", "#last")
+
+        with pytest.raises(TimeoutException):
+            cli.get(URL, ready=ReadyPolicy(selector=("css", "#never"), timeout=0.2))
+
+
+def test_default_policy_only_checks_ready_state(make):
+    server, make = make
+    with make() as cli:
+        cli.get(URL)
+        assert server.command_counts["execute_async_script"] == 0
+        assert server.new_document_scripts == []
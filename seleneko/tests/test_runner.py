@@ -0,0 +1,82 @@
+import threading
+import time
+import pytest
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    TimeoutException,
+    WebDriverException,
+)
+from seleneko.automation import Job, JobRunner, SeleniumClient
+from seleneko.tests.conftest import FakeDriver
+
+
+def make_runner(**kwargs):
+    clients = []
+    lock = threading.Lock()
+
+    def factory():
+        cli = SeleniumClient()
+        cli.driver = FakeDriver()
+        with lock:
+            clients.append(cli)
+        return cli
+
+    return JobRunner(client_factory=factory, **kwargs), clients
+
+
+def test_run_streams_results_from_workers():
+    """複数ワーカーで全ジョブが処理され、結果が揃うか"""
+    runner, clients = make_runner(max_workers=3)
+    jobs = [Job(url=f"https://example.com/{i}", action=lambda c: c.driver.current_url)
+            for i in range(10)]
+    results = runner.run_all(jobs)
+    assert [r.value for r in results] == [f"https://example.com/{i}" for i in range(10)]
+    assert all(r.ok for r in results)
+    assert 1 <= len(clients) <= 3
+
+
+@pytest.mark.parametrize("kill", ["session", "probe"])
+def test_retry_on_fresh_driver_after_crash(kill):
+    """セッションを失った後は新しい driver で再試行されるか"""
+    runner, clients = make_runner(max_workers=1, retries=1)
+    seen = []
+
+    def flaky(cli):
+        seen.append(cli)
+        if len(seen) == 1:
+            if kill == "session":
+                raise InvalidSessionIdException("session deleted")
+            cli.driver.quit()  # 以降 return 1 に応答しない
+            raise WebDriverException("browser crashed")
+        return "ok"
+
+    (result,) = runner.run_all([Job(url=None, action=flaky)])
+    assert result.ok and result.value == "ok"
+    assert result.attempts == 2
+    assert seen[0] is not seen[1]
+    assert seen[0]._driver is None  # 壊れた driver は破棄済み
+
+
+def test_page_error_is_not_retried():
+    """ページ側の失敗は再試行せず、同じ driver を使い続ける"""
+    runner, clients = make_runner(max_workers=1, retries=2)
+    seen = []
+
+    def fails(cli):
+        seen.append(cli.driver)
+        raise TimeoutException("element never appeared")
+
+    results = runner.run_all([Job(url=None, action=fails), Job(url=None, action=fails)])
+    assert [r.attempts for r in results] == [1, 1]
+    assert all(isinstance(r.error, TimeoutException) for r in results)
+    assert len(clients) == 1 and seen[0] is seen[1]
+
+
+def test_job_timeout_reports_failure():
+    runner, _ = make_runner(max_workers=1, retries=0)
+    jobs = [Job(url=None, action=lambda c: time.sleep(0.5), name="slow", timeout=0.1),
+            Job(url=None, action=lambda c: "fast")]
+    results = runner.run_all(jobs)
+    assert not results[0].ok
+    assert isinstance(results[0].error, TimeoutError)
+    assert results[1].ok and results[1].value == "fast"
@@ -0,0 +1,79 @@
+import pytest
+from selenium.webdriver.common.by import By
+from seleneko.automation import SeleniumClient, ScenarioError, compile_scenario
+from seleneko.tests.conftest import FakeElement
+
+
+def make_client(fake_driver):
+    cli = SeleniumClient()
+    cli.driver = fake_driver
+    return cli
+
+
+LOGIN = {
+    "name": "login",
+    "steps": [
+        {"action": "get", "url": "https://example.com/login"},
+        {"action": "type_text_smart", "locator": ["id", "user"], "text": "${userid}"},
+        {"action": "click_smart", "locator": ["css", "button"],
+         "success": {"expect": "url_change"}},
+        {"action": "read", "name": "title", "locator": ["css", "h1"]},
+        {"action": "read", "name": "href", "locator": ["xpath", "//a"], "attr": "href"},
+    ],
+}
+
+
+def test_scenario_runs_and_batches_reads(fake_driver):
+    """ステップが順に実行され、連続 read が1回の execute_script になるか"""
+    user_el = FakeElement(attrs={"value": ""})
+
+    def on_click():
+        fake_driver.current_url = "https://example.com/home"
+
+    fake_driver.add_element(By.ID, "user", user_el)
+    fake_driver.add_element(By.CSS_SELECTOR, "button", FakeElement(on_click=on_click))
+    calls = []
+    original = fake_driver.execute_script
+
+    def execute_script(script, *args):
+        if args and isinstance(args[0], list):
+            calls.append(args[0])
+            return {spec[0]: spec[1] for spec in args[0]}
+        return original(script, *args)
+
+    fake_driver.execute_script = execute_script
+
+    scenario = compile_scenario(LOGIN)
+    assert len(scenario) == 4
+    results = scenario.run(make_client(fake_driver), userid="niko")
+    assert user_el.get_attribute("value") == "niko"
+    assert fake_driver.current_url.endswith("/home")
+    # ロケータは解決済みの By 値で渡る
+    assert calls == [[["title", "css selector", "h1", "text", "one"],
+                      ["href", "xpath", "//a", "href", "one"]]]
+    assert results == {"title": "css selector", "href": "xpath"}
+
+
+def test_scenario_validation_fails_up_front():
+    with pytest.raises(ValueError, match="step 1"):
+        compile_scenario([{"action": "get", "url": "x"},
+                          {"action": "click_smart", "locator": ["bogus", "x"]}])
+    with pytest.raises(ValueError, match="unknown action"):
+        compile_scenario([{"action": "fly"}])
+
+
+def test_scenario_step_failure(fake_driver):
+    scenario = compile_scenario([{"action": "type_text_smart", "locator": ["id", "missing"],
+                                  "text": "x"}])
+    with pytest.raises(ScenarioError):
+        scenario.run(make_client(fake_driver))
+
+
+def test_scenario_keeps_literal_dollar(fake_driver):
+    """変数を参照しない '$' は置き換えずにそのまま入力する"""
+    pwd_el = FakeElement(attrs={"value": ""})
+    fake_driver.add_element(By.ID, "pwd", pwd_el)
+    scenario = compile_scenario([{"action": "type_text_smart", "locator": ["id", "pwd"],
+                                  "text": "pa$$word-$ ${userid}$other"}])
+    scenario.run(make_client(fake_driver), userid="niko")
+    assert pwd_el.get_attribute("value") == "pa$$word-$ niko$other"
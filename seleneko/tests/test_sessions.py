@@ -0,0 +1,80 @@
+import pytest
+from seleneko.automation import DriverSettings, SeleniumClient
+from seleneko.automation.sessions import CAPTURE_STORAGE_JS, SessionSnapshot, SessionStore
+from seleneko.benchmarks.stub_webdriver import StubWebDriverServer
+from seleneko.core import config
+
+pytestmark = pytest.mark.stub_js
+
+BASE = "http://stub.test"
+LOGIN = """<html><head><title>Login</title></head><body><form action="/home" method="post">
+<input id="user" name="user"><input id="pass" name="pass" type="password">
+<button id="go">go</button>
+</form></body></html>"""
+HOME = ('<html><head><title>Home</title></head>'
+        '<body><a id="logout" href="/login">logout</a></body></html>')
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = SessionStore(config(name="test_sessions"))
+    with StubWebDriverServer() as server:
+        server.add_page(f"{BASE}/login", LOGIN)
+        server.add_page(f"{BASE}/home", HOME)
+        server.protect(f"{BASE}/home", "sid", f"{BASE}/login")
+        server.add_login(f"{BASE}/home", "sid")
+        settings = DriverSettings(remote_url=server.url, download_dir=str(tmp_path))
+
+        def login():
+            """
+            新しい driver でログインし、
+            (再利用できたか, 現在の storage) を返す
+            """
+            with SeleniumClient(settings, work_directory=str(tmp_path), session_store=store) as cli:
+                restored = cli.login_reusing_session(
+                    f"{BASE}/login", ("css", "#user"), ("css", "#pass"), ("css", "#go"),
+                    "neko", "secret", probe=("css", "#logout"), probe_timeout=1)
+                assert cli.driver.title == "Home"
+                return restored, cli.driver.execute_script(CAPTURE_STORAGE_JS)
+
+        yield server, store, login
+
+
+def test_new_sessions_reuse_saved_login(env):
+    server, store, login = env
+    assert login()[0] is False
+    assert len(server.submissions) == 1
+    raw = store.conf.get_data(store.key(BASE, "neko"))
+    assert raw and "neko" not in raw and "sid" not in raw
+
+    snapshot = store.load(BASE, "neko")
+    snapshot.local_storage = {"theme": "dark"}
+    store.save(snapshot)
+    restored, storage = login()
+    assert restored is True
+    assert len(server.submissions) == 1
+    assert storage["local"] == {"theme": "dark"}
+
+
+def test_invalid_session_falls_back_to_login(env):
+    server, store, login = env
+    login()
+    server.expire_logins()
+    assert login()[0] is False
+    assert len(server.submissions) == 2
+    # 取り直した状態が保存されているので次は再利用できる
+    assert login()[0] is True
+
+
+def test_snapshot_roundtrip_and_expiry(env):
+    _, store, _ = env
+    snapshot = SessionSnapshot(BASE, "neko", f"{BASE}/home", [], {"token": "ねこ\n\"x\""}, {},
+                               0, 1)
+    store.save(snapshot)
+    assert store.load(BASE, "neko") is None  # 期限切れは捨てる
+    assert store.conf.get_data(store.key(BASE, "neko")) is None
+
+    snapshot.expires_at = 2 ** 40
+    store.save(snapshot)
+    assert store.load(BASE, "neko").local_storage == {"token": "ねこ\n\"x\""}
@@ -0,0 +1,57 @@
+import gzip
+import json
+import os
+import threading
+from seleneko.automation import SeleniumClient
+from seleneko.automation.snapshots import SnapshotWriter
+from seleneko.tests.conftest import FakeDriver
+
+
+class SnapshotDriver(FakeDriver):
+    page_source = "<html><body>neko</body></html>"
+
+    def get_screenshot_as_png(self):
+        return b"\x89PNG fake"
+
+    def get_log(self, kind):
+        return [{"level": "INFO", "message": "hello"}]
+
+
+def test_snapshot_written_in_background_and_deduplicated(tmp_path):
+    """書き込みは別スレッドで行い、同じ内容は1ファイルにまとまるか"""
+    writer = SnapshotWriter(str(tmp_path), compression="gzip")
+    cli = SeleniumClient(snapshot_writer=writer)
+    cli.driver = SnapshotDriver()
+
+    threads = []
+    original = writer._write_snapshot
+
+    def record(parts, meta):
+        threads.append(threading.current_thread().name)
+        return original(parts, meta)
+
+    writer._write_snapshot = record
+    first = cli.snapshot("step-1").result(timeout=5)
+    second = cli.snapshot("step-2").result(timeout=5)
+
+    assert threads == ["seleneko-snapshots"] * 2
+    assert first["files"] == second["files"]
+    assert first["files"]["screenshot"].endswith(".png")
+    with gzip.open(first["files"]["dom"], "rb") as f:
+        assert f.read() == SnapshotDriver.page_source.encode()
+    with gzip.open(first["files"]["console"], "rb") as f:
+        assert json.load(f)[0]["message"] == "hello"
+    assert writer.stats["objects_written"] == 3
+    assert writer.stats["objects_deduplicated"] == 3
+
+    index = [json.loads(line) for line in open(os.path.join(tmp_path, "index.jsonl"))]
+    assert [r["label"] for r in index] == ["step-1", "step-2"]
+    assert index[0]["url"] == "https://example.com/login"
+
+
+def test_uncompressed_and_flush(tmp_path):
+    writer = SnapshotWriter(str(tmp_path), compression=None)
+    future = writer.submit({"dom": b"<p>a</p>"}, {"label": "x"})
+    writer.flush(timeout=5)
+    assert future.done()
+    assert open(future.result()["files"]["dom"], "rb").read() == b"<p>a</p>"
@@ -0,0 +1,58 @@
+import pytest
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from seleneko.automation import DriverSettings, SeleniumClient
+from seleneko.benchmarks import load
+from seleneko.benchmarks.stub_dom import parse_html, find_all
+from seleneko.benchmarks.stub_webdriver import StubWebDriverServer
+
+pytestmark = pytest.mark.stub_js
+
+
+@pytest.fixture
+def server():
+    with StubWebDriverServer() as srv:
+        load.install_pages(srv)
+        yield srv
+
+
+@pytest.fixture
+def client(server, tmp_path):
+    with SeleniumClient(DriverSettings(remote_url=server.url, download_dir=str(tmp_path)),
+                        work_directory=str(tmp_path)) as cli:
+        yield cli
+
+
+def test_login_and_extract_over_http(server, client):
+    client.login(load.BASE + "/login", ("css", "#user"), ("css", "#pass"), ("css", "#go"),
+                 "neko", "secret")
+    assert client.driver.title == "Home"
+    assert server.submissions[-1]["fields"] == {"user": "neko", "pass": "secret"}
+    data = client.extract(load.EXTRACT_SPEC)
+    assert data["heading"] == "Welcome"
+    assert [row["name"] for row in data["orders"]] == ["neko", "tama", "mike"]
+
+
+def test_stale_element_after_navigation(client):
+    client.get(load.BASE + "/login")
+    elem = client.driver.find_element(By.ID, "user")
+    client.driver.get(load.BASE + "/home")
+    with pytest.raises(StaleElementReferenceException):
+        elem.click()
+    with pytest.raises(NoSuchElementException):
+        client.driver.find_element(By.ID, "user")
+
+
+def test_command_latency_and_concurrent_sessions():
+    result = load.run(sessions=3, iterations=2, latency=0.001)
+    assert result["errors"] == []
+    assert result["iterations"] == 6
+    assert result["commands"] > 0
+
+
+def test_stub_dom_selectors():
+    doc = parse_html('<div id="a" class="x y"><p>one</p><p hidden>two</p>'
+                     '<a href="/n">next</a></div>')
+    assert [n.visible_text() for n in find_all(doc, By.CSS_SELECTOR, "div.x > p")] == ["one", ""]
+    assert find_all(doc, By.XPATH, "//p[text()='two']")[0].displayed is False
+    assert find_all(doc, By.LINK_TEXT, "next")[0].attrs["href"] == "/n"
@@ -0,0 +1,54 @@
+import pytest
+from seleneko.automation import DriverSettings, SeleniumClient
+from seleneko.benchmarks.stub_webdriver import StubWebDriverServer
+
+pytestmark = pytest.mark.stub_js
+
+BASE = "http://stub.test"
+
+
+def _page(n):
+    return (f"<html><head><title>p{n}</title></head>"
+            f"<body><h1>page {n}</h1><a id='n' href='/p0'>x</a></body></html>")
+
+
+@pytest.fixture
+def client(tmp_path):
+    with StubWebDriverServer() as server:
+        server.add_page(f"{BASE}/slow", _page("slow"), load_time=0.3)
+        for n in range(6):
+            server.add_page(f"{BASE}/p{n}", _page(n))
+        settings = DriverSettings(remote_url=server.url, download_dir=str(tmp_path),
+                                  page_load_strategy="none")
+        with SeleniumClient(settings, work_directory=str(tmp_path)) as cli:
+            yield cli
+
+
+def test_map_yields_tabs_as_they_finish(client):
+    urls = [f"{BASE}/slow"] + [f"{BASE}/p{n}" for n in range(3)]
+    with client.tabs(size=4) as tabs:
+        seen = [(tab.url, tab.extract({"h": ("css", "h1")})["h"]) for tab in tabs.map(urls)]
+        assert len({t.handle for t in tabs.tabs}) == 4
+    # 遅いページは先に開始しても最後に返る
+    assert seen[-1] == (f"{BASE}/slow", "page slow")
+    assert sorted(seen[:-1]) == [(f"{BASE}/p{n}", f"page {n}") for n in range(3)]
+
+
+def test_tabs_are_recycled_and_closed(client):
+    home = client.driver.current_window_handle
+    urls = [f"{BASE}/p{n}" for n in range(6)]
+    with client.tabs(size=2, max_uses=2) as tabs:
+        for tab in tabs.map(urls):
+            assert tab.click_smart(("css", "#n"), delay=0)
+            assert len(client.driver.window_handles) == 3
+        stats = tabs.stats()
+    assert stats["recycled"] >= 2 and stats["loads"] == 6
+    assert client.driver.window_handles == [home]
+    assert client.driver.current_window_handle == home
+
+
+def test_tabs_require_page_load_strategy_none(tmp_path):
+    """eager / normal では読み込み中のタブへのコマンドが待たされる"""
+    cli = SeleniumClient(DriverSettings(download_dir=str(tmp_path)), work_directory=str(tmp_path))
+    with pytest.raises(ValueError, match="page_load_strategy"):
+        cli.tabs(size=2)
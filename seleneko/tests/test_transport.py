@@ -0,0 +1,83 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from selenium.webdriver.remote.client_config import ClientConfig
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from seleneko.automation.transport import tune_connection
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        body = json.dumps({"value": "Stub Page"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_DELETE = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    """WebDriver のコマンドに固定値で応答するだけの HTTP サーバ"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.lock = threading.Lock()
+    server.connections = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _bench(server, n=100, **kwargs):
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    conn = RemoteConnection(client_config=ClientConfig(remote_server_addr=url))
+    tune_connection(conn, **kwargs)
+    before = server.connections
+    t0 = time.perf_counter()
+    for _ in range(n):
+        assert conn.execute(Command.GET_TITLE, {"sessionId": "s1"})["value"] == "Stub Page"
+    per_command = (time.perf_counter() - t0) / n
+    conn.close()
+    return per_command, server.connections - before
+
+
+def test_command_overhead_keep_alive_vs_new_connections(stub_server):
+    """keep-alive で接続が使い回され、コマンドごとの時間を測れるか"""
+    pooled, pooled_conns = _bench(stub_server, pool_size=2, retries=2)
+    fresh, fresh_conns = _bench(stub_server, keep_alive=False)
+    assert pooled_conns == 1
+    assert fresh_conns == 100
+    # 接続の確立（とサーバ側のスレッド生成）を毎回払わない分だけ速い
+    assert 0 < pooled < fresh
+
+
+def test_tune_connection_sets_pool_and_retry(stub_server):
+    url = f"http://127.0.0.1:{stub_server.server_address[1]}"
+    conn = RemoteConnection(client_config=ClientConfig(remote_server_addr=url))
+    tune_connection(conn, pool_size=8, retries=3, timeout=7)
+    pool = conn._conn.connection_from_url(url)
+    assert pool.pool.maxsize == 8
+    assert pool.retries.connect == 3
+    assert "POST" not in pool.retries.allowed_methods
+    assert "DELETE" not in pool.retries.allowed_methods
+    assert conn._client_config.timeout == 7
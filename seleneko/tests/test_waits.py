@@ -0,0 +1,32 @@
+import itertools
+import time
+import pytest
+from selenium.common.exceptions import TimeoutException
+from seleneko.automation.waits import PolicyWait, WaitPolicy
+from seleneko.tests.conftest import FakeDriver
+
+
+def test_policy_intervals_back_off_to_cap():
+    policy = WaitPolicy(poll_interval=0.01, backoff=2, max_interval=0.05)
+    assert list(itertools.islice(policy.intervals(), 5)) == [0.01, 0.02, 0.04, 0.05, 0.05]
+
+
+def test_policy_wait_returns_soon_after_condition():
+    """条件成立後、既定の 0.5s 刻みを待たずに返るか"""
+    ready_at = time.monotonic() + 0.03
+    started = time.monotonic()
+    value = PolicyWait(FakeDriver(), 2, WaitPolicy(poll_interval=0.01, backoff=1)).until(
+        lambda d: time.monotonic() >= ready_at and "ok")
+    assert value == "ok"
+    assert time.monotonic() - started < 0.2
+
+
+def test_policy_wait_uses_mutation_observer_and_times_out():
+    driver = FakeDriver()
+    observed = []
+    driver.execute_async_script = lambda script, *args: observed.append(args) or False
+    wait = PolicyWait(driver, 0.05, WaitPolicy(mutation_observer=True, observer_slice=0.01),
+                      locator=("css selector", "#late"))
+    with pytest.raises(TimeoutException):
+        wait.until(lambda d: False)
+    assert observed and observed[0][:2] == ("css selector", "#late")